@@ -0,0 +1,92 @@
+"""
+Benchmark of parallel matching
+
+Times matching a large list against a `ListContaining` of
+`DictContainingItems` matchers, and diffing two large dicts, serially and
+using pools of different numbers of workers.
+
+For example:
+
+```sh
+python benchmarks/parallel_benchmark.py --mode threads
+```
+"""
+
+import argparse
+import sys
+import time
+from collections.abc import Callable
+
+from jestspectation import (
+    Any,
+    DictContainingItems,
+    Equals,
+    ListContaining,
+    configure,
+)
+
+
+def time_best(function: Callable[[], object], repeats: int) -> float:
+    """
+    Returns the shortest time taken to run the function
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--mode", choices=["processes", "threads"], default="threads"
+    )
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16]
+    )
+    args = parser.parse_args()
+
+    size = args.size
+    received = [{"id": i, "name": f"user{i}"} for i in range(size)]
+    # The matchers are near the end of the list, so most of it is scanned
+    contains = ListContaining(
+        [DictContainingItems({"id": i}) for i in range(size - 10, size)]
+    )
+    expected_dict = {i: {"id": Any(int), "tags": [i]} for i in range(size)}
+    received_dict = {
+        i: {"id": i, "tags": [i + (i % 1000 == 0)]} for i in range(size)
+    }
+
+    benchmarks: dict[str, Callable[[], object]] = {
+        "ListContaining": lambda: contains == received,
+        "dict diff": lambda: Equals(expected_dict).get_diff(
+            received_dict, False
+        ),
+    }
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL enabled: {gil}")
+    print(f"Mode: {args.mode}, size: {size}")
+
+    for name, function in benchmarks.items():
+        configure().parallel_threshold = None
+        serial = time_best(function, args.repeats)
+        print(f"\n{name}")
+        print(f"  serial      {serial:8.3f}s")
+        configure().parallel_threshold = 1000
+        configure().parallel_mode = args.mode
+        for workers in args.workers:
+            configure().parallel_workers = workers
+            parallel = time_best(function, args.repeats)
+            print(
+                f"  {workers:2} workers  {parallel:8.3f}s "
+                f"({serial / parallel:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,15 @@
 Matchers that match close to anything
 """
 
+from collections.abc import Callable
+
 from .__jestspectation_base import JestspectationBase
-from .__util import get_object_type_name, get_type_name, safe_diff_wrapper
+from .__util import (
+    bounded_repr,
+    get_object_type_name,
+    get_type_name,
+    safe_diff_wrapper,
+)
 
 
 class Any(JestspectationBase):
@@ -20,18 +27,28 @@ class Any(JestspectationBase):
         """
         self.__match_type = match_type
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__match_type,)
+
     def __repr__(self) -> str:
         return f"Any({get_type_name(self.__match_type)})"
 
     def __eq__(self, other: object) -> bool:
         return isinstance(other, self.__match_type)
 
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        return (self.__match_type,)
+
+    def _compile(self) -> Callable[[object], bool]:
+        match_type = self.__match_type
+        return lambda other: isinstance(other, match_type)
+
     @safe_diff_wrapper
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
         return [
             "Type mismatch",
             f"Expected any object of type {get_type_name(self.__match_type)}",
-            f"Received {repr(other)} ({get_object_type_name(other)})",
+            f"Received {bounded_repr(other)} ({get_object_type_name(other)})",
         ]
 
 
@@ -45,11 +62,19 @@ class Anything(JestspectationBase):
         Matches any Python object
         """
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), ()
+
     def __repr__(self) -> str:
         return "Anything()"
 
     def __eq__(self, other: object) -> bool:
         return True
 
+    def _compile(self) -> Callable[[object], bool]:
+        return lambda other: True
+
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
-        raise Exception(f"Anything() should have matched {other}")
+        raise Exception(
+            f"Anything() should have matched {bounded_repr(other)}"
+        )
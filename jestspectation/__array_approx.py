@@ -0,0 +1,378 @@
+"""
+Matcher for arrays of approximate values
+"""
+
+import heapq
+import importlib
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from functools import cache
+from itertools import compress, count, repeat
+from math import inf, isnan
+from operator import le, mul, not_, sub
+from types import ModuleType
+from typing import Any
+
+from .__config import configure
+from .__jestspectation_base import JestspectationBase
+from .__util import bounded_repr
+
+WORST_SHOWN = 5
+"""
+Number of values with the largest differences to show in diffs
+"""
+
+FIRST_SHOWN = 10
+"""
+Number of indexes of mismatched values to show in diffs
+"""
+
+
+@cache
+def _numpy() -> ModuleType | None:
+    """
+    Returns the `numpy` module if it is installed, which is used to compare
+    arrays in a single vectorized operation
+    """
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        return None
+
+
+@dataclass
+class _Mismatches:
+    """
+    Values of an array that are outside the tolerance
+    """
+
+    total: int
+    """Number of values in the array"""
+    count: int
+    """Number of values outside the tolerance"""
+    first: list[tuple[int, ...]]
+    """Indexes of the first mismatched values"""
+    worst: list[tuple[tuple[int, ...], float, float]]
+    """Indexes, expected and received values with the largest differences"""
+
+
+def tolerances(
+    expected: Iterable[float],
+    magnitude: float | None,
+    percent: float | None,
+) -> Iterable[float]:
+    """
+    Returns the maximum difference from each of the expected values
+    """
+    if magnitude is not None:
+        return repeat(magnitude)
+    assert percent is not None
+    return map(mul, map(abs, expected), repeat(percent / 100))
+
+
+def all_close(
+    expected: Sequence[float],
+    received: Sequence[float],
+    magnitude: float | None,
+    percent: float | None,
+) -> bool:
+    """
+    Returns whether each received value is within the tolerance of the
+    corresponding expected value, without calling any Python code for each
+    value. NaNs are never within the tolerance. The sequences are assumed to
+    be the same length.
+
+    Raises:
+        TypeError: the values aren't numbers
+    """
+    # Written this way so that NaNs are mismatches
+    return all(
+        map(
+            le,
+            map(abs, map(sub, received, expected)),
+            tolerances(expected, magnitude, percent),
+        )
+    )
+
+
+def _as_flat(values: object) -> Sequence:
+    """
+    Returns the values of an array, or a sequence of numbers, as a flat
+    sequence. Buffers are viewed as one-dimensional rather than copied.
+
+    Raises:
+        TypeError: the values aren't a sequence or buffer
+    """
+    if isinstance(values, (list, tuple)):
+        return values
+    try:
+        view = memoryview(values)  # type: ignore
+    except TypeError:
+        raise TypeError(
+            f"Cannot compare {type(values).__name__} as an array"
+        ) from None
+    if view.ndim != 1:
+        view = view.cast(view.format)  # type: ignore
+    return view
+
+
+def _shape(values: object) -> tuple[int, ...]:
+    """
+    Shape of an array, or sequence of numbers
+    """
+    if isinstance(values, (list, tuple)):
+        return (len(values),)
+    return memoryview(values).shape or ()  # type: ignore
+
+
+class ArrayApprox(JestspectationBase):
+    """
+    Array of floats approximately equal
+    """
+
+    def __init__(
+        self,
+        values: Iterable[float] | Any,
+        magnitude: float | None = None,
+        percent: float | None = None,
+    ) -> None:
+        """
+        Array of floats approximately equal, checking every value at once.
+
+        This matches NumPy arrays, `array.array`s, `memoryview`s, lists and
+        tuples of the same shape as the given values. If NumPy is installed,
+        the arrays are compared using vectorized operations. Otherwise, they
+        are compared without calling any Python code for each value.
+
+        Args:
+            values (Iterable[float]): target values, which can be any array
+                or iterable of numbers.
+            magnitude (Optional[float], optional): maximum magnitude
+                difference of each value. Defaults to None.
+            percent (Optional[float], optional): maximum percentage difference
+                of each value. Percentage differences are always calculated
+                based on the expected value, regardless of ordering, so
+                expected values of 0 must match exactly. Defaults to None.
+
+        Raises:
+            ValueError: At least one of magnitude or percent must be specified
+        """
+        if magnitude is None and percent is None:
+            raise ValueError("One of magnitude or percent must be specified")
+        if magnitude is not None and percent is not None:
+            raise ValueError(
+                "Only one of magnitude or percent can be specified"
+            )
+        np = _numpy()
+        if np is None or not isinstance(values, np.ndarray):
+            # Keep buffers as they are, so that they can be compared without
+            # copying, but consume any other iterables
+            try:
+                memoryview(values)  # type: ignore
+            except TypeError:
+                values = list(values)
+        self.__values = values
+        self.__magnitude = magnitude
+        self.__percent = percent
+
+    def __reduce__(self) -> tuple[type, tuple]:
+        values = self.__values
+        # Memoryviews can't be pickled, so their values are copied
+        if isinstance(values, memoryview):
+            values = values.tolist()
+        return type(self), (values, self.__magnitude, self.__percent)
+
+    def __repr__(self) -> str:
+        if self.__percent is None:
+            tolerance = f"magnitude={self.__magnitude}"
+        else:
+            tolerance = f"percent={self.__percent}"
+        values: object = self.__values
+        if isinstance(values, memoryview):
+            # Memoryviews only show their address, so show their values,
+            # copying no more of them than can be shown
+            if values.ndim == 1:
+                values = values[: configure().repr_limits.maxlist + 1]
+            values = values.tolist()
+        # NumPy shows arrays over multiple lines, but diffs need one line
+        values = " ".join(bounded_repr(values).split())
+        return f"ArrayApprox({values}, {tolerance})"
+
+    def __numpy_mismatches(self, np: ModuleType, other: object) -> Any:
+        """
+        Returns a boolean array of which values are outside the tolerance,
+        the differences, and the expected and received arrays
+        """
+        expected = _numeric_array(np, self.__values)
+        received = _numeric_array(np, other)
+        if expected.shape != received.shape:
+            return None
+        differences = np.abs(received - expected)
+        if self.__magnitude is not None:
+            tolerance = self.__magnitude
+        else:
+            tolerance = np.abs(expected) * (self.__percent / 100)  # type: ignore
+        # Written this way so that NaNs are mismatches
+        return ~(differences <= tolerance), differences, expected, received
+
+    def __eq__(self, other: object) -> bool:
+        np = _numpy()
+        try:
+            if np is not None:
+                result = self.__numpy_mismatches(np, other)
+                return result is not None and not result[0].any()
+            if _shape(other) != _shape(self.__values):
+                return False
+            expected = _as_flat(self.__values)
+            received = _as_flat(other)
+        except (TypeError, ValueError):
+            return False
+        try:
+            return all_close(
+                expected, received, self.__magnitude, self.__percent
+            )
+        except TypeError:
+            # Non-numeric values
+            return False
+
+    def __mismatches(self, other: object) -> _Mismatches | None:
+        """
+        Find the values that are outside the tolerance, or `None` if the
+        shapes don't match
+        """
+        np = _numpy()
+        if np is not None:
+            result = self.__numpy_mismatches(np, other)
+            if result is None:
+                return None
+            bad, differences, expected, received = result
+            flat_bad = np.flatnonzero(bad)
+            mismatch_count = len(flat_bad)
+            first = [
+                tuple(int(i) for i in np.unravel_index(index, bad.shape))
+                for index in flat_bad[:FIRST_SHOWN]
+            ]
+            # NaNs have the largest difference of all
+            worst_differences = np.nan_to_num(
+                differences.ravel()[flat_bad], nan=inf
+            )
+            if mismatch_count > WORST_SHOWN:
+                # Only the largest differences need to be sorted
+                threshold = np.partition(
+                    worst_differences, mismatch_count - WORST_SHOWN
+                )[mismatch_count - WORST_SHOWN]
+                largest = np.flatnonzero(worst_differences >= threshold)
+            else:
+                largest = np.arange(mismatch_count)
+            # Stable, so that the first of any equal differences are shown
+            largest = largest[
+                np.argsort(-worst_differences[largest], kind="stable")
+            ][:WORST_SHOWN]
+            worst_flat = flat_bad[largest]
+            worst = []
+            for index in worst_flat:
+                position = tuple(
+                    int(i) for i in np.unravel_index(index, bad.shape)
+                )
+                worst.append(
+                    (
+                        position,
+                        float(expected.ravel()[index]),
+                        float(received.ravel()[index]),
+                    )
+                )
+            return _Mismatches(bad.size, mismatch_count, first, worst)
+
+        if _shape(other) != _shape(self.__values):
+            return None
+        expected = _as_flat(self.__values)
+        received = _as_flat(other)
+        differences = list(map(abs, map(sub, received, expected)))
+        flat_bad = list(
+            compress(
+                count(),
+                map(
+                    not_,
+                    map(
+                        le,
+                        differences,
+                        tolerances(expected, self.__magnitude, self.__percent),
+                    ),
+                ),
+            )
+        )
+
+        def sort_key(index: int) -> float:
+            difference = differences[index]
+            return inf if isnan(difference) else difference
+
+        return _Mismatches(
+            len(expected),
+            len(flat_bad),
+            [(i,) for i in flat_bad[:FIRST_SHOWN]],
+            [
+                ((i,), float(expected[i]), float(received[i]))
+                for i in heapq.nlargest(WORST_SHOWN, flat_bad, key=sort_key)
+            ],
+        )
+
+    def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
+        try:
+            mismatches = self.__mismatches(other)
+        except (TypeError, ValueError):
+            return [
+                "Type mismatch",
+                f"Expected {self}",
+                f"Received object of type {type(other).__name__}",
+            ]
+        if mismatches is None:
+            return [
+                "Shape mismatch",
+                f"Expected shape {_shape_of(self.__values)}",
+                f"Received shape {_shape_of(other)}",
+            ]
+
+        def index_str(index: tuple[int, ...]) -> str:
+            return f"[{', '.join(str(i) for i in index)}]"
+
+        ret = [
+            "Values out of range",
+            f"Expected {self}",
+            f"{mismatches.count} of {mismatches.total} values are outside "
+            "the tolerance",
+            "Largest differences:",
+        ]
+        for index, expected, received in mismatches.worst:
+            ret.append(
+                f"   {index_str(index)} expected {expected}, received "
+                f"{received} (difference {abs(received - expected)})"
+            )
+        first = ", ".join(index_str(i) for i in mismatches.first)
+        if mismatches.count > len(mismatches.first):
+            first += ", ..."
+        ret.append(f"Mismatched indexes: {first}")
+        return ret
+
+
+def _numeric_array(np: ModuleType, values: object) -> Any:
+    """
+    Returns the values as a NumPy array of floats.
+
+    Raises:
+        TypeError: the values aren't an array of booleans, integers or floats
+    """
+    array = np.asarray(values)
+    # Check the type first, as NumPy would convert numeric strings to floats
+    if array.ndim == 0 or array.dtype.kind not in "biuf":
+        raise TypeError(f"Cannot compare {type(values).__name__} as an array")
+    return array.astype(np.float64, copy=False)
+
+
+def _shape_of(values: object) -> tuple[int, ...]:
+    """
+    Shape of an array, for showing in diffs
+    """
+    np = _numpy()
+    if np is not None:
+        return tuple(np.shape(values))
+    return _shape(values)
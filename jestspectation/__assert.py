@@ -6,6 +6,8 @@ from typing import TypeVar
 
 from jestspectation import Equals
 
+from .__util import truncate_diff
+
 T = TypeVar("T")
 
 
@@ -25,5 +27,5 @@ def assert_eq(lhs: T, rhs: T) -> None:
     wrapped = Equals(lhs)
 
     if wrapped != rhs:
-        diff = "\n".join(wrapped.get_diff(rhs, False))
+        diff = "\n".join(truncate_diff(wrapped.iter_diff(rhs, False)))
         raise AssertionError(diff)
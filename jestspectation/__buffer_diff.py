@@ -0,0 +1,196 @@
+"""
+Buffer diff
+
+Diffs of objects that support the buffer protocol, such as `bytes`,
+`bytearray`, `memoryview` and `array.array`. The buffers are compared
+through memoryviews, one chunk at a time, so that they are never copied in
+full, and only a hexdump of the bytes around the differences is shown.
+"""
+
+from collections.abc import Iterator
+
+from .__util import bounded_repr
+
+CHUNK_SIZE = 1 << 16
+"""
+Number of bytes compared at a time when searching for a difference
+"""
+
+ROW_SIZE = 16
+"""
+Number of bytes shown on each row of a hexdump
+"""
+
+CONTEXT_ROWS = 1
+"""
+Number of rows of the hexdump to show on either side of a difference
+"""
+
+
+def as_bytes(obj: object) -> memoryview | None:
+    """
+    Returns a view of the bytes of an object that supports the buffer
+    protocol, or `None` if it can't be viewed as a flat sequence of bytes
+    """
+    try:
+        view = memoryview(obj)  # type: ignore
+        return view.cast("B")
+    except (TypeError, ValueError):
+        return None
+
+
+def _element_format(obj: object) -> tuple[str, tuple[int, ...] | None]:
+    """
+    Returns the format and shape of the elements of a buffer
+    """
+    view = memoryview(obj)  # type: ignore
+    return view.format, view.shape
+
+
+def _same(
+    a: memoryview, b: memoryview, a_start: int, b_start: int, n: int
+) -> bool:
+    """
+    Returns whether `n` bytes of the views are equal, from the given offsets.
+
+    Comparing memoryviews is done byte by byte, so it's much faster to copy
+    each region first, which can be compared using `memcmp`. Regions are at
+    most one chunk, so the buffers are never copied in full.
+    """
+    return (
+        a[a_start : a_start + n].tobytes()
+        == b[b_start : b_start + n].tobytes()
+    )
+
+
+def _first_difference(a: memoryview, b: memoryview, length: int) -> int:
+    """
+    Returns the offset of the first byte that differs within the first
+    `length` bytes of the views, or `length` if there are no differences
+    """
+    pos = 0
+    # Skip equal chunks
+    while pos < length:
+        end = min(pos + CHUNK_SIZE, length)
+        if not _same(a, b, pos, pos, end - pos):
+            break
+        pos = end
+    else:
+        return length
+    # Then narrow down the differing chunk by halving it
+    end = min(pos + CHUNK_SIZE, length)
+    while end - pos > 1:
+        mid = (pos + end) // 2
+        if _same(a, b, pos, pos, mid - pos):
+            pos = mid
+        else:
+            end = mid
+    return pos
+
+
+def _common_suffix(a: memoryview, b: memoryview, limit: int) -> int:
+    """
+    Returns the length of the common suffix of the views, up to `limit` bytes
+    """
+    len_a, len_b = len(a), len(b)
+    length = 0
+    # Skip equal chunks from the end
+    while length < limit:
+        end = min(length + CHUNK_SIZE, limit)
+        if not _same(a, b, len_a - end, len_b - end, end - length):
+            break
+        length = end
+    else:
+        return limit
+    # Then narrow down the differing chunk by halving it
+    while end - length > 1:
+        mid = (length + end) // 2
+        if _same(a, b, len_a - mid, len_b - mid, mid - length):
+            length = mid
+        else:
+            end = mid
+    return length
+
+
+def _hexdump_row(view: memoryview, offset: int) -> str:
+    """
+    A row of a hexdump, showing the offset, the bytes in hex and the bytes as
+    ASCII
+    """
+    row = bytes(view[offset : offset + ROW_SIZE])
+    hex_bytes = row.hex(" ").ljust(ROW_SIZE * 3 - 1)
+    text = "".join(chr(b) if 32 <= b < 127 else "." for b in row)
+    return f"{offset:08x}  {hex_bytes}  |{text}|"
+
+
+def _hexdump(view: memoryview, first: int, last: int) -> Iterator[str]:
+    """
+    Hexdump of the rows around the bytes at offsets `first` and `last`,
+    omitting the rows between them if they are far apart. The offsets may be
+    past the end of the view.
+    """
+    last_row = (len(view) - 1) // ROW_SIZE
+    windows = []
+    for pos in (first, max(first, last)):
+        row = min(pos // ROW_SIZE, last_row)
+        windows.append(
+            (max(row - CONTEXT_ROWS, 0), min(row + CONTEXT_ROWS, last_row))
+        )
+    (start_1, end_1), (start_2, end_2) = windows
+    if start_2 <= end_1 + 1:
+        windows = [(start_1, end_2)]
+
+    for n, (start, end) in enumerate(windows):
+        if n:
+            yield "..."
+        for row in range(start, end + 1):
+            yield _hexdump_row(view, row * ROW_SIZE)
+
+
+def iter_buffer_diff(
+    matcher: object,
+    other: object,
+    other_is_lhs: bool,
+) -> Iterator[str]:
+    """
+    Lines explaining the differences between two buffers that are known to
+    be unequal
+    """
+    matcher_bytes = as_bytes(matcher)
+    other_bytes = as_bytes(other)
+    if matcher_bytes is None or other_bytes is None:
+        yield "Value mismatch"
+        yield f"Expected {bounded_repr(matcher)}"
+        yield f"Received {bounded_repr(other)}"
+        return
+
+    len_matcher, len_other = len(matcher_bytes), len(other_bytes)
+    shortest = min(len_matcher, len_other)
+    first = _first_difference(matcher_bytes, other_bytes, shortest)
+    suffix = _common_suffix(matcher_bytes, other_bytes, shortest - first)
+
+    if first == len_matcher == len_other:
+        # The bytes are the same, so either the buffers have different
+        # formats, or their elements don't equal themselves, such as NaNs
+        if _element_format(matcher) == _element_format(other):
+            yield "Elements compare unequal, despite equal bytes (eg NaN)"
+        else:
+            yield "Format mismatch"
+        yield f"Expected {bounded_repr(matcher)}"
+        yield f"Received {bounded_repr(other)}"
+        return
+
+    yield f"Bytes differ from offset {first:#x}"
+    if len_matcher != len_other:
+        yield f"Expected {len_matcher} bytes"
+        yield f"Received {len_other} bytes"
+    for label, view in (
+        ("Expected", matcher_bytes),
+        ("Received", other_bytes),
+    ):
+        if not view:
+            continue
+        yield label
+        last = len(view) - suffix - 1
+        for line in _hexdump(view, first, last):
+            yield f"   {line}"
@@ -0,0 +1,74 @@
+"""
+Compile
+
+Expectations that are compiled ahead of time, for matching against many
+objects.
+"""
+
+from collections.abc import Callable, Iterator
+
+from .__equals import Equals
+from .__jestspectation_base import JestspectationBase
+from .__matching import get_candidate_types
+from .__util import bounded_repr
+
+
+class Compiled(JestspectationBase):
+    """
+    Expectation compiled into a function that checks whether objects match it
+    """
+
+    def __init__(self, expected: object) -> None:
+        self.__expected = expected
+        self.__equals = Equals(expected)
+        self.__check = self.__equals._compile()
+
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__expected,)
+
+    def __repr__(self) -> str:
+        return f"compile({bounded_repr(self.__expected)})"
+
+    def __eq__(self, other: object) -> bool:
+        return self.__check(other)
+
+    def _compile(self) -> Callable[[object], bool]:
+        return self.__check
+
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        return get_candidate_types(self.__expected)
+
+    def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
+        return list(self.iter_diff(other, other_is_lhs))
+
+    def iter_diff(self, other: object, other_is_lhs: bool) -> Iterator[str]:
+        # Failures are explained using the usual diff
+        yield from self.__equals.iter_diff(other, other_is_lhs)
+
+
+def compile(expected: object) -> Compiled:
+    """
+    Compile an expectation, so that it can be matched against many objects
+    quickly.
+
+    The expectation, which can be any value containing matchers, is walked
+    once, and turned into a chain of functions with all the setup done ahead
+    of time, such as looking up the types, keys and compiled regular
+    expressions to check. The returned matcher gives the same results as the
+    expectation itself, and failures are shown using the usual diff.
+
+    For example:
+
+    ```py
+    record = compile({"id": Any(int), "name": StringMatchingRegex("[A-Z]")})
+    for r in records:
+        assert r == record
+    ```
+
+    Args:
+        expected (object): expectation to compile
+
+    Returns:
+        Compiled: matcher that checks objects against the expectation
+    """
+    return Compiled(expected)
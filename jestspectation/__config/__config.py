@@ -2,7 +2,10 @@
 Configuration for Jestspectation
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Literal
+
+from .__repr_limits import ReprLimits
 
 
 @dataclass
@@ -16,6 +19,53 @@ class Config:
     Whether Jestspectation should provide diffs for all Pytest errors
     """
 
+    diff_max_lines: int | None = None
+    """
+    Maximum number of lines of a diff to display when an assertion fails. Any
+    further lines are never generated, and are replaced with a summary line.
+    If `None`, diffs are not limited.
+    """
+
+    diff_max_bytes: int | None = None
+    """
+    Maximum size, in bytes, of a diff to display when an assertion fails. Any
+    further lines are never generated, and are replaced with a summary line.
+    If `None`, diffs are not limited.
+    """
+
+    parallel_threshold: int | None = None
+    """
+    Minimum number of received items for which containers are matched in
+    parallel, by splitting the items into chunks, which are matched in a
+    pool of workers. This also applies to the number of values compared when
+    diffing dicts and lists, although only the first such container in a diff
+    is matched in parallel. The pool is started when first needed, and reused
+    until the program exits. In the `"processes"` mode, matchers and items
+    must be picklable to be sent to the workers. If `None`, matching is never
+    done in parallel.
+    """
+
+    parallel_workers: int | None = None
+    """
+    Maximum number of workers to use when matching in parallel. If `None`,
+    one worker is used for each CPU.
+    """
+
+    parallel_mode: Literal["processes", "threads"] = "processes"
+    """
+    Whether to match in parallel using a pool of worker processes or
+    threads. Threads avoid the cost of pickling the matchers and items, but
+    on builds of Python with a global interpreter lock, only one of them runs
+    at a time.
+    """
+
+    repr_limits: ReprLimits = field(default_factory=ReprLimits)
+    """
+    Limits on the size of the representations of values shown in diffs. This
+    is a `reprlib.Repr`, so limits can be adjusted per-type, for example
+    `configure().repr_limits.maxstring = 80`.
+    """
+
 
 config = Config()
 
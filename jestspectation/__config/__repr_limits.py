@@ -0,0 +1,107 @@
+"""
+Limits on the length of representations of objects in diffs
+"""
+
+import reprlib
+from itertools import islice
+
+from ..__session import CachedRepr, Rendering, get_session
+
+_RECURSIVE: dict[type, str] = {list: "[...]", dict: "{...}"}
+"""
+Representations of recursive references to containers, matching `repr`
+"""
+
+
+class ReprLimits(reprlib.Repr):
+    """
+    Limits on the size of representations of values that are embedded in
+    diffs, so that a large payload doesn't produce an enormous diff.
+
+    This is a `reprlib.Repr`, so limits can be set per-type using its
+    attributes, for example:
+    ```py
+    jestspectation.configure().repr_limits.maxlist = 10
+    ```
+
+    The defaults are generous, so that only very large values are shortened.
+    Unlike `reprlib.Repr`, dicts are shown in their insertion order,
+    recursive references are shown like they are by `repr`, and
+    representations are cached during a diff session.
+    """
+
+    fillvalue = "..."
+    """
+    Placeholder for omitted items, which `reprlib.Repr` only defines since
+    Python 3.11
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.maxlevel = 20
+        self.maxtuple = 100
+        self.maxlist = 100
+        self.maxarray = 100
+        self.maxdict = 100
+        self.maxset = 100
+        self.maxfrozenset = 100
+        self.maxdeque = 100
+        self.maxstring = 1000
+        self.maxlong = 1000
+        self.maxother = 1000
+
+    def repr1(self, x: object, level: int) -> str:
+        session = get_session()
+        if session is None:
+            return super().repr1(x, level)
+        rendering = session.rendering
+
+        if id(x) in session.rendering_ids:
+            # A reference back to an object being rendered, which is shown
+            # the same way as by the built-in `repr`
+            for r in rendering:
+                r.cyclic = True
+            return _RECURSIVE.get(type(x), self.fillvalue)
+
+        cached = session.reprs.get(id(x))
+        if cached is None or not cached.is_valid_at(level):
+            current = Rendering(id(x))
+            rendering.append(current)
+            session.rendering_ids.add(id(x))
+            try:
+                text = super().repr1(x, level)
+            finally:
+                rendering.pop()
+                session.rendering_ids.discard(id(x))
+            cached = CachedRepr(x, text, level, current.height)
+            if not current.cyclic:
+                session.reprs[id(x)] = cached
+
+        # The parent is at least one level taller than this object
+        if rendering:
+            rendering[-1].height = max(rendering[-1].height, cached.height + 1)
+        return cached.text
+
+    def repr_dict(self, x: dict, level: int) -> str:
+        if not x:
+            return "{}"
+        if level <= 0:
+            return "{" + self.fillvalue + "}"
+        pieces = [
+            f"{self.repr1(k, level - 1)}: {self.repr1(v, level - 1)}"
+            for k, v in islice(x.items(), self.maxdict)
+        ]
+        if len(x) > self.maxdict:
+            pieces.append(self.fillvalue)
+        return "{" + ", ".join(pieces) + "}"
+
+    def repr_bytes(self, x: bytes, level: int) -> str:
+        # Like strings, only the start and end of long byte strings are
+        # rendered, rather than truncating the full repr of a large payload
+        return self.repr_str(x, level)  # type: ignore
+
+    def repr_bytearray(self, x: bytearray, level: int) -> str:
+        if len(x) > 2 * self.maxstring:
+            # Only copy the ends of the buffer, which are all that is shown
+            x = x[: self.maxstring] + x[-self.maxstring :]
+        return f"bytearray({self.repr_bytes(bytes(x), level)})"
@@ -3,11 +3,20 @@ Matchers for specific container types
 """
 
 from abc import abstractmethod
-from collections.abc import ItemsView, Iterable
+from collections.abc import Callable, ItemsView, Iterable, Iterator
 from typing import Any, Generic, TypeGuard, TypeVar, cast
 
+from .__item_index import ItemIndex, PresenceIndex, index_items
 from .__jestspectation_base import JestspectationBase
-from .__util import get_object_type_name, safe_diff_wrapper, sub_diff_delegate
+from .__matching import MultisetMatcher
+from .__util import (
+    bounded_repr,
+    get_object_type_name,
+    prefix_first_line,
+    safe_lazy_diff_wrapper,
+    sub_diff_delegate,
+)
+from .__validators import compile_value
 
 T = TypeVar("T", bound=Iterable)
 
@@ -24,12 +33,26 @@ class JestspectationContainer(JestspectationBase, Generic[T]):
         Returns the allowed match types of the container
         """
 
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        return self._get_allowed_types()
+
     def __is_allowed_type(self, other) -> TypeGuard[T]:
         """
         Returns whether other is an allowed type
         """
         return isinstance(other, self._get_allowed_types())
 
+    def _build_lookup(self, other: T) -> Any:
+        """
+        Returns an object used to look up items in the container, which is
+        passed to `_is_present` and `_is_correct` in place of the container.
+
+        This is built once per comparison, so that subclasses can index the
+        container rather than scanning it for every item. By default, the
+        container is used directly.
+        """
+        return other
+
     @abstractmethod
     def _is_present(self, item: object, other: T) -> bool:
         """
@@ -70,7 +93,7 @@ class JestspectationContainer(JestspectationBase, Generic[T]):
         Returns a string representing the missing item. By default this is just
         the repr.
         """
-        return repr(item)
+        return bounded_repr(item)
 
     @abstractmethod
     def _get_items(self) -> T:
@@ -115,44 +138,44 @@ class JestspectationContainer(JestspectationBase, Generic[T]):
             )
         )
 
-    @safe_diff_wrapper
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
+        return list(self.iter_diff(other, other_is_lhs))
+
+    @safe_lazy_diff_wrapper
+    def iter_diff(self, other: object, other_is_lhs: bool) -> Iterator[str]:
         if not self.__is_allowed_type(other):
-            return [
-                "Type mismatch",
-                f"Expected {self}",
-                f"Received object of type {get_object_type_name(other)}",
-            ]
-        misses = self.__get_misses(other)
-        incorrect = self.__get_incorrect(other)
+            yield "Type mismatch"
+            yield f"Expected {self}"
+            yield f"Received object of type {get_object_type_name(other)}"
+            return
+        lookup = self._build_lookup(other)
+        misses = self.__get_misses(lookup)
+        incorrect = self.__get_incorrect(lookup)
         if len(misses) > 0 and len(incorrect) > 0:
-            ret = ["Missing and incorrect properties"]
+            yield "Missing and incorrect properties"
         elif len(misses) > 0:
-            ret = ["Missing properties"]
+            yield "Missing properties"
         else:
             # len(incorrect) > 0
-            ret = ["Incorrect properties"]
-        ret += [f"Expected a {repr(self)}"]
+            yield "Incorrect properties"
+        yield f"Expected a {repr(self)}"
 
-        if len(misses) != 0:
-            ret += [f"-- {self._format_missing_item(i)}" for i in misses]
+        for i in misses:
+            yield f"-- {self._format_missing_item(i)}"
 
-        if len(incorrect) != 0:
-            for i in incorrect:
-                sub_diff = self._format_sub_diff(i, other, other_is_lhs)
-                assert sub_diff is not None
-                # Add a dot point to the first one to make it pretty
-                sub_diff[0] = "!! " + sub_diff[0][3:]
-                ret += sub_diff
-
-        return ret
+        for i in incorrect:
+            sub_diff = self._format_sub_diff(i, other, other_is_lhs)
+            assert sub_diff is not None
+            # Add a dot point to the first one to make it pretty
+            yield from prefix_first_line(sub_diff, "!! ")
 
     def __eq__(self, other: object) -> bool:
         if not self.__is_allowed_type(other):
             return False
+        lookup = self._build_lookup(other)
         return (
-            len(self.__get_misses(other)) == 0
-            and len(self.__get_incorrect(other)) == 0
+            len(self.__get_misses(lookup)) == 0
+            and len(self.__get_incorrect(lookup)) == 0
         )
 
 
@@ -176,8 +199,11 @@ class ListContaining(JestspectationContainer):
         """
         self.__items = items
 
-    def get_contents_repr(self) -> list[str]:
-        return [repr(v) for v in self.__items]
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__items,)
+
+    def get_contents_repr(self) -> Iterable[str]:
+        return (bounded_repr(v) for v in self.__items)
 
     def get_contents_repr_edges(self) -> tuple[str, str]:
         return "[", "]"
@@ -189,7 +215,12 @@ class ListContaining(JestspectationContainer):
     def _get_items(self) -> list:
         return self.__items
 
-    def _is_present(self, item: object, other: list) -> bool:
+    def _build_lookup(self, other: list) -> ItemIndex | PresenceIndex:
+        return index_items(self.__items, other)
+
+    def _is_present(
+        self, item: object, other: ItemIndex | PresenceIndex
+    ) -> bool:
         return item in other
 
 
@@ -209,8 +240,11 @@ class SetContaining(JestspectationContainer):
         """
         self.__items = items
 
-    def get_contents_repr(self) -> list[str]:
-        return [repr(v) for v in self.__items]
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__items,)
+
+    def get_contents_repr(self) -> Iterable[str]:
+        return (bounded_repr(v) for v in self.__items)
 
     def get_contents_repr_edges(self) -> tuple[str, str]:
         return "{", "}"
@@ -242,8 +276,11 @@ class DictContainingKeys(JestspectationContainer):
         """
         self.__keys = keys
 
-    def get_contents_repr(self) -> list[str]:
-        return [repr(v) for v in self.__keys]
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__keys,)
+
+    def get_contents_repr(self) -> Iterable[str]:
+        return (bounded_repr(v) for v in self.__keys)
 
     def get_contents_repr_edges(self) -> tuple[str, str]:
         return "{", "}"
@@ -255,6 +292,16 @@ class DictContainingKeys(JestspectationContainer):
     def _get_items(self) -> set:
         return self.__keys
 
+    def _compile(self) -> Callable[[object], bool]:
+        keys = list(self.__keys)
+
+        def check(other: object) -> bool:
+            if not isinstance(other, dict):
+                return False
+            return all(key in other for key in keys)
+
+        return check
+
     def _is_present(self, item: object, other: set) -> bool:
         return item in other
 
@@ -275,7 +322,10 @@ class ObjectContainingProperties(JestspectationContainer):
         """
         self.__properties = properties
 
-    def get_contents_repr(self) -> list[str]:
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__properties,)
+
+    def get_contents_repr(self) -> Iterable[str]:
         return sorted(self.__properties)
 
     def get_contents_repr_edges(self) -> tuple[str, str]:
@@ -309,8 +359,11 @@ class DictContainingValues(JestspectationContainer):
         """
         self.__values = values
 
-    def get_contents_repr(self) -> list[str]:
-        return [repr(v) for v in self.__values]
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__values,)
+
+    def get_contents_repr(self) -> Iterable[str]:
+        return (bounded_repr(v) for v in self.__values)
 
     def get_contents_repr_edges(self) -> tuple[str, str]:
         return "[", "]"
@@ -322,9 +375,13 @@ class DictContainingValues(JestspectationContainer):
     def _get_items(self) -> list:
         return self.__values
 
-    def _is_present(self, item: object, other: list) -> bool:
-        # TODO: Fix type safety
-        return item in other.values()  # type: ignore
+    def _build_lookup(self, other: dict) -> ItemIndex | PresenceIndex:
+        return index_items(self.__values, other.values())
+
+    def _is_present(
+        self, item: object, other: ItemIndex | PresenceIndex
+    ) -> bool:
+        return item in other
 
 
 class DictContainingItems(JestspectationContainer):
@@ -343,8 +400,14 @@ class DictContainingItems(JestspectationContainer):
         """
         self.__items = items
 
-    def get_contents_repr(self) -> list[str]:
-        return [f"{repr(i[0])}: {repr(i[1])}" for i in self.__items.items()]
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__items,)
+
+    def get_contents_repr(self) -> Iterable[str]:
+        return (
+            f"{bounded_repr(k)}: {bounded_repr(v)}"
+            for k, v in self.__items.items()
+        )
 
     def get_contents_repr_edges(self) -> tuple[str, str]:
         return "{", "}"
@@ -356,6 +419,21 @@ class DictContainingItems(JestspectationContainer):
     def _get_items(self) -> ItemsView:
         return self.__items.items()
 
+    def _compile(self) -> Callable[[object], bool]:
+        checks = [
+            (key, compile_value(value)) for key, value in self.__items.items()
+        ]
+
+        def check(other: object) -> bool:
+            if not isinstance(other, dict):
+                return False
+            for key, check_value in checks:
+                if key not in other or not check_value(other[key]):
+                    return False
+            return True
+
+        return check
+
     def _is_present(self, item: object, other: ItemsView) -> bool:
         # TODO: Use generics to make this type-safe
         return item[0] in other  # type: ignore
@@ -379,7 +457,7 @@ class DictContainingItems(JestspectationContainer):
         )
         assert diff is not None
         self_repr = self._format_missing_item(item)
-        other_repr = f"{repr(item[0])}: {repr(other[item[0]])}"  # type: ignore
+        other_repr = f"{bounded_repr(item[0])}: {bounded_repr(other[item[0]])}"  # type: ignore
         if other_is_lhs:
             eq_expr = f"   {other_repr} == {self_repr}"
         else:
@@ -388,7 +466,7 @@ class DictContainingItems(JestspectationContainer):
 
     def _format_missing_item(self, item: object) -> str:
         # Format like dict keys
-        return f"{repr(item[0])}: {repr(item[1])}"  # type: ignore
+        return f"{bounded_repr(item[0])}: {bounded_repr(item[1])}"  # type: ignore
 
 
 class ObjectContainingItems(JestspectationContainer):
@@ -407,15 +485,14 @@ class ObjectContainingItems(JestspectationContainer):
         """
         self.__items = items
 
-    def __repr__(self) -> str:
-        inners = []
-        for property, value in self.__items.items():
-            inners.append(f"{property} = {value}")
-
-        return f"ObjectContainingItems({', '.join(inners)})"
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__items,)
 
-    def get_contents_repr(self) -> list[str]:
-        return [f"{repr(i[0])} == {repr(i[1])}" for i in self.__items.items()]
+    def get_contents_repr(self) -> Iterable[str]:
+        return (
+            f"{prop} = {bounded_repr(value)}"
+            for prop, value in self.__items.items()
+        )
 
     def get_contents_repr_edges(self) -> tuple[str, str]:
         return "", ""
@@ -451,7 +528,7 @@ class ObjectContainingItems(JestspectationContainer):
         )
         assert diff is not None
         self_repr = self._format_missing_item(item)
-        other_repr = f"{item[0]} = {repr(other_value)}"  # type: ignore
+        other_repr = f"{item[0]} = {bounded_repr(other_value)}"  # type: ignore
         if other_is_lhs:
             eq_expr = f"   {other_repr} == {self_repr}"
         else:
@@ -460,7 +537,7 @@ class ObjectContainingItems(JestspectationContainer):
 
     def _format_missing_item(self, item: object) -> str:
         # Format like dict keys
-        return f"{item[0]} = {repr(item[1])}"  # type: ignore
+        return f"{item[0]} = {bounded_repr(item[1])}"  # type: ignore
 
 
 class ListOfLength(JestspectationBase):
@@ -482,6 +559,9 @@ class ListOfLength(JestspectationBase):
             raise ValueError("List length cannot be < 0")
         self.__length = length
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__length,)
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, list):
             return False
@@ -490,18 +570,22 @@ class ListOfLength(JestspectationBase):
     def __repr__(self) -> str:
         return f"ListOfLength({self.__length})"
 
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        return (list,)
+
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
         if not isinstance(other, list):
             return [
                 "Type mismatch",
                 f"Expected object of type list ({repr(self)})",
-                f"Received object of type {type(other).__name__} ({other})",
+                f"Received object of type {type(other).__name__} "
+                f"({bounded_repr(other)})",
             ]
 
         return [
             "Length failed to match",
             f"Expected list of length {self.__length}",
-            f"Received list of length {len(other)} ({other})",
+            f"Received list of length {len(other)} ({bounded_repr(other)})",
         ]
 
 
@@ -524,78 +608,37 @@ class ListContainingOnly(JestspectationBase):
             items (list): the expected items.
         """
         self.__items = items
-        self.__expected_counts = self.__calc_expected_counts(items)
+        self.__matcher = MultisetMatcher(items)
 
-    @staticmethod
-    def __calc_expected_counts(items: list) -> list[int]:
-        """
-        Calculate the expected count for any type
-        """
-        counts = [0 for _ in items]
-
-        for item in items:
-            idx = items.index(item)
-            counts[idx] += 1
-
-        return counts
-
-    def __actual_counts(self, items: list) -> tuple[list[int], list]:
-        counts = [0 for _ in self.__items]
-
-        unexpected_items = []
-
-        for item in items:
-            try:
-                idx = self.__items.index(item)
-                counts[idx] += 1
-            except ValueError:
-                unexpected_items.append(item)
-
-        return counts, unexpected_items
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__items,)
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, list):
             return False
+        return self.__matcher.is_exact(other)
 
-        actual_counts, unexpected_items = self.__actual_counts(other)
-
-        return (
-            actual_counts == self.__expected_counts
-            and len(unexpected_items) == 0
-        )
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        return (list,)
 
-    @safe_diff_wrapper
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
-        if not isinstance(other, list):
-            return [
-                "Type mismatch",
-                f"Expected object of type list ({repr(self)})",
-                f"Received object of type {type(other).__name__} ({other})",
-            ]
-
-        expected = self.__expected_counts
-
-        counts, unexpected_items = self.__actual_counts(other)
+        return list(self.iter_diff(other, other_is_lhs))
 
-        missing_items = list(
-            map(
-                lambda i: (i[1] - i[0], i[2]),
-                filter(
-                    lambda n: n[0] < n[1],
-                    zip(counts, expected, self.__items, strict=False),
-                ),
+    @safe_lazy_diff_wrapper
+    def iter_diff(self, other: object, other_is_lhs: bool) -> Iterator[str]:
+        if not isinstance(other, list):
+            yield "Type mismatch"
+            yield f"Expected object of type list ({repr(self)})"
+            yield (
+                f"Received object of type {type(other).__name__} "
+                f"({bounded_repr(other)})"
             )
-        )
+            return
 
-        duplicate_items = list(
-            map(
-                lambda i: (i[0] - i[1], i[2]),
-                filter(
-                    lambda n: n[0] > n[1],
-                    zip(counts, expected, self.__items, strict=False),
-                ),
-            )
-        )
+        result = self.__matcher.match(other)
+        missing_items = result.missing
+        duplicate_items = result.duplicate
+        unexpected_items = result.unexpected
 
         info = []
         if len(missing_items):
@@ -609,44 +652,36 @@ class ListContainingOnly(JestspectationBase):
         if len(unexpected_items):
             info.append(f"{len(unexpected_items)} unexpected items")
 
-        info_str = ", ".join(info)
-
-        ret = [info_str, f"Expected a {repr(self)}"]
+        yield ", ".join(info)
+        yield f"Expected a {repr(self)}"
 
         if len(missing_items):
-            ret.append("Missing items:")
-            ret.extend(
-                [
-                    # Only one missing
-                    f"-- {repr(n[1])}"
-                    if n[0] == 1
-                    # Multiple missing, give count
-                    else f"-- {n[0]} * {repr(n[1])}"
-                    for n in missing_items
-                ]
-            )
+            yield "Missing items:"
+            for count, item in missing_items:
+                # Give a count if there are multiple missing
+                yield (
+                    f"-- {bounded_repr(item)}"
+                    if count == 1
+                    else f"-- {count} * {bounded_repr(item)}"
+                )
 
         if len(duplicate_items):
-            ret.append("Duplicate items:")
-            ret.extend(
-                [
-                    # Only one duplicate
-                    f"++ {repr(n[1])}"
-                    if n[0] == 1
-                    # Multiple duplicate, give count
-                    else f"++ {n[0]} * {repr(n[1])}"
-                    for n in duplicate_items
-                ]
-            )
+            yield "Duplicate items:"
+            for count, item in duplicate_items:
+                # Give a count if there are multiple duplicates
+                yield (
+                    f"++ {bounded_repr(item)}"
+                    if count == 1
+                    else f"++ {count} * {bounded_repr(item)}"
+                )
 
         if len(unexpected_items):
-            ret.append("Unexpected items:")
-            ret.extend([f"!! {repr(item)}" for item in unexpected_items])
-
-        return ret
+            yield "Unexpected items:"
+            for item in unexpected_items:
+                yield f"!! {bounded_repr(item)}"
 
-    def get_contents_repr(self) -> list[str]:
-        return [repr(item) for item in self.__items]
+    def get_contents_repr(self) -> Iterable[str]:
+        return (bounded_repr(item) for item in self.__items)
 
     def get_contents_repr_edges(self) -> tuple[str, str]:
         return "[", "]"
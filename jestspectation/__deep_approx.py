@@ -0,0 +1,232 @@
+"""
+Matcher for nested data containing numbers of approximate value
+"""
+
+from collections.abc import Iterator
+from functools import partial
+
+from .__array_approx import all_close
+from .__diff_engine import DiffStart, DiffSteps, SubDiff, run_diff
+from .__jestspectation_base import JestspectationBase
+from .__py_diffs import start_diff
+from .__util import bounded_repr, eq_expr_str, get_object_type_name
+
+_NUMBER_TYPES = {int, float}
+"""
+Exact types of numbers that are compared approximately
+"""
+
+
+def _is_number(value: object) -> bool:
+    # Exclude bools, which are ints, but shouldn't be close to anything
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_type_mismatch(expected: object, received: object) -> bool:
+    # Numbers only match other numbers, and bools are never equal to numbers,
+    # in either direction
+    if _is_number(expected):
+        return not _is_number(received)
+    return isinstance(expected, bool) and _is_number(received)
+
+
+def _all_numbers(values: list | tuple) -> bool:
+    # Checking the set of types doesn't call any Python code for each value
+    return set(map(type, values)) <= _NUMBER_TYPES
+
+
+def _item_steps(
+    matcher: list | tuple,
+    other: list | tuple,
+    other_is_lhs: bool,
+) -> DiffSteps:
+    """
+    Steps to diff two lists or tuples of the same length item by item, in
+    the same way that they are compared, rather than aligning them using
+    `==`, which considers bools and numbers to be equal
+    """
+    for i, (m, o) in enumerate(zip(matcher, other, strict=True)):
+        if m is not o:
+            yield SubDiff(m, o, other_is_lhs, f"!! [{i}] ")
+
+
+class DeepApprox(JestspectationBase):
+    """
+    Nested data with numbers approximately equal
+    """
+
+    def __init__(
+        self,
+        value: object,
+        magnitude: float | None = None,
+        percent: float | None = None,
+    ) -> None:
+        """
+        Nested data with numbers approximately equal.
+
+        Dicts, lists and tuples are compared item by item, and numbers within
+        them match if they are within the tolerance of the expected number.
+        All other values must be equal. This is much faster than wrapping
+        every number in a `FloatApprox`.
+
+        Args:
+            value (object): target value.
+            magnitude (Optional[float], optional): maximum magnitude
+                difference of each number. Defaults to None.
+            percent (Optional[float], optional): maximum percentage difference
+                of each number. Percentage differences are always calculated
+                based on the expected value, regardless of ordering, so
+                expected values of 0 must match exactly. Defaults to None.
+
+        Raises:
+            ValueError: At least one of magnitude or percent must be specified
+        """
+        if magnitude is None and percent is None:
+            raise ValueError("One of magnitude or percent must be specified")
+        if magnitude is not None and percent is not None:
+            raise ValueError(
+                "Only one of magnitude or percent can be specified"
+            )
+        self.__value = value
+        self.__magnitude = magnitude
+        self.__percent = percent
+
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__value, self.__magnitude, self.__percent)
+
+    def __tolerance_str(self) -> str:
+        if self.__percent is None:
+            return f"magnitude={self.__magnitude}"
+        return f"percent={self.__percent}"
+
+    def __repr__(self) -> str:
+        return (
+            f"DeepApprox({bounded_repr(self.__value)}, "
+            f"{self.__tolerance_str()})"
+        )
+
+    def __is_close(self, expected: float, received: float) -> bool:
+        if self.__magnitude is not None:
+            tolerance = self.__magnitude
+        else:
+            assert self.__percent is not None
+            tolerance = abs(expected) * self.__percent / 100
+        # Written this way so that NaNs are never close
+        return abs(received - expected) <= tolerance
+
+    def __eq__(self, other: object) -> bool:
+        stack = [(self.__value, other)]
+        # Pairs of containers that have already been compared, so that
+        # self-referential structures don't loop forever
+        seen: set[tuple[int, int]] = set()
+
+        while stack:
+            expected, received = stack.pop()
+            if expected is received:
+                continue
+
+            if _is_type_mismatch(expected, received):
+                return False
+            if _is_number(expected):
+                if not self.__is_close(expected, received):  # type: ignore
+                    return False
+                continue
+
+            if isinstance(expected, (dict, list, tuple)):
+                if not (
+                    isinstance(received, type(expected))
+                    or isinstance(expected, type(received))
+                ):
+                    return False
+                key = (id(expected), id(received))
+                if key in seen:
+                    continue
+                seen.add(key)
+
+            if isinstance(expected, dict):
+                if expected.keys() != received.keys():  # type: ignore
+                    return False
+                stack.extend(
+                    (v, received[k])  # type: ignore
+                    for k, v in expected.items()
+                )
+            elif isinstance(expected, (list, tuple)):
+                items: list | tuple = received  # type: ignore
+                if len(expected) != len(items):
+                    return False
+                # Lists of numbers are compared all at once
+                if _all_numbers(expected) and _all_numbers(items):
+                    if not all_close(
+                        expected, items, self.__magnitude, self.__percent
+                    ):
+                        return False
+                else:
+                    stack.extend(zip(expected, items, strict=True))
+            elif expected != received:
+                return False
+
+        return True
+
+    def __start_diff(
+        self,
+        matcher: object,
+        other: object,
+        other_is_lhs: bool,
+    ) -> DiffStart:
+        """
+        Returns how to diff a pair of objects, comparing numbers
+        approximately, and everything else using the usual diffs
+        """
+        header = partial(eq_expr_str, matcher, other, other_is_lhs)
+        if matcher is not other and _is_type_mismatch(matcher, other):
+            # Checked here, since the usual diff considers bools and numbers
+            # to be equal
+            return DiffStart(
+                iter(
+                    [
+                        "Type mismatch",
+                        f"Expected {bounded_repr(matcher)} "
+                        f"({get_object_type_name(matcher)})",
+                        f"Received {bounded_repr(other)} "
+                        f"({get_object_type_name(other)})",
+                    ]
+                ),
+                header,
+            )
+        if (
+            type(matcher) in (list, tuple)
+            and type(other) is type(matcher)
+            and len(matcher) == len(other)  # type: ignore
+        ):
+            return DiffStart(
+                _item_steps(matcher, other, other_is_lhs),  # type: ignore
+                header,
+                memoize=True,
+            )
+        if not (_is_number(matcher) and _is_number(other)):
+            return start_diff(matcher, other, other_is_lhs)
+        if matcher is other or self.__is_close(matcher, other):  # type: ignore
+            return DiffStart(iter(()))
+        return DiffStart(
+            iter(
+                [
+                    "Value out of range",
+                    f"Expected {bounded_repr(matcher)} "
+                    f"({self.__tolerance_str()})",
+                    f"Received {bounded_repr(other)}",
+                ]
+            ),
+            header,
+        )
+
+    def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
+        return list(self.iter_diff(other, other_is_lhs))
+
+    def iter_diff(self, other: object, other_is_lhs: bool) -> Iterator[str]:
+        yield from run_diff(
+            self.__start_diff,
+            self.__value,
+            other,
+            other_is_lhs,
+            "",
+        )
@@ -0,0 +1,439 @@
+"""
+Diff engine
+
+Iterative engine for calculating diffs of nested objects.
+
+Diffs of built-in values are calculated by steps, which are generators that
+yield lines of the diff, and requests to diff pairs of child objects. Rather
+than recursing into each child, the engine keeps an explicit stack of the
+steps that are in progress, so that diffs of arbitrarily deep structures
+can be calculated without exceeding the recursion limit, and so that each
+line is indented and prefixed once, rather than once per level of nesting.
+
+Pairs of containers are memoized by identity for the length of a diff, so
+that shared sub-objects are only diffed once, and self-referential
+structures are diffed without recursing forever.
+"""
+
+from collections.abc import Callable, Generator, Iterator
+from dataclasses import dataclass
+
+
+@dataclass
+class SubDiff:
+    """
+    Request to diff a pair of child objects. Lines of the sub-diff are
+    indented within the lines of the parent.
+    """
+
+    matcher: object
+    """Expected child object"""
+    other: object
+    """Received child object"""
+    other_is_lhs: bool
+    """Whether the received object is on the left-hand side"""
+    prefix: str | None = None
+    """
+    Dot point to replace the indent of the first line of the sub-diff, such as
+    `"!! [0] "`
+    """
+
+
+@dataclass
+class Probe:
+    """
+    Request to start diffing a pair of child objects, without producing any
+    lines yet.
+
+    The step is sent `None` if the objects are equal, or otherwise a
+    `Suspended` sub-diff, which it can later continue using `Resume`. This
+    allows a step to determine which children differ before deciding what
+    order to show them in.
+    """
+
+    sub_diff: SubDiff
+    """The pair of objects to diff"""
+
+
+@dataclass
+class Suspended:
+    """
+    A sub-diff that was started by a `Probe`, and was stopped after producing
+    its first line
+    """
+
+    frames: list["_Frame"]
+    """The stack of steps that were in progress"""
+    lines: list[str]
+    """The lines that were produced"""
+    soft: bool = False
+    """
+    Whether the lines are soft, meaning that the objects are equal, but the
+    lines should be shown if the parent has other differences
+    """
+
+
+@dataclass
+class Resume:
+    """
+    Request to continue a suspended sub-diff, producing all of its lines
+    """
+
+    suspended: Suspended
+    """The sub-diff to continue"""
+
+
+@dataclass
+class Soft:
+    """
+    A line that doesn't indicate a difference by itself, and so is only shown
+    if the diff it is part of has other differences
+    """
+
+    line: str
+    """The line"""
+
+
+DiffStep = str | Soft | SubDiff | Probe | Resume
+"""
+Item yielded by diff steps, either a line of the diff, or a request to the
+engine
+"""
+
+DiffSteps = Generator[DiffStep, "Suspended | None", None] | Iterator[DiffStep]
+"""
+Steps to calculate a diff. Steps that never make a `Probe` can be any
+iterator
+"""
+
+
+@dataclass
+class DiffStart:
+    """
+    How to diff a pair of objects
+    """
+
+    steps: DiffSteps
+    """Steps to diff the objects"""
+    header: Callable[[], str] | None = None
+    """
+    Function to get an equality statement to show before the first line,
+    which is only called if any lines are produced
+    """
+    memoize: bool = False
+    """
+    Whether the result should be memoized by the identities of the objects.
+    This must be set for containers that could contain themselves.
+    """
+
+
+Starter = Callable[[object, object, bool], DiffStart]
+"""
+Function that returns how to diff a pair of objects
+"""
+
+_NOT_ASSUMED = 1 << 62
+"""
+Value of `_Frame.assumes` when no pairs were assumed to be equal
+"""
+
+
+class _Frame:
+    """
+    Diff steps in progress
+    """
+
+    __slots__ = (
+        "steps",
+        "header",
+        "indent",
+        "prefix",
+        "prefix_pos",
+        "started",
+        "probe",
+        "soft",
+        "soft_to_parent",
+        "key",
+        "depth",
+        "assumes",
+        "active",
+    )
+
+    def __init__(
+        self,
+        steps: DiffSteps,
+        header: Callable[[], str] | None,
+        indent: str,
+        prefix: str | None,
+        prefix_pos: int,
+        probe: bool,
+        depth: int,
+    ) -> None:
+        self.steps = steps
+        self.header = header
+        """Gets the line to show before the first line of the sub-diff"""
+        self.indent = indent
+        """Indent of all lines produced by the steps"""
+        self.prefix = prefix
+        """Replacement for the parent's indent on the first line"""
+        self.prefix_pos = prefix_pos
+        """Position of the indent to replace with the prefix"""
+        self.started = False
+        """Whether any lines of the sub-diff have been produced"""
+        self.probe = probe
+        """Whether to suspend the sub-diff when it produces its first line"""
+        self.soft: list[str] = []
+        """Soft lines produced before the sub-diff started"""
+        self.soft_to_parent = False
+        """
+        Whether soft lines should be given to the parent if the sub-diff never
+        starts, rather than being discarded
+        """
+        self.key: tuple[int, int] | None = None
+        """Key of the pair of objects in the memo, if memoized"""
+        self.depth = depth
+        """Position of the frame in the stack"""
+        self.assumes = _NOT_ASSUMED
+        """
+        Depth of the outermost frame whose objects were assumed to be equal
+        when they were reached again from within this sub-diff
+        """
+        self.active = True
+        """Whether the frame is on the stack, rather than suspended"""
+
+
+def _first_unstarted(stack: list[_Frame], end: int) -> int:
+    """
+    Returns the index of the outermost frame before `end` that hasn't produced
+    any lines. Frames only start once all their parents have started.
+    """
+    i = end
+    while i > 0 and not stack[i - 1].started:
+        i -= 1
+    return i
+
+
+def _apply_prefixes(pending: list[tuple[int, str]], line: str) -> str:
+    """
+    Apply the given prefixes to a line, clearing the list of prefixes
+    """
+    # Apply the innermost prefix first, since it is further right
+    for pos, prefix in reversed(pending):
+        line = line[:pos] + prefix + line[pos + 3 :]
+    pending.clear()
+    return line
+
+
+def _start_frames(stack: list[_Frame], begin: int, line: str) -> list[str]:
+    """
+    Mark the frames from `begin` as started, returning their headers and soft
+    lines followed by the given line, with the prefix of each frame applied
+    to its first line.
+    """
+    ret = []
+    # Positions and prefixes of frames whose first line hasn't been produced
+    # yet, innermost last
+    pending: list[tuple[int, str]] = []
+
+    for frame in stack[begin:]:
+        if frame.started:
+            continue
+        frame.started = True
+        if frame.prefix is not None:
+            pending.append((frame.prefix_pos, frame.prefix))
+        if frame.header is not None:
+            ret.append(_apply_prefixes(pending, frame.indent + frame.header()))
+        for soft in frame.soft:
+            ret.append(_apply_prefixes(pending, soft))
+        frame.soft = []
+    ret.append(_apply_prefixes(pending, line))
+    return ret
+
+
+def run_diff(
+    start: Starter,
+    matcher: object,
+    other: object,
+    other_is_lhs: bool,
+    indent: str,
+) -> Iterator[str]:
+    """
+    Lazily calculate the diff between two objects, yielding no lines if they
+    are equal.
+
+    Args:
+        start (Starter): function to get the steps to diff each pair of
+            objects
+        matcher (object): expected object
+        other (object): received object
+        other_is_lhs (bool): whether the received object is on the left-hand
+            side
+        indent (str): indent for all lines of the diff
+    """
+    stack: list[_Frame] = []
+    # Memoized pairs of objects, mapping to the frame diffing them if they're
+    # in progress, or whether they're equal if they're finished
+    memo: dict[tuple[int, int], _Frame | bool] = {}
+    # References to the memoized objects, which keep them alive for the
+    # whole diff, so that their ids can't be reused by other objects, such
+    # as values that are created on the fly by a custom mapping
+    memoized: list[tuple[object, object]] = []
+
+    def new_frame(request: SubDiff, probe: bool) -> _Frame:
+        if stack:
+            parent_indent = stack[-1].indent
+            child_indent = parent_indent + "   "
+        else:
+            parent_indent = ""
+            child_indent = indent
+        how = start(request.matcher, request.other, request.other_is_lhs)
+        steps = how.steps
+        header = how.header
+        key = None
+        soft_to_parent = False
+
+        if how.memoize:
+            key = (id(request.matcher), id(request.other))
+            state = memo.get(key)
+            if state is None:
+                pass
+            elif isinstance(state, _Frame):
+                if state.active:
+                    # We've reached the objects again from within their own
+                    # diff, so assume that they're equal. If they aren't,
+                    # the differences are shown in the outer diff.
+                    line = f"{header()} (recursive reference)"  # type: ignore
+                    steps = iter([Soft(line)])
+                    soft_to_parent = True
+                    stack[-1].assumes = min(stack[-1].assumes, state.depth)
+                    header = None
+                # Otherwise, the objects are being diffed in a suspended
+                # sub-diff, so we need to diff them again
+                key = None
+            elif state:
+                steps = iter(())
+                header = None
+                key = None
+            else:
+                # Show a reference to the differences that were found before
+                line = f"{header()} (same objects as above)"  # type: ignore
+                steps = iter([line])
+                header = None
+                key = None
+
+        frame = _Frame(
+            steps,
+            header,
+            child_indent,
+            request.prefix,
+            len(parent_indent),
+            probe,
+            len(stack),
+        )
+        frame.soft_to_parent = soft_to_parent
+        if key is not None:
+            frame.key = key
+            memo[key] = frame
+            memoized.append((request.matcher, request.other))
+        return frame
+
+    def finish(frame: _Frame) -> Suspended | None:
+        """
+        Record the result of the frame after it is removed from the stack,
+        and return what to send to its parent
+        """
+        frame.active = False
+        if frame.key is not None:
+            if frame.started:
+                memo[frame.key] = False
+            elif frame.assumes >= frame.depth:
+                # Any pairs that were assumed to be equal were within this
+                # diff, so the result is known
+                memo[frame.key] = True
+            else:
+                # The result depends on whether an outer pair is equal
+                del memo[frame.key]
+        if stack:
+            stack[-1].assumes = min(stack[-1].assumes, frame.assumes)
+
+        if frame.started or not (frame.soft and frame.soft_to_parent):
+            return None
+        frame.soft[0] = _apply_prefixes(
+            [(frame.prefix_pos, frame.prefix)] if frame.prefix else [],
+            frame.soft[0],
+        )
+        if frame.probe:
+            return Suspended([], frame.soft, soft=True)
+        if stack:
+            stack[-1].soft.extend(frame.soft)
+        return None
+
+    stack.append(new_frame(SubDiff(matcher, other, other_is_lhs), False))
+    # Value to send to the steps at the top of the stack
+    sent: Suspended | None = None
+
+    while stack:
+        frame = stack[-1]
+        try:
+            if sent is None:
+                step = next(frame.steps)
+            else:
+                step = frame.steps.send(sent)  # type: ignore
+        except StopIteration:
+            stack.pop()
+            sent = finish(frame)
+            # Soft lines given to a parent that has already started
+            if stack and stack[-1].started and stack[-1].soft:
+                yield from stack[-1].soft
+                stack[-1].soft = []
+            continue
+        sent = None
+
+        if isinstance(step, str):
+            line = frame.indent + step
+            if frame.started:
+                yield line
+                continue
+            begin = _first_unstarted(stack, len(stack) - 1)
+            # If this is the first line of a probed sub-diff, suspend it
+            probe = len(stack) - 1
+            while probe >= begin and not stack[probe].probe:
+                probe -= 1
+            if probe >= begin:
+                lines = _start_frames(stack, probe, line)
+                sent = Suspended(stack[probe:], lines)
+                for suspended_frame in stack[probe:]:
+                    suspended_frame.active = False
+                del stack[probe:]
+            else:
+                yield from _start_frames(stack, begin, line)
+
+        elif isinstance(step, Soft):
+            line = frame.indent + step.line
+            if frame.started:
+                yield line
+            else:
+                frame.soft.append(line)
+
+        elif isinstance(step, SubDiff):
+            stack.append(new_frame(step, False))
+
+        elif isinstance(step, Probe):
+            stack.append(new_frame(step.sub_diff, True))
+
+        else:
+            suspended = step.suspended
+            if suspended.soft:
+                if frame.started:
+                    yield from suspended.lines
+                else:
+                    frame.soft.extend(suspended.lines)
+                continue
+            begin = _first_unstarted(stack, len(stack))
+            first, *rest = suspended.lines
+            lines = _start_frames(stack, begin, first)
+            for suspended_frame in suspended.frames:
+                suspended_frame.active = True
+            stack.extend(suspended.frames)
+            yield from lines
+            yield from rest
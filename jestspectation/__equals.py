@@ -4,8 +4,12 @@ Equals
 Matches for types of equality
 """
 
+from collections.abc import Callable, Iterator
+
 from .__jestspectation_base import JestspectationBase
-from .__util import sub_diff_delegate
+from .__session import diff_session
+from .__util import bounded_repr, iter_sub_diff
+from .__validators import compile_value
 
 
 class Is(JestspectationBase):
@@ -28,20 +32,28 @@ class Is(JestspectationBase):
         """
         self.__value = value
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__value,)
+
     def __repr__(self) -> str:
-        return f"Is({self.__value})"
+        return f"Is({bounded_repr(self.__value)})"
 
     def __eq__(self, other: object) -> bool:
         return self.__value is other
 
+    def _compile(self) -> Callable[[object], bool]:
+        value = self.__value
+        return lambda other: value is other
+
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
         # Give a more helpful error if the objects are equal but have different
         # identities
         return [
-            f"{repr(self.__value)} is {repr(other)}",
+            f"{bounded_repr(self.__value)} is {bounded_repr(other)}",
             "Object identities not equal",
-            f"Expected {repr(self.__value)} with id {id(self.__value)}",
-            f"Received {repr(other)} with id {id(other)}",
+            f"Expected {bounded_repr(self.__value)} "
+            f"with id {id(self.__value)}",
+            f"Received {bounded_repr(other)} with id {id(other)}",
         ] + (
             [
                 "Note that although these values are equal, they have "
@@ -73,20 +85,43 @@ class Equals(JestspectationBase):
         """
         self.__value = value
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__value,)
+
     def __repr__(self) -> str:
-        return f"Equals({self.__value})"
+        return f"Equals({bounded_repr(self.__value)})"
 
     def __eq__(self, other: object) -> bool:
-        return self.__value == other
+        try:
+            return self.__value == other
+        except RecursionError:
+            # Self-referential values can't be compared by Python, so compare
+            # them by searching for a difference instead
+            with diff_session():
+                diff = iter_sub_diff(self.__value, other, False)
+                return next(diff, None) is None
+
+    def _compile(self) -> Callable[[object], bool]:
+        try:
+            check = compile_value(self.__value)
+        except RecursionError:
+            return self.__eq__
+
+        def check_equal(other: object) -> bool:
+            try:
+                return check(other)
+            except RecursionError:
+                return self.__eq__(other)
+
+        return check_equal
 
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
-        # Give a more helpful error if the objects are equal but have different
-        # identities
-        diff = sub_diff_delegate(
+        return list(self.iter_diff(other, other_is_lhs))
+
+    def iter_diff(self, other: object, other_is_lhs: bool) -> Iterator[str]:
+        yield from iter_sub_diff(
             self.__value,
             other,
             other_is_lhs,
             indent=False,
         )
-        assert diff is not None
-        return diff
@@ -4,6 +4,7 @@ Matcher for floats of approximate value
 
 
 from .__jestspectation_base import JestspectationBase
+from .__util import bounded_repr
 
 
 class FloatApprox(JestspectationBase):
@@ -46,6 +47,9 @@ class FloatApprox(JestspectationBase):
         self.__magnitude = magnitude
         self.__percent = percent
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__value, self.__magnitude, self.__percent)
+
     def boundary_width(self) -> float:
         """
         Returns the width of the boundary with the float.
@@ -82,6 +86,9 @@ class FloatApprox(JestspectationBase):
                 return False
         return True
 
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        return (int, float)
+
     def get_diff(self, other, other_is_lhs: bool) -> list[str]:
         if not isinstance(other, (int, float)):
             head = "Type mismatch"
@@ -89,11 +96,11 @@ class FloatApprox(JestspectationBase):
         elif other < self.__value:
             lower = self.__value - self.boundary_width()
             head = "Value out of range"
-            err = f"{repr(other)} is outside lower bound ({lower})"
+            err = f"{bounded_repr(other)} is outside lower bound ({lower})"
         else:
             upper = self.__value + self.boundary_width()
             head = "Value out of range"
-            err = f"{repr(other)} is outside upper bound ({upper})"
+            err = f"{bounded_repr(other)} is outside upper bound ({upper})"
         return [
             head,
             f"Expected {self}",
@@ -22,8 +22,15 @@ from .__containers import (
     ObjectContainingProperties,
     SetContaining,
 )
+from .__iterables import (
+    IterableContaining,
+    IterableEquals,
+    IterableOfLength,
+)
 from .__equals import Equals, Is
 from .__float_approx import FloatApprox
+from .__array_approx import ArrayApprox
+from .__deep_approx import DeepApprox
 from .__strings import (
     LinesLike,
     StringContaining,
@@ -32,7 +39,10 @@ from .__strings import (
 )
 from .logicals import And, Not, Or, Xor
 from .__assert import assert_eq
+from .__py_diffs import register_diff
 from .__config import configure
+from .__compile import compile
+from .__match_many import match_many
 
 __version__ = importlib.metadata.version("jestspectation")
 
@@ -40,23 +50,31 @@ __all__ = [
     "And",
     "Any",
     "Anything",
+    "ArrayApprox",
     "assert_eq",
     "JestspectationBase",
+    "compile",
     "configure",
+    "DeepApprox",
     "DictContainingKeys",
     "DictContainingValues",
     "DictContainingItems",
     "Equals",
     "FloatApprox",
     "Is",
+    "IterableContaining",
+    "IterableEquals",
+    "IterableOfLength",
     "LinesLike",
     "ListContaining",
     "ListContainingOnly",
     "ListOfLength",
+    "match_many",
     "Not",
     "ObjectContainingProperties",
     "ObjectContainingItems",
     "Or",
+    "register_diff",
     "SetContaining",
     "StringContaining",
     "StringMatchingRegex",
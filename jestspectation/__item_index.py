@@ -0,0 +1,144 @@
+"""
+Item index
+
+Hash-based lookup of items in a collection, used to avoid repeated linear
+scans when matching containers.
+"""
+
+from collections.abc import Collection, Iterable, Sequence
+
+from .__jestspectation_base import JestspectationBase
+from .__parallel import iter_chunks, run_parallel, use_parallel
+
+
+def is_hashable_value(item: object) -> bool:
+    """
+    Returns whether the given item can be looked up by its hash.
+
+    Matchers are never treated as hashable values, as their equality is not
+    consistent with any hash.
+    """
+    if isinstance(item, JestspectationBase):
+        return False
+    try:
+        hash(item)
+    except TypeError:
+        return False
+    return True
+
+
+class ItemIndex:
+    """
+    Index of a sequence of items, which finds the position of the first item
+    equal to some value.
+
+    Hashable items are found using a dict lookup. Unhashable items and
+    matchers are checked using a linear scan, which is the same behaviour as
+    `list.index`. This assumes that hashable items have a `__hash__` that is
+    consistent with their `__eq__`.
+    """
+
+    def __init__(self, items: Iterable) -> None:
+        """
+        Build an index of the given items.
+
+        Args:
+            items (Iterable): items to index. These are only iterated once.
+        """
+        self.__items: list = []
+        self.__positions: dict = {}
+        self.__fallback: list[tuple[int, object]] = []
+
+        for i, item in enumerate(items):
+            self.__items.append(item)
+            if is_hashable_value(item):
+                self.__positions.setdefault(item, i)
+            else:
+                self.__fallback.append((i, item))
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def find(self, value: object) -> int | None:
+        """
+        Returns the position of the first indexed item that is equal to the
+        given value, or `None` if there are no such items.
+        """
+        if not is_hashable_value(value):
+            # Unhashable values (or matchers) could equal anything, so we need
+            # to check every item. Identity is checked first, just like
+            # `list.index`
+            for i, item in enumerate(self.__items):
+                if item is value or item == value:
+                    return i
+            return None
+
+        hit = self.__positions.get(value)
+        # An unhashable item earlier in the list might match first
+        for i, item in self.__fallback:
+            if hit is not None and i > hit:
+                break
+            if item is value or item == value:
+                return i
+        return hit
+
+    def __contains__(self, value: object) -> bool:
+        # We don't care about the position, so any hash hit will do
+        if is_hashable_value(value) and value in self.__positions:
+            return True
+        return self.find(value) is not None
+
+
+def _find_present(task: tuple[list, Sequence]) -> list[bool]:
+    """
+    Returns which of the values are equal to an item in the chunk
+    """
+    values, chunk = task
+    index = ItemIndex(chunk)
+    return [value in index for value in values]
+
+
+class PresenceIndex:
+    """
+    Index of which of a known list of values are equal to some item in a
+    collection, which is split into chunks that are checked in parallel.
+
+    Only the given values can be looked up, and they are looked up by
+    identity, since the comparisons were already done by the workers.
+    """
+
+    def __init__(self, values: Iterable, items: Sequence) -> None:
+        """
+        Check which of the values are in the items.
+
+        Args:
+            values (Iterable): values that will be looked up
+            items (Sequence): items to check the values against
+        """
+        # Keep a reference to the values, so that their ids aren't reused
+        self.__values = list(values)
+        present = [False] * len(self.__values)
+        tasks = ((self.__values, chunk) for _, chunk in iter_chunks(items))
+        for found in run_parallel(_find_present, tasks):
+            present = [a or b for a, b in zip(present, found, strict=True)]
+        self.__present = {
+            id(value)
+            for value, is_present in zip(self.__values, present, strict=True)
+            if is_present
+        }
+
+    def __contains__(self, value: object) -> bool:
+        return id(value) in self.__present
+
+
+def index_items(
+    values: Iterable, items: Collection
+) -> ItemIndex | PresenceIndex:
+    """
+    Returns an index that can be used to check whether each of the values is
+    equal to some item. The items are checked in parallel if there are
+    enough of them, as configured by `parallel_threshold`.
+    """
+    if use_parallel(len(items)):
+        return PresenceIndex(values, list(items))
+    return ItemIndex(items)
@@ -0,0 +1,378 @@
+"""
+Matchers for iterables, which consume them as a stream
+
+Unlike the list matchers, these match any iterable, including generators,
+consuming each item once, and stopping as soon as the result is known. Only
+a bounded sample of the received items is kept, to be shown in diffs.
+
+Iterators can only be consumed once, so the result of comparing a matcher to
+an iterator is remembered, so that its diff can still be shown afterwards.
+The iterator itself is only weakly referenced where possible, so that a
+long-lived matcher doesn't keep a consumed generator alive.
+"""
+
+import weakref
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+
+from .__item_index import is_hashable_value
+from .__jestspectation_base import JestspectationBase
+from .__util import (
+    bounded_repr,
+    get_object_type_name,
+    prefix_first_line,
+    sub_diff_delegate,
+)
+
+SAMPLE_SIZE = 5
+"""
+Number of received items to keep, to be shown in diffs
+"""
+
+CONTEXT_SIZE = 3
+"""
+Number of items before the first difference between two iterables to keep,
+to be shown in diffs
+"""
+
+_END = object()
+"""
+Placeholder for the item after the end of an iterable
+"""
+
+
+@dataclass
+class _Stream:
+    """
+    Items consumed from an iterable
+    """
+
+    count: int = 0
+    """Number of items consumed"""
+    sample: list = field(default_factory=list)
+    """The first items consumed"""
+    exhausted: bool = False
+    """Whether every item was consumed"""
+
+    def consume(self, items: Iterator) -> Iterator:
+        """
+        Yields items from the iterator, recording them as they are consumed
+        """
+        for item in items:
+            self.count += 1
+            if len(self.sample) < SAMPLE_SIZE:
+                self.sample.append(item)
+            yield item
+        self.exhausted = True
+
+    def describe(self) -> str:
+        """
+        Description of the items that were consumed
+        """
+        count = f"{self.count}" if self.exhausted else f"at least {self.count}"
+        items = ", ".join(bounded_repr(item) for item in self.sample)
+        if self.count > len(self.sample):
+            items += ", ..."
+        return f"{count} items [{items}]"
+
+
+def _reference(obj: object) -> Callable[[], object]:
+    """
+    Returns a weak reference to an object, or a strong reference if it
+    doesn't support weak references, such as iterators over lists
+    """
+    try:
+        return weakref.ref(obj)
+    except TypeError:
+        return lambda: obj
+
+
+def _iterate(other: object) -> Iterator | None:
+    """
+    Returns an iterator over an object, or `None` if it can't be matched as
+    an iterable. Strings are excluded, since they are rarely meant as a
+    collection of characters.
+    """
+    if isinstance(other, (str, bytes)) or not isinstance(other, Iterable):
+        return None
+    return iter(other)
+
+
+class _StreamMatcher(JestspectationBase):
+    """
+    Base type for matchers that consume iterables as a stream
+    """
+
+    __last: tuple[Callable[[], object], object] | None = None
+    """
+    A reference to the last iterator that was compared, and the result of
+    the comparison. Other iterables can be iterated again, so their results
+    aren't kept.
+    """
+
+    def _match(self, items: Iterator, stream: _Stream) -> object:
+        """
+        Consume items from the stream, returning the result of the match,
+        which is falsy if the items match
+        """
+        raise NotImplementedError()
+
+    def _get_result(self, other: object) -> tuple[_Stream, object] | None:
+        """
+        Returns the stream and the result of matching the given object, or
+        `None` if it isn't an iterable
+        """
+        if self.__last is not None:
+            last = self.__last[0]()
+            # A dead weak reference gives `None`, which mustn't be mistaken
+            # for the iterator
+            if last is None:
+                self.__last = None
+            elif last is other:
+                return self.__last[1]  # type: ignore
+        items = _iterate(other)
+        if items is None:
+            return None
+        stream = _Stream()
+        result = (stream, self._match(stream.consume(items), stream))
+        # Iterators can't be consumed again, so remember the result
+        self.__last = (_reference(other), result) if items is other else None
+        return result
+
+    def __eq__(self, other: object) -> bool:
+        result = self._get_result(other)
+        return result is not None and not result[1]
+
+    def _type_mismatch(self, other: object) -> list[str]:
+        return [
+            "Type mismatch",
+            f"Expected iterable ({repr(self)})",
+            f"Received object of type {get_object_type_name(other)} "
+            f"({bounded_repr(other)})",
+        ]
+
+
+class IterableContaining(_StreamMatcher):
+    """
+    Matches any iterable containing at least all the given items, in any
+    order, consuming it as a stream.
+    """
+
+    def __init__(self, items: list) -> None:
+        """
+        Matches any iterable containing at least all the given items, in any
+        order. Additional items are ignored.
+
+        The iterable is only consumed until every item is found, and only a
+        small sample of its items is kept, so this can be used to check
+        generators that are too large to fit in memory.
+
+        Compare with [`ListContaining`][listcontaining].
+
+        Args:
+            items (list): items to check for
+        """
+        self.__items = items
+
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__items,)
+
+    def get_contents_repr(self) -> Iterable[str]:
+        return (bounded_repr(v) for v in self.__items)
+
+    def get_contents_repr_edges(self) -> tuple[str, str]:
+        return "[", "]"
+
+    def _match(self, items: Iterator, stream: _Stream) -> list:
+        # Positions of the items that haven't been found yet. Hashable items
+        # are found using a dict lookup, and the others are compared against
+        # every received item
+        by_value: dict[object, list[int]] = {}
+        unhashable: list[int] = []
+        for i, item in enumerate(self.__items):
+            if is_hashable_value(item):
+                by_value.setdefault(item, []).append(i)
+            else:
+                unhashable.append(i)
+
+        # Stop as soon as every item is found
+        if by_value or unhashable:
+            for received in items:
+                if is_hashable_value(received):
+                    by_value.pop(received, None)
+                else:
+                    # Unhashable items could equal anything
+                    for value in list(by_value):
+                        if received == value:
+                            del by_value[value]
+                for i in list(unhashable):
+                    expected = self.__items[i]
+                    if received is expected or received == expected:
+                        unhashable.remove(i)
+                if not (by_value or unhashable):
+                    break
+
+        return [
+            self.__items[i]
+            for i in sorted(
+                [i for found in by_value.values() for i in found] + unhashable
+            )
+        ]
+
+    def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
+        result = self._get_result(other)
+        if result is None:
+            return self._type_mismatch(other)
+        stream, missing = result
+        return [
+            "Missing items",
+            f"Expected a {repr(self)}",
+            f"Received {stream.describe()}",
+        ] + [f"-- {bounded_repr(item)}" for item in missing]  # type: ignore
+
+
+class IterableOfLength(_StreamMatcher):
+    """
+    Matches any iterable of the given length, consuming it as a stream.
+    """
+
+    def __init__(self, length: int) -> None:
+        """
+        Matches any iterable of the given length.
+
+        The iterable is consumed until its end, or until it has more than
+        the given number of items, and only a small sample of its items is
+        kept, so this can be used to check generators that are too large to
+        fit in memory.
+
+        Compare with [`ListOfLength`][listoflength].
+
+        Args:
+            length (int): the expected length of the iterable
+
+        Raises:
+            ValueError: length is < 0
+        """
+        if length < 0:
+            raise ValueError("Iterable length cannot be < 0")
+        self.__length = length
+
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__length,)
+
+    def __repr__(self) -> str:
+        return f"IterableOfLength({self.__length})"
+
+    def _match(self, items: Iterator, stream: _Stream) -> bool:
+        # One item past the length is enough to know that it's too long
+        for _ in islice(items, self.__length + 1):
+            pass
+        return stream.count != self.__length
+
+    def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
+        result = self._get_result(other)
+        if result is None:
+            return self._type_mismatch(other)
+        stream, _ = result
+        return [
+            "Length failed to match",
+            f"Expected iterable of length {self.__length}",
+            f"Received {stream.describe()}",
+        ]
+
+
+@dataclass
+class _Divergence:
+    """
+    The first difference between two iterables
+    """
+
+    index: int
+    """Index of the first differing item"""
+    context: list
+    """The items before the first difference, up to `CONTEXT_SIZE` of them"""
+    expected: object
+    """The expected item, or `_END` if the expected iterable ended"""
+    received: object
+    """The received item, or `_END` if the received iterable ended"""
+
+
+class IterableEquals(_StreamMatcher):
+    """
+    Matches any iterable with items equal to those of the given iterable, in
+    the same order, consuming both as streams.
+    """
+
+    def __init__(self, expected: Iterable) -> None:
+        """
+        Matches any iterable with items equal to those of the given iterable,
+        in the same order.
+
+        Both iterables are consumed in lockstep, stopping at the first
+        difference, and only the few items before the difference are kept, so
+        this can be used to compare generators that are too large to fit in
+        memory. If the expected items are given as an iterator, they are
+        stored in a list, so that they can be compared more than once.
+
+        Args:
+            expected (Iterable): expected items
+        """
+        if isinstance(expected, Iterator):
+            expected = list(expected)
+        self.__expected = expected
+
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__expected,)
+
+    def __repr__(self) -> str:
+        return f"IterableEquals({bounded_repr(self.__expected)})"
+
+    def _match(self, items: Iterator, stream: _Stream) -> _Divergence | None:
+        context: deque = deque(maxlen=CONTEXT_SIZE)
+        expected_items = iter(self.__expected)
+        index = 0
+        while True:
+            expected = next(expected_items, _END)
+            received = next(items, _END)
+            if expected is _END and received is _END:
+                return None
+            if (
+                expected is _END
+                or received is _END
+                or not (expected is received or expected == received)
+            ):
+                return _Divergence(index, list(context), expected, received)
+            context.append(expected)
+            index += 1
+
+    def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
+        result = self._get_result(other)
+        if result is None:
+            return self._type_mismatch(other)
+        divergence: _Divergence = result[1]  # type: ignore
+        index = divergence.index
+
+        ret = [f"Iterables differ at index {index}"]
+        if divergence.context:
+            context = ", ".join(bounded_repr(i) for i in divergence.context)
+            if index > len(divergence.context):
+                context = f"..., {context}"
+            ret.append(f"Preceding items [{context}]")
+
+        if divergence.received is _END:
+            # this item is missing from the other
+            ret.append(f"-- [{index}] {bounded_repr(divergence.expected)}")
+        elif divergence.expected is _END:
+            # this item is missing from the matcher
+            ret.append(f"++ [{index}] {bounded_repr(divergence.received)}")
+        else:
+            diff = sub_diff_delegate(
+                divergence.expected,
+                divergence.received,
+                other_is_lhs,
+            )
+            assert diff is not None
+            ret.extend(prefix_first_line(diff, f"!! [{index}] "))
+        return ret
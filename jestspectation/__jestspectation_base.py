@@ -5,6 +5,7 @@ Base type used in Jestspectation
 """
 
 from abc import abstractmethod
+from collections.abc import Callable, Iterable, Iterator
 
 from .__util import get_object_type_name
 
@@ -16,6 +17,9 @@ class JestspectationBase:
     Base class of types used in Jestspectation.
     """
 
+    __cached_repr: str
+    """Cached result of `__repr__`, set when it is first called"""
+
     @abstractmethod
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
         """
@@ -34,19 +38,62 @@ class JestspectationBase:
             Optional[list[str]]: difference
         """
 
-    def get_contents_repr(self) -> list[str]:
+    def iter_diff(self, other: object, other_is_lhs: bool) -> Iterator[str]:
+        """
+        Lazily yields the lines of the difference between this and some other
+        object, in the same format as `get_diff`.
+
+        This is used when displaying diffs, so that lines past the configured
+        budget are never generated. By default, this yields the lines from
+        `get_diff`, but it can be overridden to generate lines lazily.
+
+        Args:
+            other (object): object to compare
+            other_is_lhs (bool): whether the other object is on the left hand
+                side of the expression
+
+        Yields:
+            str: lines of the difference
+        """
+        yield from self.get_diff(other, other_is_lhs)
+
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        """
+        Returns a tuple of the types of objects that this matcher could
+        possibly be equal to, or `None` if it could match objects of any type.
+
+        This is used as a cheap pre-filter when matching against many objects,
+        so it must never exclude a type that could match.
+        """
+        return None
+
+    def _compile(self) -> Callable[[object], bool]:
+        """
+        Returns a function that checks whether an object matches this
+        matcher, giving the same result as `==`.
+
+        This is used by `compile`, so that matching against many objects
+        doesn't repeat any work that only depends on the matcher. By default,
+        this returns `__eq__`, but it can be overridden to return a function
+        with any setup done ahead of time.
+        """
+        return self.__eq__
+
+    def get_contents_repr(self) -> Iterable[str]:
         """
-        Returns a list of string representations for the inner contents.
+        Returns an iterable of string representations for the inner contents.
 
         These strings are considered to be individual tokens, and are used to
         shorten the `__repr__` string of Jestspectation matchers by replacing
-        excess items with an ellipsis (...).
+        excess items with an ellipsis (...). The iterable is consumed lazily,
+        so a generator can be returned to avoid representing items that won't
+        be shown.
 
         This method should be implemented if the `__repr__` method is not
         overridden.
 
         Returns:
-            list[str]: inner contents
+            Iterable[str]: inner contents
         """
         raise NotImplementedError("Either implement this or override __repr__")
 
@@ -63,35 +110,49 @@ class JestspectationBase:
         raise NotImplementedError("Either implement this or override __repr__")
 
     def __repr__(self) -> str:
-        contents = self.get_contents_repr()
+        # Representing the contents can be expensive, and diffs often show the
+        # same matcher many times, so the result is cached
+        try:
+            return self.__cached_repr
+        except AttributeError:
+            pass
+
+        contents = iter(self.get_contents_repr())
         open, close = self.get_contents_repr_edges()
         name = get_object_type_name(self)
-        str_contents = open
+        str_contents = [open]
+        length = len(open)
 
         # Until we've exhausted the contents
         # [a, b, c, ...]
         # Or until we take up all the available chars
-        for i, curr in enumerate(contents):
+        curr = next(contents, None)
+        first = True
+        while curr is not None:
+            # Look ahead so we know if this is the last one
+            following = next(contents, None)
+            sep = "" if first else ", "
             # If we're about to exceed the max length
-            if len(str_contents + curr + ", ..." + close) > REPR_LEN:
+            if length + len(curr) + len(", ...") + len(close) > REPR_LEN:
                 # If this is the last one and it'll still fit
                 if (
-                    i == len(contents) - 1
-                    and len(str_contents + ", " + curr + close) <= REPR_LEN
+                    following is None
+                    and length + len(sep) + len(curr) + len(close) <= REPR_LEN
                 ):
-                    str_contents += ", " + curr
+                    str_contents.append(sep + curr)
                 # Or if it's the first one
-                elif i == 0:
-                    str_contents += "..."
+                elif first:
+                    str_contents.append("...")
                 # Otherwise, just use the ellipsis
                 else:
-                    str_contents += ", ..."
+                    str_contents.append(", ...")
                 break
-            elif str_contents == open:
-                str_contents += curr
-            else:
-                str_contents += ", " + curr
+            str_contents.append(sep + curr)
+            length += len(sep) + len(curr)
+            curr = following
+            first = False
 
-        str_contents += close
+        str_contents.append(close)
 
-        return f"{name}({str_contents})"
+        self.__cached_repr = f"{name}({''.join(str_contents)})"
+        return self.__cached_repr
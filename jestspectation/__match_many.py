@@ -0,0 +1,159 @@
+"""
+Match many
+
+Matching a single expectation against many objects, such as the rows of a
+large result set.
+"""
+
+from collections.abc import Iterable, Iterator
+from itertools import compress, count
+
+from .__compile import Compiled, compile
+from .__util import truncate_diff
+
+DEFAULT_MAX_DIFFS = 10
+"""
+Default number of failures that diffs can be shown for
+"""
+
+
+class MatchManyResult:
+    """
+    Results of matching an expectation against many objects
+    """
+
+    def __init__(
+        self,
+        matcher: Compiled,
+        failed_map: bytearray,
+        failed: int,
+        first_failures: list[tuple[int, object]],
+    ) -> None:
+        self.__matcher = matcher
+        self.__failed_map = failed_map
+        self.__failed = failed
+        self.__first_failures = first_failures
+
+    def __repr__(self) -> str:
+        return (
+            f"MatchManyResult(total={self.total}, passed={self.passed}, "
+            f"failed={self.failed})"
+        )
+
+    def __bool__(self) -> bool:
+        return not self.failed
+
+    @property
+    def total(self) -> int:
+        """
+        Number of objects that were matched
+        """
+        return len(self.__failed_map)
+
+    @property
+    def failed(self) -> int:
+        """
+        Number of objects that didn't match
+        """
+        return self.__failed
+
+    @property
+    def passed(self) -> int:
+        """
+        Number of objects that matched
+        """
+        return self.total - self.failed
+
+    @property
+    def failed_map(self) -> bytes:
+        """
+        Map of which objects didn't match, containing one byte (rather than
+        one bit) for each object, which is `1` if it didn't match, and `0` if
+        it did
+        """
+        return bytes(self.__failed_map)
+
+    @property
+    def failures(self) -> list[int]:
+        """
+        Indexes of the objects that didn't match
+        """
+        return list(compress(count(), self.__failed_map))
+
+    def iter_diffs(self) -> Iterator[tuple[int, list[str]]]:
+        """
+        Lazily yields the index and diff of each of the first failures. Each
+        diff is only generated when it is reached.
+        """
+        for index, other in self.__first_failures:
+            yield index, truncate_diff(self.__matcher.iter_diff(other, False))
+
+    def assert_passed(self) -> None:
+        """
+        Asserts that all the objects matched
+
+        Raises:
+            AssertionError: some objects didn't match, with the diffs of the
+                first failures
+        """
+        if not self.failed:
+            return
+        lines = [f"{self.failed} of {self.total} objects failed to match"]
+        for index, diff in self.iter_diffs():
+            lines.append(f"[{index}]")
+            lines.extend(f"   {line}" for line in diff)
+        if self.failed > len(self.__first_failures):
+            lines.append(
+                f"... {self.failed - len(self.__first_failures)} more failures"
+            )
+        raise AssertionError("\n".join(lines))
+
+
+def match_many(
+    matcher: object,
+    others: Iterable[object],
+    max_diffs: int = DEFAULT_MAX_DIFFS,
+) -> MatchManyResult:
+    """
+    Match an expectation against many objects, such as the rows of a result
+    set, without stopping at the first failure.
+
+    The expectation is compiled once, using `compile`, and reused for every
+    object. Diffs are only generated for the first `max_diffs` failures, and
+    only once they are requested.
+
+    For example:
+
+    ```py
+    result = match_many({"id": Any(int), "name": Any(str)}, rows)
+    print(f"{result.failed} of {result.total} rows are invalid")
+    # Raise an AssertionError showing the first failures
+    result.assert_passed()
+    ```
+
+    Args:
+        matcher (object): expectation to match each object against
+        others (Iterable[object]): objects to match
+        max_diffs (int, optional): maximum number of failures to keep, so
+            that their diffs can be shown. Defaults to 10.
+
+    Returns:
+        MatchManyResult: which objects failed to match, and their diffs
+    """
+    compiled = matcher if isinstance(matcher, Compiled) else compile(matcher)
+    check = compiled._compile()
+
+    failed_map = bytearray()
+    add = failed_map.append
+    failed = 0
+    first_failures: list[tuple[int, object]] = []
+    for index, other in enumerate(others):
+        if check(other):
+            add(0)
+        else:
+            add(1)
+            failed += 1
+            if len(first_failures) < max_diffs:
+                first_failures.append((index, other))
+
+    return MatchManyResult(compiled, failed_map, failed, first_failures)
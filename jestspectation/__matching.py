@@ -0,0 +1,588 @@
+"""
+Multiset matching
+
+Maximum matching between a list of expected items (which may include
+matchers) and a list of received items. This is used by `ListContainingOnly`
+to determine which items are missing, duplicated or unexpected.
+
+Items that are equal are grouped together, so that a list containing many
+copies of the same values is matched as a handful of groups with
+capacities, rather than as a complete bipartite graph. The matching itself
+is found as a maximum flow using Dinic's algorithm, which is the capacitated
+equivalent of Hopcroft-Karp.
+
+Small lists are first matched greedily using a linear scan, which is much
+cheaper than grouping the items, and is enough to show that they match.
+"""
+
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from numbers import Number
+
+from .__jestspectation_base import JestspectationBase
+from .__parallel import iter_chunks, run_parallel, use_parallel
+from .__session import get_session
+
+_NUMBERS = (Number,)
+_BYTES = (bytes, bytearray, memoryview)
+_SETS = (set, frozenset)
+
+PLAIN_VALUE_TYPES: dict[type, tuple[type, ...]] = {
+    bool: _NUMBERS,
+    int: _NUMBERS,
+    float: _NUMBERS,
+    complex: _NUMBERS,
+    str: (str,),
+    bytes: _BYTES,
+    bytearray: _BYTES,
+    tuple: (tuple,),
+    frozenset: _SETS,
+    set: _SETS,
+    list: (list,),
+    dict: (dict,),
+    type(None): (type(None),),
+}
+"""
+Types of objects that built-in values could possibly be equal to. Objects of
+other types could be equal to anything, using their own `__eq__`.
+"""
+
+SMALL_SIZE = 16
+"""
+Number of items up to which lists are matched greedily before grouping them
+"""
+
+_LIST_TAG = object()
+_DICT_TAG = object()
+_UNFREEZABLE = object()
+_CONTAINER_TYPES = (list, dict, set)
+
+
+class _Unfreezable(Exception):
+    """Raised when an item has no hashable equivalent"""
+
+
+def _freeze_container(item: object, item_type: type) -> object:
+    """
+    Returns the hashable equivalent of a list, dict or set
+    """
+    if item_type is list:
+        return (_LIST_TAG, tuple(_freeze(i) for i in item))  # type: ignore
+    if item_type is dict:
+        return (
+            _DICT_TAG,
+            frozenset((k, _freeze(v)) for k, v in item.items()),  # type: ignore
+        )
+    return frozenset(item)  # type: ignore
+
+
+def _freeze(item: object) -> object:
+    """
+    Returns a hashable value that is equal to another frozen value if and only
+    if the original items are equal.
+
+    Lists, dicts and sets made up of hashable values are converted to
+    hashable equivalents. Matchers and other unhashable objects raise
+    `_Unfreezable`. During a diff session, the hashable equivalents of
+    containers are cached, so that nested containers are only converted once.
+    """
+    if isinstance(item, JestspectationBase):
+        raise _Unfreezable()
+    item_type = type(item)
+    if item_type in _CONTAINER_TYPES:
+        session = get_session()
+        if session is None:
+            return _freeze_container(item, item_type)
+        cached = session.frozen.get(id(item))
+        if cached is None:
+            try:
+                frozen = _freeze_container(item, item_type)
+            except (_Unfreezable, RecursionError):
+                # Containers that are too deep to freeze are treated as
+                # unfreezable, so that we don't try again at every level
+                frozen = _UNFREEZABLE
+            cached = (item, frozen)
+            session.frozen[id(item)] = cached
+        if cached[1] is _UNFREEZABLE:
+            raise _Unfreezable()
+        return cached[1]
+    try:
+        hash(item)
+    except TypeError:
+        raise _Unfreezable() from None
+    return item
+
+
+def freeze(item: object) -> tuple[object] | None:
+    """
+    Returns a hashable key that is equal to the key of another item if and
+    only if the items are equal, or `None` if the item has no hashable
+    equivalent.
+
+    The frozen value is wrapped in a tuple, so that `None` can be frozen too.
+    """
+    try:
+        return (_freeze(item),)
+    except (_Unfreezable, RecursionError):
+        return None
+
+
+def get_candidate_types(item: object) -> tuple[type, ...] | None:
+    """
+    Returns the types of objects that the given expected item could possibly
+    be equal to, or `None` if it could be equal to an object of any type.
+    """
+    if isinstance(item, JestspectationBase):
+        return item._get_match_types()
+    return PLAIN_VALUE_TYPES.get(type(item))
+
+
+_FROZEN = 0
+"""Kind of received groups that could be frozen"""
+_UNFROZEN = 1
+"""Kind of received groups that couldn't be frozen"""
+_WILDCARD = 2
+"""Kind of received groups that are matchers, which could match anything"""
+
+_ScanTask = tuple[
+    list[tuple[object, bool, tuple[type, ...] | None]],
+    int,
+    type,
+    Sequence[tuple[int, object]],
+]
+"""
+Expected items, and whether they're frozen and their candidate types, along
+with the kind and type of a chunk of received groups, and the index and item
+of each received group in the chunk
+"""
+
+
+def _scan_candidates(task: _ScanTask) -> list[list[int]]:
+    """
+    Returns the received groups in a chunk that each expected group could
+    match, by comparing them
+    """
+    expected, kind, received_type, chunk = task
+    ret = []
+    for item, is_frozen, types in expected:
+        candidates = []
+        if kind == _WILDCARD:
+            for r, other in chunk:
+                if item is other or other == item:
+                    candidates.append(r)
+        # Frozen expected groups were already found exactly by their value.
+        # Only built-in received types are filtered, since other types could
+        # be equal to anything, using their own `__eq__`
+        elif not (kind == _FROZEN and is_frozen) and (
+            types is None
+            or received_type not in PLAIN_VALUE_TYPES
+            or issubclass(received_type, types)
+        ):
+            for r, other in chunk:
+                if item is other or item == other:
+                    candidates.append(r)
+        ret.append(candidates)
+    return ret
+
+
+class _FlowNetwork:
+    """
+    Flow network used to calculate a maximum matching with capacities
+    """
+
+    def __init__(self, size: int) -> None:
+        self.adjacent: list[list[int]] = [[] for _ in range(size)]
+        self.to: list[int] = []
+        self.capacity: list[int] = []
+
+    def add_edge(self, start: int, end: int, capacity: int) -> int:
+        """
+        Add an edge, returning its id. The reverse edge has the id `e ^ 1`.
+        """
+        edge = len(self.to)
+        self.adjacent[start].append(edge)
+        self.to.append(end)
+        self.capacity.append(capacity)
+        self.adjacent[end].append(edge + 1)
+        self.to.append(start)
+        self.capacity.append(0)
+        return edge
+
+    def push(self, edges: list[int], amount: int) -> None:
+        """
+        Push the given amount of flow along a path of edges
+        """
+        for e in edges:
+            self.capacity[e] -= amount
+            self.capacity[e ^ 1] += amount
+
+    def __levels(self, source: int, sink: int) -> list[int]:
+        """
+        Returns the BFS level of each node in the residual graph
+        """
+        levels = [-1] * len(self.adjacent)
+        levels[source] = 0
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for e in self.adjacent[node]:
+                if self.capacity[e] > 0 and levels[self.to[e]] < 0:
+                    levels[self.to[e]] = levels[node] + 1
+                    queue.append(self.to[e])
+        return levels
+
+    def __augment(
+        self,
+        source: int,
+        sink: int,
+        levels: list[int],
+        pointers: list[int],
+    ) -> int:
+        """
+        Find a single augmenting path in the level graph and push as much flow
+        along it as possible. This is iterative so that long alternating
+        paths don't exceed the recursion limit.
+        """
+        path: list[int] = []
+        node = source
+        while node != sink:
+            edges = self.adjacent[node]
+            while pointers[node] < len(edges):
+                e = edges[pointers[node]]
+                if (
+                    self.capacity[e] > 0
+                    and levels[self.to[e]] == levels[node] + 1
+                ):
+                    break
+                pointers[node] += 1
+            else:
+                # Dead end, so back up and never visit this node again
+                levels[node] = -1
+                if not path:
+                    return 0
+                node = self.to[path.pop() ^ 1]
+                pointers[node] += 1
+                continue
+            path.append(e)
+            node = self.to[e]
+
+        amount = min(self.capacity[e] for e in path)
+        self.push(path, amount)
+        return amount
+
+    def max_flow(self, source: int, sink: int) -> None:
+        """
+        Saturate the network using Dinic's algorithm
+        """
+        while True:
+            levels = self.__levels(source, sink)
+            if levels[sink] < 0:
+                return
+            pointers = [0] * len(self.adjacent)
+            while self.__augment(source, sink, levels, pointers):
+                pass
+
+
+@dataclass
+class _Group:
+    """
+    A group of equal items
+    """
+
+    item: object
+    """First item in the group"""
+    indices: list[int] = field(default_factory=list)
+    """Indices of all the items in the group"""
+
+
+@dataclass
+class MatchResult:
+    """
+    Result of matching received items against expected items
+    """
+
+    missing: list[tuple[int, object]]
+    """Count and value of each expected item that wasn't received"""
+    duplicate: list[tuple[int, object]]
+    """
+    Count and expected value of each received item that matched an expected
+    item that was already fully matched
+    """
+    unexpected: list[object]
+    """Received items that didn't match any expected item"""
+
+    def is_exact(self) -> bool:
+        """
+        Returns whether every expected item was matched with exactly one
+        received item
+        """
+        return not (self.missing or self.duplicate or self.unexpected)
+
+
+class MultisetMatcher:
+    """
+    Finds a maximum matching between expected items and received items.
+
+    The expected items are grouped the first time that they are needed, so
+    that this work can be reused across comparisons, and is skipped entirely
+    for small lists that match greedily.
+    """
+
+    def __init__(self, expected: list) -> None:
+        """
+        Prepare to match against the given expected items
+
+        Args:
+            expected (list): expected items, which may include matchers
+        """
+        self.__expected = expected
+        self.__length = len(expected)
+        self.__grouped: (
+            tuple[
+                list[_Group],
+                list[tuple[object] | None],
+                list[tuple[object, bool, tuple[type, ...] | None]],
+            ]
+            | None
+        ) = None
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __get_groups(
+        self,
+    ) -> tuple[
+        list[_Group],
+        list[tuple[object] | None],
+        list[tuple[object, bool, tuple[type, ...] | None]],
+    ]:
+        """
+        Returns the groups of equal expected items, along with their frozen
+        values, and the information needed to scan for their candidates
+        """
+        if self.__grouped is not None:
+            return self.__grouped
+        groups: list[_Group] = []
+        frozen_values: list[tuple[object] | None] = []
+        scan_info: list[tuple[object, bool, tuple[type, ...] | None]] = []
+
+        # Group equal values, and repeated references to the same matcher
+        by_key: dict[object, _Group] = {}
+        for i, item in enumerate(self.__expected):
+            frozen = freeze(item)
+            key = frozen if frozen is not None else id(item)
+            if key in by_key:
+                by_key[key].indices.append(i)
+                continue
+            group = _Group(item, [i])
+            by_key[key] = group
+            groups.append(group)
+            frozen_values.append(frozen)
+            scan_info.append(
+                (item, frozen is not None, get_candidate_types(item))
+            )
+        self.__grouped = (groups, frozen_values, scan_info)
+        return self.__grouped
+
+    def is_exact(self, received: list) -> bool:
+        """
+        Returns whether every expected item can be matched with exactly one of
+        the given received items
+        """
+        if len(received) != self.__length:
+            return False
+        if self.__length <= SMALL_SIZE:
+            # Greedily take the first remaining expected item that is equal
+            # to each received item. If this succeeds, the items match, but
+            # otherwise, a different choice could have succeeded, since
+            # matchers aren't necessarily equal to the same items as each
+            # other
+            remaining = list(self.__expected)
+            for item in received:
+                try:
+                    del remaining[remaining.index(item)]
+                except ValueError:
+                    break
+            else:
+                return True
+        return self.match(received).is_exact()
+
+    @staticmethod
+    def __max_flow(
+        edges: list[list[int]],
+        expected_left: list[int],
+        received_left: list[int],
+    ) -> None:
+        """
+        Find a maximum matching given the candidates for each expected group,
+        updating the counts of unmatched items in place.
+        """
+        # Nodes: source, sink, expected groups, received groups
+        source = 0
+        sink = 1
+        offset = 2 + len(expected_left)
+        network = _FlowNetwork(offset + len(received_left))
+
+        source_edges = [
+            network.add_edge(source, 2 + e, count)
+            for e, count in enumerate(expected_left)
+        ]
+        sink_edges = [
+            network.add_edge(offset + r, sink, count)
+            for r, count in enumerate(received_left)
+        ]
+        for e, candidates in enumerate(edges):
+            for r in candidates:
+                edge = network.add_edge(2 + e, offset + r, expected_left[e])
+                # Greedily push flow directly, so that the max flow only needs
+                # to deal with conflicts
+                amount = min(
+                    network.capacity[source_edges[e]],
+                    network.capacity[sink_edges[r]],
+                )
+                if amount:
+                    network.push(
+                        [source_edges[e], edge, sink_edges[r]], amount
+                    )
+
+        network.max_flow(source, sink)
+
+        # Residual capacities are the unmatched counts
+        for e, edge in enumerate(source_edges):
+            expected_left[e] = network.capacity[edge]
+        for r, edge in enumerate(sink_edges):
+            received_left[r] = network.capacity[edge]
+
+    def match(self, received: list) -> MatchResult:
+        """
+        Match the given received items against the expected items
+        """
+        expected_groups, expected_frozen, scan_info = self.__get_groups()
+        # Group the received items
+        groups: list[_Group] = []
+        # Frozen value -> received groups of any type with that value
+        by_value: dict[object, list[int]] = {}
+        # Type -> received groups of that type, split by whether they could
+        # be frozen
+        frozen_by_type: dict[type, list[tuple[int, object]]] = {}
+        unfrozen_by_type: dict[type, list[tuple[int, object]]] = {}
+        # Received matchers could match anything, so we need to check them
+        # every time
+        wildcards: list[tuple[int, object]] = []
+
+        group_ids: dict[tuple[type, object], int] = {}
+        for i, item in enumerate(received):
+            frozen = freeze(item)
+            if frozen is not None:
+                key = (type(item), frozen)
+                if key in group_ids:
+                    groups[group_ids[key]].indices.append(i)
+                    continue
+                group_ids[key] = len(groups)
+                by_value.setdefault(frozen, []).append(len(groups))
+                frozen_by_type.setdefault(type(item), []).append(
+                    (len(groups), item)
+                )
+            elif isinstance(item, JestspectationBase):
+                wildcards.append((len(groups), item))
+            else:
+                unfrozen_by_type.setdefault(type(item), []).append(
+                    (len(groups), item)
+                )
+            groups.append(_Group(item, [i]))
+
+        # Compare each kind and type of received groups separately, so that
+        # types that can't match are skipped all at once
+        chunks: list[tuple[int, type, Sequence[tuple[int, object]]]] = [
+            (kind, t, type_groups)
+            for kind, by_type in (
+                (_FROZEN, frozen_by_type),
+                (_UNFROZEN, unfrozen_by_type),
+            )
+            for t, type_groups in by_type.items()
+        ]
+        if wildcards:
+            chunks.append((_WILDCARD, object, wildcards))
+        tasks = [
+            (scan_info, kind, t, type_groups)
+            for kind, t, type_groups in chunks
+        ]
+        if use_parallel(len(groups)):
+            results = run_parallel(
+                _scan_candidates,
+                [
+                    (info, kind, t, chunk)
+                    for info, kind, t, type_groups in tasks
+                    for _, chunk in iter_chunks(type_groups)
+                ],
+            )
+        else:
+            results = [_scan_candidates(task) for task in tasks]
+
+        # The candidate received groups for each expected group
+        edges: list[list[int]] = []
+        # The first expected group that each received group could match
+        first_candidate: list[int | None] = [None] * len(groups)
+        contested = False
+
+        for e, frozen in enumerate(expected_frozen):
+            # Frozen received groups can be found exactly by their value
+            candidates = (
+                list(by_value.get(frozen, [])) if frozen is not None else []
+            )
+            # The results are in the same order as the groups were scanned
+            for result in results:
+                candidates.extend(result[e])
+
+            for r in candidates:
+                if first_candidate[r] is None:
+                    first_candidate[r] = e
+                else:
+                    contested = True
+            edges.append(candidates)
+
+        expected_left = [len(group.indices) for group in expected_groups]
+        received_left = [len(group.indices) for group in groups]
+        if contested:
+            self.__max_flow(edges, expected_left, received_left)
+        else:
+            # Each received group can only match one expected group, so
+            # greedily taking items is optimal
+            for e, candidates in enumerate(edges):
+                for r in candidates:
+                    amount = min(expected_left[e], received_left[r])
+                    expected_left[e] -= amount
+                    received_left[r] -= amount
+
+        # Now use the flow to determine what's missing
+        missing = []
+        duplicate_counts = [0] * len(expected_groups)
+        unexpected_indices = []
+        for unmatched, group in zip(
+            expected_left, expected_groups, strict=True
+        ):
+            if unmatched:
+                missing.append((unmatched, group.item))
+        for r, (unmatched, group) in enumerate(
+            zip(received_left, groups, strict=True)
+        ):
+            if not unmatched:
+                continue
+            candidate = first_candidate[r]
+            if candidate is None:
+                unexpected_indices.extend(group.indices)
+            else:
+                duplicate_counts[candidate] += unmatched
+
+        return MatchResult(
+            missing=missing,
+            duplicate=[
+                (count, group.item)
+                for count, group in zip(
+                    duplicate_counts, expected_groups, strict=True
+                )
+                if count
+            ],
+            unexpected=[received[i] for i in sorted(unexpected_indices)],
+        )
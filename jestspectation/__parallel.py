@@ -0,0 +1,191 @@
+"""
+Parallel matching
+
+Large containers can be matched in parallel, by splitting the received items
+into chunks, which are matched in a pool of worker processes or threads,
+then merging the results. This is opt-in, using
+`configure().parallel_threshold`.
+
+Results are always merged in the order of the chunks, so that they are the
+same as if the chunks were matched serially, no matter which worker
+finishes first.
+
+Starting workers is expensive, so a single pool is started the first time
+it is needed, and reused until the configuration changes, or the program
+exits. Within a diff, only the first container that is large enough is
+matched in parallel, which is usually the outermost one, rather than every
+nested container.
+"""
+
+import atexit
+import os
+import threading
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import TypeVar
+
+from .__config import configure
+from .__session import get_session
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+CHUNKS_PER_WORKER = 4
+"""
+Number of chunks to split the items into for each worker, so that workers
+that finish early can take on more of the work
+"""
+
+_worker = threading.local()
+"""
+State of the current thread, which records whether it is a worker, which
+should never start its own pool
+"""
+
+
+_pool: tuple[tuple[str, int], Executor] | None = None
+"""
+The pool of workers, along with the mode and number of workers it was
+started with
+"""
+
+_pool_lock = threading.Lock()
+"""
+Lock held while starting or shutting down the pool
+"""
+
+
+def _init_worker() -> None:
+    _worker.active = True
+
+
+def _get_pool() -> Executor:
+    """
+    Returns the pool of workers, starting it if it hasn't been started, or
+    if the configuration has changed since it was started
+    """
+    global _pool
+    key = (configure().parallel_mode, get_workers())
+    with _pool_lock:
+        if _pool is not None:
+            if _pool[0] == key:
+                return _pool[1]
+            _pool[1].shutdown()
+        pool: Executor
+        if key[0] == "threads":
+            pool = ThreadPoolExecutor(key[1], initializer=_init_worker)
+        else:
+            pool = ProcessPoolExecutor(key[1], initializer=_init_worker)
+        _pool = (key, pool)
+        return pool
+
+
+def shutdown_pool() -> None:
+    """
+    Shut down the pool of workers, if it was started. A new pool is started
+    the next time one is needed.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool[1].shutdown()
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def use_parallel(size: int) -> bool:
+    """
+    Returns whether a container with the given number of received items
+    should be matched in parallel
+    """
+    threshold = configure().parallel_threshold
+    if (
+        threshold is None
+        or size < threshold
+        or getattr(_worker, "active", False)
+    ):
+        return False
+    # Only the first large container in a diff is matched in parallel
+    session = get_session()
+    return session is None or not session.parallel_used
+
+
+def get_workers() -> int:
+    """
+    Returns the number of workers to use
+    """
+    return configure().parallel_workers or os.cpu_count() or 1
+
+
+def iter_chunks(items: Sequence[T]) -> Iterator[tuple[int, Sequence[T]]]:
+    """
+    Split items into chunks to be matched by the workers, yielding the
+    offset and items of each chunk
+    """
+    size = max(1, -(-len(items) // (get_workers() * CHUNKS_PER_WORKER)))
+    for start in range(0, len(items), size):
+        yield start, items[start : start + size]
+
+
+def run_parallel(function: Callable[[T], R], tasks: Iterable[T]) -> list[R]:
+    """
+    Run a function on each of the tasks in a pool of workers, returning the
+    results in the same order as the tasks.
+
+    In the `"processes"` mode, the function must be defined at the top level
+    of a module, and the tasks and results must be picklable.
+    """
+    session = get_session()
+    if session is not None:
+        session.parallel_used = True
+    return list(_get_pool().map(function, tasks))
+
+
+def _equal_pairs(pairs: Sequence[tuple[object, object]]) -> list[bool]:
+    """
+    Returns which pairs of objects are equal. Pairs that can't be compared
+    are counted as unequal.
+    """
+    ret = []
+    for a, b in pairs:
+        try:
+            ret.append(a is b or bool(a == b))
+        except RecursionError:
+            ret.append(False)
+    return ret
+
+
+def find_equal(
+    matcher: object,
+    other: object,
+    positions: Sequence[tuple[object, object]],
+) -> set[tuple[object, object]]:
+    """
+    Compare the items at the given positions (keys or indexes) of two
+    containers in parallel, returning the positions of the items that are
+    equal.
+
+    This is used before diffing large containers, so that only the items
+    that differ need to be diffed. Items that can't be compared using `==`,
+    such as self-referential ones, are left to the diff.
+    """
+    pairs = [
+        (matcher[i], other[j])  # type: ignore
+        for i, j in positions
+    ]
+    equal = []
+    for result in run_parallel(
+        _equal_pairs, [chunk for _, chunk in iter_chunks(pairs)]
+    ):
+        equal.extend(result)
+    return {
+        position
+        for position, is_equal in zip(positions, equal, strict=True)
+        if is_equal
+    }
@@ -2,112 +2,530 @@
 Diff generators for Python objects
 """
 
-from itertools import zip_longest
+from array import array
+from collections import OrderedDict
+from collections.abc import (
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from collections.abc import Set as AbstractSet
+from dataclasses import fields, is_dataclass
+from functools import partial, singledispatch
+from typing import Any
 
+from .__buffer_diff import iter_buffer_diff
+from .__diff_engine import (
+    DiffStart,
+    DiffStep,
+    DiffSteps,
+    Probe,
+    Resume,
+    Soft,
+    SubDiff,
+    Suspended,
+)
+from .__jestspectation_base import JestspectationBase
+from .__parallel import find_equal, use_parallel
+from .__sequence_diff import get_opcodes
+from .__string_diff import is_long_string, iter_string_diff
 from .__util import (
-    diff_wrapper,
+    bounded_repr,
+    eq_expr_str,
     get_object_type_name,
+    sorted_for_display,
     sub_diff_delegate,
 )
 
+DiffHandler = Callable[[Any, Any, bool], Iterable[str]]
+"""
+Function that calculates the lines of the diff between two unequal objects
+"""
+
+_Steps = Callable[[Any, Any, bool], DiffSteps]
+"""
+Function that calculates the steps to diff two objects of a built-in type
+"""
 
-@diff_wrapper
-def diff_list(
+
+def _list_steps(
     matcher: list,
-    other: object,
+    other: list,
     other_is_lhs: bool,
-) -> list[str]:
-    """Difference for Python lists"""
-    if not isinstance(other, list):
-        return [
-            "Type mismatch",
-            "Expected list",
-            f"Received {get_object_type_name(other)}",
-        ]
-    ret = []
-    # Empty object to check for missing elements
-    missing = object()
-    # TODO: Find a way to get a nice diff if there are extra objects or
-    # something, kinda like Git
-    for i, (m, o) in enumerate(zip_longest(matcher, other, fillvalue=missing)):
-        if m is missing:
-            # this element is missing from the matcher
-            ret += [f"++ [{i}] {repr(o)}"]
-        elif o is missing:
+) -> DiffSteps:
+    """
+    Steps to diff two lists, comparing each pair of elements at most once.
+    This yields no lines if and only if the lists are equal.
+    """
+
+    def index_str(i: int, j: int) -> str:
+        return f"[{i}]" if i == j else f"[{i}->{j}]"
+
+    # Align the lists first, so that insertions and deletions don't cause
+    # every later element to mismatch
+    opcodes = get_opcodes(matcher, other)
+
+    # Large numbers of paired elements are compared in parallel first, so
+    # that only the differing ones need to be diffed
+    equal: set[tuple[object, object]] = set()
+    replaced = sum(
+        min(i2 - i1, j2 - j1)
+        for tag, i1, i2, j1, j2 in opcodes
+        if tag != "equal"
+    )
+    if use_parallel(replaced):
+        equal = find_equal(
+            matcher,
+            other,
+            [
+                (i1 + offset, j1 + offset)
+                for tag, i1, i2, j1, j2 in opcodes
+                if tag != "equal"
+                for offset in range(min(i2 - i1, j2 - j1))
+            ],
+        )
+
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            continue
+        # Pair up replaced elements and compare them
+        paired = min(i2 - i1, j2 - j1)
+        for offset in range(paired):
+            i, j = i1 + offset, j1 + offset
+            # Just like `list.__eq__`, identical elements are equal
+            if matcher[i] is other[j] or (i, j) in equal:
+                continue
+            # Add a dot point to the first line to make it pretty
+            yield SubDiff(
+                matcher[i], other[j], other_is_lhs, f"!! {index_str(i, j)} "
+            )
+        for i in range(i1 + paired, i2):
             # this element is missing from the other
-            ret += [f"-- [{i}] {repr(m)}"]
+            yield f"-- [{i}] {bounded_repr(matcher[i])}"
+        for j in range(j1 + paired, j2):
+            # this element is missing from the matcher
+            yield f"++ [{j}] {bounded_repr(other[j])}"
+
+
+def _set_steps(
+    matcher: AbstractSet,
+    other: AbstractSet,
+    other_is_lhs: bool,
+) -> DiffSteps:
+    """
+    Steps to diff two sets. This yields no lines if and only if the sets are
+    equal.
+    """
+    # Missing
+    for e in sorted_for_display(matcher - other):
+        yield f"-- {bounded_repr(e)}"
+
+    # Additional
+    for e in sorted_for_display(other - matcher):
+        yield f"++ {bounded_repr(e)}"
+
+
+def _dict_steps(
+    matcher: Mapping,
+    other: Mapping,
+    other_is_lhs: bool,
+) -> DiffSteps:
+    """
+    Steps to diff two dicts, comparing each pair of values at most once. This
+    yields no lines if and only if the dicts are equal.
+    """
+
+    def diff_str(key, d: Mapping) -> str:
+        return f"{bounded_repr(key)}: {bounded_repr(d[key])}"
+
+    # Use set operations on the key views, so that we don't need to check
+    # each key individually
+    matcher_keys = matcher.keys()
+    other_keys = other.keys()
+
+    # Missing
+    for e in sorted_for_display(matcher_keys - other_keys):
+        yield f"-- {diff_str(e, matcher)}"
+
+    # Additional
+    for e in sorted_for_display(other_keys - matcher_keys):
+        yield f"++ {diff_str(e, other)}"
+
+    # Large numbers of values are compared in parallel first, so that only
+    # the differing ones need to be diffed
+    common = matcher_keys & other_keys
+    equal: set[tuple[object, object]] = set()
+    if use_parallel(len(common)):
+        equal = find_equal(matcher, other, [(e, e) for e in common])
+
+    # Non-equal keys, in the order they are shown. Each value is compared by
+    # starting its sub-diff, which is suspended at its first line, so that
+    # the header for the key can be shown before it. Keys are only compared
+    # as the lines of the diff are consumed, so keys beyond the diff budget
+    # are never compared.
+    for e in sorted_for_display(common):
+        matcher_value = matcher[e]
+        other_value = other[e]
+        # Just like `dict.__eq__`, identical values are equal
+        if matcher_value is other_value or (e, e) in equal:
+            continue
+        suspended = yield Probe(
+            SubDiff(matcher_value, other_value, other_is_lhs)
+        )
+        if suspended is None:
+            continue
+        header = f"!! {diff_str(e, matcher)} == {diff_str(e, other)}"
+        # Values that are only different from the ones they're nested in
+        # give soft lines
+        yield Soft(header) if suspended.soft else header
+        yield Resume(suspended)
+
+
+def _ordered_dict_steps(
+    matcher: OrderedDict,
+    other: Mapping,
+    other_is_lhs: bool,
+) -> DiffSteps:
+    """
+    Steps to diff two ordered dicts, which are only equal to each other if
+    their keys are in the same order
+    """
+    if (
+        isinstance(other, OrderedDict)
+        and matcher.keys() == other.keys()
+        and list(matcher) != list(other)
+    ):
+        yield "Order mismatch"
+        yield f"Expected keys {bounded_repr(list(matcher))}"
+        yield f"Received keys {bounded_repr(list(other))}"
+    yield from _dict_steps(matcher, other, other_is_lhs)
+
+
+def _sequence_steps(
+    matcher: Sequence,
+    other: Sequence,
+    other_is_lhs: bool,
+) -> DiffSteps:
+    """
+    Steps to diff two sequences of any type, by aligning their elements in
+    the same way as lists
+    """
+    # Copy sequences such as deques, whose elements aren't necessarily
+    # indexable in constant time
+    yield from _list_steps(list(matcher), list(other), other_is_lhs)
+
+
+def _field_steps(
+    matcher: object,
+    other: object,
+    other_is_lhs: bool,
+    names: Iterable[str],
+) -> DiffSteps:
+    """
+    Steps to diff the given fields of two objects
+    """
+    for name in names:
+        matcher_value = getattr(matcher, name)
+        other_value = getattr(other, name)
+        if matcher_value is other_value:
+            continue
+        yield SubDiff(matcher_value, other_value, other_is_lhs, f"!! .{name} ")
+
+
+def _tuple_steps(
+    matcher: tuple,
+    other: tuple,
+    other_is_lhs: bool,
+) -> DiffSteps:
+    """
+    Steps to diff two tuples, with the elements of named tuples shown by their
+    field names
+    """
+    names = getattr(type(matcher), "_fields", None)
+    if (
+        isinstance(names, tuple)
+        and type(matcher) is type(other)
+        and len(matcher) == len(other)
+    ):
+        return _field_steps(matcher, other, other_is_lhs, names)
+    return _sequence_steps(matcher, other, other_is_lhs)
+
+
+def _dataclass_steps(
+    matcher: object,
+    other: object,
+    other_is_lhs: bool,
+) -> DiffSteps:
+    """
+    Steps to diff two dataclass instances, comparing the fields that are used
+    by their `__eq__`
+    """
+    if type(matcher) is not type(other):
+        # Dataclasses are never equal to instances of other classes
+        return _type_mismatch(get_object_type_name(matcher), other)
+    return _field_steps(
+        matcher,
+        other,
+        other_is_lhs,
+        (f.name for f in fields(matcher) if f.compare),  # type: ignore
+    )
+
+
+def _type_mismatch(expected: str, other: object) -> Iterator[str]:
+    """
+    Lines for a container compared with an object of another type
+    """
+    yield "Type mismatch"
+    yield f"Expected {expected}"
+    yield f"Received {get_object_type_name(other)}"
+
+
+def _value_steps(
+    matcher: object,
+    other: object,
+    other_is_lhs: bool,
+) -> DiffSteps:
+    """
+    Steps to diff two objects that are known to be unequal, and that have no
+    diff handler, by showing their reprs
+    """
+    yield eq_expr_str(matcher, other, other_is_lhs)  # x == y
+
+    if not (
+        isinstance(other, type(matcher)) or isinstance(matcher, type(other))
+    ):
+        mismatch = "Type mismatch"
+        matcher_repr = f"{bounded_repr(matcher)} ({type(matcher).__name__})"
+        other_repr = f"{bounded_repr(other)} ({type(other).__name__})"
+    elif isinstance(matcher, str) and (
+        is_long_string(matcher) or is_long_string(other)  # type: ignore
+    ):
+        # Only show the part of long strings that differs
+        yield from iter_string_diff(matcher, other)  # type: ignore
+        return
+    else:
+        mismatch = "Value mismatch"
+        matcher_repr = bounded_repr(matcher)
+        other_repr = bounded_repr(other)
+
+    yield mismatch  # "Type/Value"
+    yield f"Expected {matcher_repr}"
+    yield f"Received {other_repr}"
+
+
+def _handler_steps(
+    handler: Callable[[Any, Any, bool], Iterable[DiffStep]],
+    matcher: object,
+    other: object,
+    other_is_lhs: bool,
+) -> DiffSteps:
+    """
+    Steps to diff two objects that are known to be unequal using a diff
+    handler
+    """
+    yield eq_expr_str(matcher, other, other_is_lhs)  # x == y
+
+    if not (
+        isinstance(other, type(matcher)) or isinstance(matcher, type(other))
+    ):
+        yield from _type_mismatch(get_object_type_name(matcher), other)
+        return
+
+    # Whether the handler found any differences. Objects that are unequal
+    # due to a custom `__eq__` could have no differences that the handler
+    # can find, so sub-diffs are probed to find out whether they differ
+    differs = False
+    steps = iter(handler(matcher, other, other_is_lhs))
+    sent: Suspended | None = None
+    while True:
+        try:
+            step = next(steps) if sent is None else steps.send(sent)  # type: ignore
+        except StopIteration:
+            break
+        sent = None
+        if isinstance(step, SubDiff):
+            suspended = yield Probe(step)
+            if suspended is not None:
+                differs = differs or not suspended.soft
+                yield Resume(suspended)
+        elif isinstance(step, Probe):
+            sent = yield step
         else:
-            sub_diff = sub_diff_delegate(m, o, other_is_lhs)
-            if sub_diff is not None:
-                # Add a dot point to the first one to make it pretty
-                sub_diff[0] = f"!! [{i}] " + sub_diff[0][3:]
-                ret += sub_diff
+            if isinstance(step, str):
+                differs = True
+            elif isinstance(step, Resume):
+                differs = differs or not step.suspended.soft
+            yield step
 
-    return ret
+    if not differs:
+        yield "Value mismatch"
+        yield f"Expected {bounded_repr(matcher)}"
+        yield f"Received {bounded_repr(other)}"
+
+
+def _no_handler(
+    matcher: object,
+    other: object,
+    other_is_lhs: bool,
+) -> Iterable[DiffStep]:
+    """
+    Placeholder for types that have no diff handler, which are diffed by
+    showing their reprs
+    """
+    return _value_steps(matcher, other, other_is_lhs)
+
+
+_handlers = singledispatch(_no_handler)
+"""
+Registry of diff handlers by the type of the expected object. Lookups are
+cached for each type, so that dispatching is only slow the first time a type
+is seen.
+"""
+
+
+def register_diff(cls: type) -> Callable[[DiffHandler], DiffHandler]:
+    """
+    Register a function to calculate the diff for objects of the given type,
+    replacing the default diff, which shows the repr of both objects.
+
+    The function is given the expected object (which is an instance of `cls`),
+    the received object, and whether the received object is on the left-hand
+    side of the comparison. It is only called if the objects are not equal,
+    and if one object is an instance of the other's type, and should yield the
+    lines explaining the differences. These are shown beneath a line with the
+    reprs of both objects.
+
+    Handlers for a class are also used for its subclasses, unless they have
+    handlers of their own. Abstract base classes such as those in
+    `collections.abc` can also be registered.
+
+    For example:
+    ```py
+    # Explain which coordinates of two points differ
+    @jestspectation.register_diff(Point)
+    def diff_point(expected, received, received_is_lhs):
+        if expected.x != received.x:
+            yield f"x coordinate: {expected.x} != {received.x}"
+        if expected.y != received.y:
+            yield f"y coordinate: {expected.y} != {received.y}"
+
+    # Fails with:
+    # Point(x=1, y=2) == Point(x=1, y=3)
+    # y coordinate: 2 != 3
+    jestspectation.assert_eq(Point(1, 2), Point(1, 3))
+    ```
+
+    Args:
+        cls (type): type of objects that the function can diff
+
+    Returns:
+        Callable[[DiffHandler], DiffHandler]: decorator that registers the
+        function, returning it unchanged
+    """
+
+    def decorator(handler: DiffHandler) -> DiffHandler:
+        _handlers.register(cls, handler)
+        return handler
+
+    return decorator
+
+
+_handlers.register(list, _list_steps)
+_handlers.register(tuple, _tuple_steps)
+_handlers.register(Sequence, _sequence_steps)
+# Strings are sequences of strings, so diffing them by element would never
+# end
+_handlers.register(str, _no_handler)
+_handlers.register(bytes, iter_buffer_diff)
+_handlers.register(bytearray, iter_buffer_diff)
+_handlers.register(memoryview, iter_buffer_diff)
+_handlers.register(array, iter_buffer_diff)
+_handlers.register(set, _set_steps)
+_handlers.register(frozenset, _set_steps)
+_handlers.register(AbstractSet, _set_steps)
+_handlers.register(dict, _dict_steps)
+_handlers.register(OrderedDict, _ordered_dict_steps)
+_handlers.register(Mapping, _dict_steps)
+
+_WALKERS: dict[type, _Steps] = {
+    list: _list_steps,
+    tuple: _tuple_steps,
+    set: _set_steps,
+    frozenset: _set_steps,
+    dict: _dict_steps,
+}
+"""
+Diff handlers for built-in containers that yield no lines if and only if the
+containers are equal, and so can be used without checking equality first,
+when both objects are exactly the given type
+"""
+
+
+def start_diff(
+    matcher: object,
+    other: object,
+    other_is_lhs: bool,
+) -> DiffStart:
+    """
+    Returns how to diff a pair of objects using the diff engine
+    """
+    matcher_type = type(matcher)
+    handler = _handlers.dispatch(matcher_type)
+
+    # Built-in containers of the same type are compared by walking their
+    # contents, so that each element is only compared once, rather than
+    # once for every level of nesting
+    walk = _WALKERS.get(matcher_type)
+    if type(other) is matcher_type and handler is walk is not None:
+        return DiffStart(
+            walk(matcher, other, other_is_lhs),
+            partial(eq_expr_str, matcher, other, other_is_lhs),
+            memoize=True,
+        )
+
+    if matcher == other:
+        return DiffStart(iter(()))
+
+    # Handle our own types
+    if isinstance(matcher, JestspectationBase):
+        return DiffStart(matcher.iter_diff(other, other_is_lhs))
+    if isinstance(other, JestspectationBase):
+        return DiffStart(other.iter_diff(matcher, not other_is_lhs))
+
+    if handler is _no_handler:
+        # Dataclasses don't share a base class, so can't be dispatched by type
+        if is_dataclass(matcher) and not isinstance(matcher, type):
+            handler = _dataclass_steps
+        else:
+            return DiffStart(_value_steps(matcher, other, other_is_lhs))
+
+    return DiffStart(_handler_steps(handler, matcher, other, other_is_lhs))
+
+
+def diff_list(
+    matcher: list,
+    other: object,
+    other_is_lhs: bool,
+) -> list[str] | None:
+    """Difference for Python lists"""
+    return sub_diff_delegate(matcher, other, other_is_lhs, indent=False)
 
 
-@diff_wrapper
 def diff_set(
     matcher: set,
     other: object,
     other_is_lhs: bool,
-) -> list[str]:
+) -> list[str] | None:
     """Difference for Python sets"""
-    if not isinstance(other, set):
-        return [
-            "Type mismatch",
-            "Expected set",
-            f"Received {get_object_type_name(other)}",
-        ]
-    ret = []
-    # Missing
-    for e in matcher:
-        if e not in other:
-            ret += [f"-- {repr(e)}"]
-
-    # Additional
-    for e in other:
-        if e not in matcher:
-            ret += [f"++ {repr(e)}"]
-
-    return ret
+    return sub_diff_delegate(matcher, other, other_is_lhs, indent=False)
 
 
-@diff_wrapper
 def diff_dict(
     matcher: dict,
     other: object,
     other_is_lhs: bool,
-) -> list[str]:
+) -> list[str] | None:
     """Difference for Python dicts"""
-    if not isinstance(other, dict):
-        return [
-            "Type mismatch",
-            "Expected dict",
-            f"Received {get_object_type_name(other)}",
-        ]
-
-    def diff_str(key, d: dict) -> str:
-        return f"{repr(key)}: {repr(d[key])}"
-
-    ret = []
-    # Missing
-    for e in matcher:
-        if e not in other:
-            ret += [f"-- {diff_str(e, matcher)}"]
-
-    # Additional
-    for e in other:
-        if e not in matcher:
-            ret += [f"++ {diff_str(e, other)}"]
-
-    # Non-equal keys
-    for e in matcher:
-        if e in other:
-            sub_diff = sub_diff_delegate(matcher[e], other[e], other_is_lhs)
-            if sub_diff is not None:
-                ret += [
-                    f"!! {diff_str(e, matcher)} == {diff_str(e, other)}"
-                ] + sub_diff
-
-    return ret
+    return sub_diff_delegate(matcher, other, other_is_lhs, indent=False)
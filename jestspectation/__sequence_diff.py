@@ -0,0 +1,169 @@
+"""
+Sequence diff
+
+Alignment of two sequences using a patience diff, so that insertions and
+deletions can be shown as such, rather than as a mismatch of every later
+element.
+"""
+
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Literal
+
+from .__matching import freeze
+
+OpTag = Literal["equal", "replace", "delete", "insert"]
+
+Opcode = tuple[OpTag, int, int, int, int]
+"""
+An operation to turn `a[i1:i2]` into `b[j1:j2]`, in the same format as
+`difflib.SequenceMatcher.get_opcodes`
+"""
+
+
+def _get_keys(items: Sequence) -> list[object]:
+    """
+    Returns a hashable key for each item. Items that have no hashable
+    equivalent (such as matchers) are given a unique key, so that they are
+    never aligned with anything, and are compared in full later.
+    """
+    keys = []
+    for item in items:
+        key = freeze(item)
+        keys.append(key if key is not None else object())
+    return keys
+
+
+def _longest_increasing(
+    anchors: list[tuple[int, int]],
+) -> list[tuple[int, int]]:
+    """
+    Given pairs of `(a_index, b_index)` sorted by `a_index`, return the
+    longest subsequence where `b_index` is also increasing, using patience
+    sorting.
+    """
+    # Top of each pile, as b indices, and as the index into anchors
+    pile_tops: list[int] = []
+    pile_anchors: list[int] = []
+    # Anchor on top of the previous pile when each anchor was placed
+    back: list[int | None] = []
+
+    for n, (_, j) in enumerate(anchors):
+        pile = bisect_left(pile_tops, j)
+        back.append(pile_anchors[pile - 1] if pile else None)
+        if pile == len(pile_tops):
+            pile_tops.append(j)
+            pile_anchors.append(n)
+        else:
+            pile_tops[pile] = j
+            pile_anchors[pile] = n
+
+    ret = []
+    current = pile_anchors[-1] if pile_anchors else None
+    while current is not None:
+        ret.append(anchors[current])
+        current = back[current]
+    ret.reverse()
+    return ret
+
+
+def _unique_anchors(
+    keys_a: list[object],
+    keys_b: list[object],
+    a1: int,
+    a2: int,
+    b1: int,
+    b2: int,
+) -> list[tuple[int, int]]:
+    """
+    Returns the positions of keys that appear exactly once in both regions,
+    in order of their position in `a`.
+    """
+    counts: dict[object, list[int]] = {}
+    for i in range(a1, a2):
+        # [count in a, count in b, index in a, index in b]
+        entry = counts.setdefault(keys_a[i], [0, 0, i, -1])
+        entry[0] += 1
+    for j in range(b1, b2):
+        entry = counts.get(keys_b[j])  # type: ignore
+        if entry is not None:
+            entry[1] += 1
+            entry[3] = j
+    return sorted(
+        (i, j)
+        for count_a, count_b, i, j in counts.values()
+        if count_a == 1 and count_b == 1
+    )
+
+
+def get_opcodes(a: Sequence, b: Sequence) -> list[Opcode]:
+    """
+    Returns a list of operations to turn sequence `a` into sequence `b`.
+
+    Common prefixes and suffixes are matched first, then elements that are
+    unique in both sequences are used as anchors, recursively. Regions with
+    no anchors are reported as a `"replace"`, so that their elements can be
+    compared pairwise.
+
+    The regions are processed using an explicit stack, so that this works for
+    sequences of any size.
+    """
+    keys_a = _get_keys(a)
+    keys_b = _get_keys(b)
+
+    ops: list[Opcode] = []
+    # Each entry is either a region still to align, or a finished opcode
+    stack: list[tuple[bool, Opcode]] = [
+        (False, ("replace", 0, len(a), 0, len(b)))
+    ]
+
+    while stack:
+        done, op = stack.pop()
+        if done:
+            if op[1] != op[2] or op[3] != op[4]:
+                ops.append(op)
+            continue
+        _, a1, a2, b1, b2 = op
+
+        # Common prefix
+        while a1 < a2 and b1 < b2 and keys_a[a1] == keys_b[b1]:
+            a1 += 1
+            b1 += 1
+        prefix: Opcode = ("equal", op[1], a1, op[3], b1)
+        # Common suffix
+        suffix_a, suffix_b = a2, b2
+        while a1 < a2 and b1 < b2 and keys_a[a2 - 1] == keys_b[b2 - 1]:
+            a2 -= 1
+            b2 -= 1
+        suffix: Opcode = ("equal", a2, suffix_a, b2, suffix_b)
+
+        # Push in reverse, so that opcodes are produced in order
+        stack.append((True, suffix))
+        if a1 == a2 or b1 == b2:
+            tag: OpTag = "insert" if a1 == a2 else "delete"
+            stack.append((True, (tag, a1, a2, b1, b2)))
+        else:
+            anchors = _longest_increasing(
+                _unique_anchors(keys_a, keys_b, a1, a2, b1, b2)
+            )
+            if not anchors:
+                stack.append((True, ("replace", a1, a2, b1, b2)))
+            else:
+                # Align the regions between each anchor, pushing them in
+                # reverse so that they're processed in order
+                last_a, last_b = anchors[-1]
+                stack.append(
+                    (False, ("replace", last_a + 1, a2, last_b + 1, b2))
+                )
+                for n in reversed(range(len(anchors))):
+                    i, j = anchors[n]
+                    stack.append((True, ("equal", i, i + 1, j, j + 1)))
+                    if n:
+                        start_a, start_b = anchors[n - 1]
+                        start_a, start_b = start_a + 1, start_b + 1
+                    else:
+                        start_a, start_b = a1, b1
+                    stack.append((False, ("replace", start_a, i, start_b, j)))
+        stack.append((True, prefix))
+
+    return ops
@@ -0,0 +1,113 @@
+"""
+Diff sessions
+
+State that is shared by every step of a single comparison or diff, so that
+work on objects that are reached many times (such as rendering them in the
+headers of nested sub-diffs) is only done once.
+
+Objects must not be modified while a session is active, as cached results
+are keyed by object identity.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+
+@dataclass
+class CachedRepr:
+    """
+    A representation of an object, rendered during a session
+    """
+
+    obj: object
+    """
+    The object, kept alive so that its id can't be reused during the session
+    """
+    text: str
+    """The representation"""
+    level: int
+    """The level that the object was rendered at"""
+    height: int
+    """How deeply nested the calls to render the object were"""
+
+    def is_valid_at(self, level: int) -> bool:
+        """
+        Returns whether rendering the object at the given level would give the
+        same text
+        """
+        if level == self.level:
+            return True
+        # If no nested object was rendered at level 0, nothing was shortened
+        # by the level limit, so any level deep enough gives the same text
+        return self.level > self.height and level > self.height
+
+
+@dataclass
+class Rendering:
+    """
+    An object that is currently being rendered during a session
+    """
+
+    obj_id: int
+    """Id of the object"""
+    height: int = 0
+    """How deeply nested the calls to render the object have been so far"""
+    cyclic: bool = False
+    """
+    Whether a reference back to an object that was being rendered was found,
+    in which case the representation depends on where the object was reached
+    from, and so can't be cached
+    """
+
+
+@dataclass
+class DiffSession:
+    """
+    Results cached during a single comparison or diff
+    """
+
+    reprs: dict[int, CachedRepr] = field(default_factory=dict)
+    """Cached representations, by object id"""
+    rendering: list[Rendering] = field(default_factory=list)
+    """Objects currently being rendered, innermost last"""
+    rendering_ids: set[int] = field(default_factory=set)
+    """Ids of the objects currently being rendered"""
+    frozen: dict[int, tuple[object, object]] = field(default_factory=dict)
+    """
+    Cached hashable equivalents of containers, by object id, along with the
+    original container to keep it alive
+    """
+    parallel_used: bool = False
+    """
+    Whether a container was matched in parallel, in which case no others are
+    """
+
+
+_session: ContextVar[DiffSession | None] = ContextVar("_session", default=None)
+
+
+def get_session() -> DiffSession | None:
+    """
+    Returns the active session, if there is one
+    """
+    return _session.get()
+
+
+@contextmanager
+def diff_session() -> Iterator[DiffSession]:
+    """
+    Share cached results between all the work done while the context is
+    active. If a session is already active, it is reused.
+    """
+    session = _session.get()
+    if session is not None:
+        yield session
+        return
+    session = DiffSession()
+    token = _session.set(session)
+    try:
+        yield session
+    finally:
+        _session.reset(token)
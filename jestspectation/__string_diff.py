@@ -0,0 +1,261 @@
+"""
+String diff
+
+Diffs of long strings, which show only a window of each string around the
+first difference, with carets marking the characters that differ, rather
+than the full strings.
+"""
+
+from collections.abc import Iterator
+
+CHUNK_SIZE = 1 << 16
+"""
+Number of characters compared at a time when searching for a difference
+"""
+
+WINDOW_WIDTH = 60
+"""
+Maximum number of characters of each string to show. Strings that are no
+longer than this are shown in full.
+"""
+
+WINDOW_CONTEXT = 20
+"""
+Number of characters to show before the first difference
+"""
+
+MYERS_LIMIT = 1000
+"""
+Maximum combined length of the differing parts of two strings for which a
+character-level diff is calculated
+"""
+
+_INDENT = len("Expected ")
+"""
+Width of the label before each window, which caret lines are indented by
+"""
+
+
+def is_long_string(text: str) -> bool:
+    """
+    Returns whether a string is too long to be shown in full in a diff
+    """
+    return len(text) > WINDOW_WIDTH
+
+
+def common_prefix(a: str, b: str) -> int:
+    """
+    Returns the length of the common prefix of two strings
+    """
+    length = min(len(a), len(b))
+    pos = 0
+    # Skip equal chunks, which are compared as slices so that the
+    # comparison is done in C
+    while pos < length:
+        end = min(pos + CHUNK_SIZE, length)
+        if a[pos:end] != b[pos:end]:
+            break
+        pos = end
+    else:
+        return length
+    # Then narrow down the differing chunk by halving it
+    while end - pos > 1:
+        mid = (pos + end) // 2
+        if a[pos:mid] == b[pos:mid]:
+            pos = mid
+        else:
+            end = mid
+    return pos
+
+
+def common_suffix(a: str, b: str, limit: int) -> int:
+    """
+    Returns the length of the common suffix of two strings, up to `limit`
+    characters
+    """
+    len_a, len_b = len(a), len(b)
+    length = 0
+    while length < limit:
+        end = min(length + CHUNK_SIZE, limit)
+        if a[len_a - end : len_a - length] != b[len_b - end : len_b - length]:
+            break
+        length = end
+    else:
+        return limit
+    while end - length > 1:
+        mid = (length + end) // 2
+        if a[len_a - mid : len_a - length] == b[len_b - mid : len_b - length]:
+            length = mid
+        else:
+            end = mid
+    return length
+
+
+def myers_diff(
+    a: str,
+    b: str,
+    max_edits: int,
+) -> tuple[set[int], set[int]] | None:
+    """
+    Calculate a shortest edit script between two strings using Myers'
+    algorithm.
+
+    Returns the indexes of characters deleted from `a` and inserted into
+    `b`, or `None` if more than `max_edits` edits are needed.
+    """
+    n, m = len(a), len(b)
+    # Furthest x position reached on each diagonal `k = x - y`
+    v = {1: 0}
+    # State of `v` before each number of edits, for backtracking
+    trace = []
+
+    for d in range(max_edits + 1):
+        trace.append(v.copy())
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return None
+
+
+def _backtrack(
+    trace: list[dict[int, int]],
+    x: int,
+    y: int,
+) -> tuple[set[int], set[int]]:
+    """
+    Follow the edits recorded by `myers_diff` back from the end of both
+    strings
+    """
+    deleted: set[int] = set()
+    inserted: set[int] = set()
+    for d in range(len(trace) - 1, 0, -1):
+        v = trace[d]
+        k = x - y
+        down = k == -d or (k != d and v[k - 1] < v[k + 1])
+        prev_k = k + 1 if down else k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        if down:
+            inserted.add(prev_y)
+        else:
+            deleted.add(prev_x)
+        x, y = prev_x, prev_y
+    return deleted, inserted
+
+
+def _escape(char: str) -> str:
+    """
+    Representation of a character within a quoted string
+    """
+    return repr(char)[1:-1]
+
+
+def iter_window(
+    label: str,
+    text: str,
+    pos: int,
+    marks: set[int] | None = None,
+) -> Iterator[str]:
+    """
+    Lines showing a window of the text around the given position, followed
+    by a line of carets beneath the marked characters, or beneath the
+    position if none of the marked characters are in the window.
+
+    Args:
+        label (str): label for the window, such as `"Expected"`
+        text (str): text to show
+        pos (int): index to show within the window
+        marks (set[int], optional): indexes of characters to mark
+    """
+    start = max(0, pos - WINDOW_CONTEXT)
+    end = min(len(text), start + WINDOW_WIDTH)
+
+    shown = ["..." if start else "", "'"]
+    carets = [" " * (_INDENT + len(shown[0]) + 1)]
+    caret_pos = None
+    for i in range(start, end):
+        char = _escape(text[i])
+        shown.append(char)
+        if i == pos:
+            caret_pos = len(carets)
+        carets.append(
+            "^" * len(char) if marks and i in marks else " " * len(char)
+        )
+    if caret_pos is None:
+        # The position is at the end of the window
+        caret_pos = len(carets)
+        carets.append(" ")
+    if not marks or not any(start <= i < end for i in marks):
+        carets[caret_pos] = "^" + carets[caret_pos][1:]
+    shown.append("'")
+    if end < len(text):
+        shown.append("...")
+
+    yield f"{label} {''.join(shown)}"
+    yield "".join(carets).rstrip()
+
+
+def iter_string_diff(expected: str, received: str) -> Iterator[str]:
+    """
+    Lines explaining the differences between two unequal strings, showing
+    only a window around the first difference
+    """
+    prefix = common_prefix(expected, received)
+    shortest = min(len(expected), len(received))
+    suffix = common_suffix(expected, received, shortest - prefix)
+
+    yield f"Strings differ from index {prefix}"
+    if len(expected) != len(received):
+        yield f"Expected {len(expected)} characters"
+        yield f"Received {len(received)} characters"
+
+    expected_marks = received_marks = None
+    expected_end = len(expected) - suffix
+    received_end = len(received) - suffix
+    if expected_end + received_end - 2 * prefix <= MYERS_LIMIT:
+        edits = myers_diff(
+            expected[prefix:expected_end],
+            received[prefix:received_end],
+            MYERS_LIMIT,
+        )
+        if edits is not None:
+            deleted, inserted = edits
+            expected_marks = {prefix + i for i in deleted}
+            received_marks = {prefix + i for i in inserted}
+
+    yield from iter_window("Expected", expected, prefix, expected_marks)
+    yield from iter_window("Received", received, prefix, received_marks)
+
+
+def iter_substring_diff(substring: str, text: str) -> Iterator[str]:
+    """
+    Lines explaining where a substring that isn't contained in some text
+    failed to match, by finding the longest prefix of the substring that is
+    contained in the text
+    """
+    # Prefixes of a contained prefix are also contained, so the longest one
+    # can be found by halving the range of lengths
+    found, missing = 0, len(substring)
+    while missing - found > 1:
+        mid = (found + missing) // 2
+        if substring[:mid] in text:
+            found = mid
+        else:
+            missing = mid
+    index = text.find(substring[:found])
+
+    if found:
+        yield f"First {found} characters of substring found at index {index}"
+    else:
+        yield "No part of substring found"
+    yield from iter_window("Expected", substring, found)
+    yield from iter_window("Received", text, index + found)
@@ -3,7 +3,8 @@ Matches strings containing a substring
 """
 
 from ..__jestspectation_base import JestspectationBase
-from ..__util import safe_diff_wrapper
+from ..__string_diff import is_long_string, iter_substring_diff
+from ..__util import bounded_repr, safe_diff_wrapper
 
 
 class StringContaining(JestspectationBase):
@@ -21,25 +22,37 @@ class StringContaining(JestspectationBase):
         """
         self.__substring = substring
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__substring,)
+
     def __repr__(self) -> str:
-        return f"StringContaining({repr(self.__substring)})"
+        return f"StringContaining({bounded_repr(self.__substring)})"
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, str):
             return False
         return self.__substring in other
 
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        return (str,)
+
     @safe_diff_wrapper
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
         if not isinstance(other, str):
             return [
                 "Type mismatch",
                 f"Expected object of type str ({repr(self)})",
-                f"Received object of type {type(other).__name__} ({other})",
+                f"Received object of type {type(other).__name__} "
+                f"({bounded_repr(other)})",
+            ]
+        elif is_long_string(self.__substring) or is_long_string(other):
+            return [
+                "String failed to match",
+                *iter_substring_diff(self.__substring, other),
             ]
         else:
             return [
                 "String failed to match",
                 f"Expected {repr(self)}",
-                f"Received {repr(other)}",
+                f"Received {bounded_repr(other)}",
             ]
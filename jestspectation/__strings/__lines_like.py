@@ -3,12 +3,17 @@ Matches text similar to the given text, but with better diffs for
 multi-line text
 """
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from itertools import zip_longest
 from typing import overload
 
 from ..__jestspectation_base import JestspectationBase
-from ..__util import safe_diff_wrapper, sub_diff_delegate
+from ..__util import (
+    bounded_repr,
+    iter_sub_diff,
+    prefix_first_line,
+    safe_lazy_diff_wrapper,
+)
 from .__text_like import TextLike
 
 
@@ -99,8 +104,18 @@ class LinesLike(JestspectationBase):
         self.__og_lines = lines
         self.__lines = self.__create_match_list(lines)
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (
+            self.__og_lines,
+            self.__ignore_case,
+            None
+            if self.__ignored_sequences is None
+            else list(self.__ignored_sequences),
+            self.__strip_lines,
+        )
+
     def __repr__(self) -> str:
-        return f"LinesLike({repr(self.__og_lines)})"
+        return f"LinesLike({bounded_repr(self.__og_lines)})"
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, str):
@@ -120,37 +135,41 @@ class LinesLike(JestspectationBase):
             ]
         )
 
-    @safe_diff_wrapper
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        return (str, list)
+
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
+        return list(self.iter_diff(other, other_is_lhs))
+
+    @safe_lazy_diff_wrapper
+    def iter_diff(self, other: object, other_is_lhs: bool) -> Iterator[str]:
         if isinstance(other, str):
             lines = self.__filter_lines(other.splitlines())
         elif isinstance(other, list):
             lines = self.__filter_lines(other)
         else:
-            return [
-                "Type mismatch",
-                f"Expected object of type str ({repr(self)})",
-                f"Received object of type {type(other).__name__} ({other})",
-            ]
+            yield "Type mismatch"
+            yield f"Expected object of type str ({repr(self)})"
+            yield (
+                f"Received object of type {type(other).__name__} "
+                f"({bounded_repr(other)})"
+            )
+            return
 
-        # Generate the diffs for each line
-        diffs: list[str] = []
+        yield "Lines failed to match"
 
+        # Generate the diffs for each line
         for i, (expected, actual) in enumerate(
             zip_longest(self.__lines, lines)
         ):
             if expected == actual:
-                diffs.append(f"== [{i}] {expected}")
+                yield f"== [{i}] {expected}"
             elif expected is None:
-                diffs.append(f"++ [{i}] {actual}")
+                yield f"++ [{i}] {actual}"
             elif actual is None:
-                diffs.append(f"-- [{i}] {expected}")
+                yield f"-- [{i}] {expected}"
             else:
-                sub_diff = sub_diff_delegate(expected, actual, other_is_lhs)
-                assert sub_diff is not None
-                sub_diff[0] = f"!! [{i}] {sub_diff[0][3:]}"
-                diffs.extend(sub_diff)
-
-        return [
-            "Lines failed to match",
-        ] + diffs
+                yield from prefix_first_line(
+                    iter_sub_diff(expected, actual, other_is_lhs),
+                    f"!! [{i}] ",
+                )
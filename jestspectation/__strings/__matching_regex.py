@@ -3,9 +3,10 @@ Matches strings that match a regular expression
 """
 
 import re
+from collections.abc import Callable
 
 from ..__jestspectation_base import JestspectationBase
-from ..__util import safe_diff_wrapper
+from ..__util import bounded_repr, safe_diff_wrapper
 
 
 class StringMatchingRegex(JestspectationBase):
@@ -23,6 +24,9 @@ class StringMatchingRegex(JestspectationBase):
         self.__raw_regex = regex
         self.__regex = re.compile(regex)
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__raw_regex,)
+
     def __repr__(self) -> str:
         return f"StringMatchingRegex({repr(self.__raw_regex)})"
 
@@ -31,17 +35,25 @@ class StringMatchingRegex(JestspectationBase):
             return False
         return re.match(self.__regex, other) is not None
 
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        return (str,)
+
+    def _compile(self) -> Callable[[object], bool]:
+        match = self.__regex.match
+        return lambda other: isinstance(other, str) and bool(match(other))
+
     @safe_diff_wrapper
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
         if not isinstance(other, str):
             return [
                 "Type mismatch",
                 f"Expected object of type str ({repr(self)})",
-                f"Received object of type {type(other).__name__} ({other})",
+                f"Received object of type {type(other).__name__} "
+                f"({bounded_repr(other)})",
             ]
         else:
             return [
                 "Regex failed to match",
                 f"Expected {repr(self)}",
-                f"Received {repr(other)}",
+                f"Received {bounded_repr(other)}",
             ]
@@ -5,7 +5,8 @@ Matches text similar to the given text
 from collections.abc import Iterable
 
 from ..__jestspectation_base import JestspectationBase
-from ..__util import safe_diff_wrapper
+from ..__string_diff import is_long_string, iter_string_diff
+from ..__util import bounded_repr, safe_diff_wrapper
 
 
 class TextLike(JestspectationBase):
@@ -56,8 +57,16 @@ class TextLike(JestspectationBase):
 
         self.__match_text = self.__simplify_text(self.__og_text)
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (
+            self.__og_text,
+            self.__ignore_case,
+            list(self.__ignored_sequences),
+            self.__strip,
+        )
+
     def __repr__(self) -> str:
-        return f"TextLike({repr(self.__og_text)})"
+        return f"TextLike({bounded_repr(self.__og_text)})"
 
     def __str__(self) -> str:
         return self.__og_text
@@ -67,17 +76,29 @@ class TextLike(JestspectationBase):
             return False
         return self.__match_text == self.__simplify_text(other)
 
+    def _get_match_types(self) -> tuple[type, ...] | None:
+        return (str,)
+
     @safe_diff_wrapper
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
         if not isinstance(other, str):
             return [
                 "Type mismatch",
                 f"Expected object of type str ({repr(self)})",
-                f"Received object of type {type(other).__name__} ({other})",
+                f"Received object of type {type(other).__name__} "
+                f"({bounded_repr(other)})",
+            ]
+        elif is_long_string(self.__og_text) or is_long_string(other):
+            # Show the simplified text, since that's what was compared
+            return [
+                "String failed to match",
+                *iter_string_diff(
+                    self.__match_text, self.__simplify_text(other)
+                ),
             ]
         else:
             return [
                 "String failed to match",
                 f"Expected {repr(self)}",
-                f"Received {repr(other)}",
+                f"Received {bounded_repr(other)}",
             ]
@@ -2,10 +2,13 @@
 Utility functions
 """
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 from functools import wraps
 from typing import TypeVar
 
+from .__config import configure
+from .__session import diff_session
+
 T = TypeVar("T")
 
 
@@ -23,16 +26,105 @@ def get_type_name(t: type) -> str:
     return t.__name__
 
 
+def bounded_repr(obj: object) -> str:
+    """
+    Return a representation of an object for display in a diff, shortened
+    according to the configured `repr_limits`
+    """
+    with diff_session():
+        return configure().repr_limits.repr(obj)
+
+
+def sorted_for_display(items: Iterable[T]) -> list[T]:
+    """
+    Return the given items in a deterministic sorted order for display.
+
+    If the items can't be compared with each other, they are sorted by their
+    type name and representation instead.
+    """
+    items = list(items)
+    try:
+        return sorted(items)  # type: ignore
+    except TypeError:
+        return sorted(items, key=lambda i: (type(i).__name__, repr(i)))
+
+
 def indent_lines(lines: list[str], amount: int) -> list[str]:
     """
     Return a list of strings indented by the given amount
     """
-    return list(
-        map(
-            lambda line: f"{' ' * amount}{line}",
-            lines,
-        )
-    )
+    return list(iter_indent_lines(lines, amount))
+
+
+def iter_indent_lines(lines: Iterable[str], amount: int) -> Iterator[str]:
+    """
+    Lazily indent the given lines by the given amount
+    """
+    indent = " " * amount
+    for line in lines:
+        yield f"{indent}{line}"
+
+
+def prefix_first_line(lines: Iterable[str], prefix: str) -> Iterator[str]:
+    """
+    Lazily replace the indent of the first line with the given prefix, which
+    is used to add a dot point to a sub-diff, such as `"!! "`.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+    yield prefix + first[3:]
+    yield from lines
+
+
+def collect_diff(lines: Iterable[str]) -> list[str] | None:
+    """
+    Collect the lines of a lazy diff into a list, or return None if there
+    were no lines, meaning that the values were equal
+    """
+    with diff_session():
+        diff = list(lines)
+    return diff if len(diff) else None
+
+
+def truncate_diff(lines: Iterable[str]) -> list[str]:
+    """
+    Collect the lines of a lazy diff, stopping once the line or byte budget
+    set in the configuration is exceeded.
+
+    When the diff is truncated, a summary line is added to the end. Lines
+    after the budget are never generated.
+    """
+    max_lines = configure().diff_max_lines
+    max_bytes = configure().diff_max_bytes
+
+    ret: list[str] = []
+    total_bytes = 0
+    with diff_session():
+        for line in lines:
+            # Include the newline used to join the lines
+            total_bytes += len(line.encode()) + 1
+            if (max_lines is not None and len(ret) >= max_lines) or (
+                max_bytes is not None and total_bytes > max_bytes
+            ):
+                ret.append(
+                    f"... more differences (truncated after {len(ret)} lines)"
+                )
+                break
+            ret.append(line)
+
+    return ret
+
+
+def eq_expr_str(matcher: object, other: object, other_is_lhs: bool) -> str:
+    """
+    Returns an equality expression between the matcher and the other object
+    """
+    if other_is_lhs:
+        return f"{bounded_repr(other)} == {bounded_repr(matcher)}"
+    else:
+        return f"{bounded_repr(matcher)} == {bounded_repr(other)}"
 
 
 def diff_wrapper(
@@ -51,10 +143,7 @@ def diff_wrapper(
     ) -> list[str] | None:
         if matcher == other:
             return None
-        if other_is_lhs:
-            eq_expr = f"{repr(other)} == {repr(matcher)}"
-        else:
-            eq_expr = f"{repr(matcher)} == {repr(other)}"
+        eq_expr = eq_expr_str(matcher, other, other_is_lhs)
         return [eq_expr] + diff_function(matcher, other, other_is_lhs)
 
     return wrapper
@@ -70,15 +159,30 @@ def safe_diff_wrapper(
 
     @wraps(diff_function)
     def wrapper(matcher: T, other: object, other_is_lhs: bool) -> list[str]:
-        if other_is_lhs:
-            eq_expr = f"{repr(other)} == {repr(matcher)}"
-        else:
-            eq_expr = f"{repr(matcher)} == {repr(other)}"
+        eq_expr = eq_expr_str(matcher, other, other_is_lhs)
         return [eq_expr] + diff_function(matcher, other, other_is_lhs)
 
     return wrapper
 
 
+def safe_lazy_diff_wrapper(
+    diff_function: Callable[[T, object, bool], Iterable[str]],
+) -> Callable[[T, object, bool], Iterator[str]]:
+    """
+    Decorator around lazy diff functions to add an equality statement, for
+    functions that are only called if the values are not equal
+    """
+
+    @wraps(diff_function)
+    def wrapper(
+        matcher: T, other: object, other_is_lhs: bool
+    ) -> Iterator[str]:
+        yield eq_expr_str(matcher, other, other_is_lhs)
+        yield from diff_function(matcher, other, other_is_lhs)
+
+    return wrapper
+
+
 def sub_diff_delegate(
     matcher: object,
     other: object,
@@ -91,69 +195,30 @@ def sub_diff_delegate(
     This is used to recursively calculate the difference between two objects,
     including Python built-ins
     """
-    # Avoid a circular import
-    from . import __py_diffs as py_diffs
-
-    def do_sub_diff(
-        matcher: object,
-        other: object,
-        other_is_lhs: bool,
-    ) -> list[str] | None:
-        """
-        Inner function so we can wrap up the return values
-        """
-        from .__jestspectation_base import JestspectationBase
+    return collect_diff(iter_sub_diff(matcher, other, other_is_lhs, indent))
 
-        if matcher == other:
-            return None
 
-        # Handle our own types
-        if isinstance(matcher, JestspectationBase):
-            return matcher.get_diff(other, other_is_lhs)
-        if isinstance(other, JestspectationBase):
-            return other.get_diff(matcher, not other_is_lhs)
-
-        elif isinstance(matcher, list):
-            return py_diffs.diff_list(matcher, other, other_is_lhs)
-
-        elif isinstance(matcher, set):
-            return py_diffs.diff_set(matcher, other, other_is_lhs)
-
-        elif isinstance(matcher, dict):
-            return py_diffs.diff_dict(matcher, other, other_is_lhs)
+def iter_sub_diff(
+    matcher: object,
+    other: object,
+    other_is_lhs: bool,
+    indent: bool = True,
+) -> Iterator[str]:
+    """
+    Lazily calculate a sub-diff, yielding no lines if the objects are equal
 
-        # For other objects, just do the repr
-        if matcher == other:
-            return None
-        else:
-            if other_is_lhs:
-                eq_expr = f"{repr(other)} == {repr(matcher)}"
-            else:
-                eq_expr = f"{repr(matcher)} == {repr(other)}"
-
-            if not (
-                isinstance(other, type(matcher))
-                or isinstance(matcher, type(other))
-            ):
-                mismatch = "Type mismatch"
-                matcher_repr = f"{repr(matcher)} ({type(matcher).__name__})"
-                other_repr = f"{repr(other)} ({type(other).__name__})"
-            else:
-                mismatch = "Value mismatch"
-                matcher_repr = repr(matcher)
-                other_repr = repr(other)
-
-            return [
-                eq_expr,  # x == y
-                mismatch,  # "Type/Value"
-                f"Expected {matcher_repr}",
-                f"Received {other_repr}",
-            ]
-
-    diff = do_sub_diff(matcher, other, other_is_lhs)
-    if diff is None:
-        return None
-    if indent:
-        return indent_lines(diff, 3)
-    else:
-        return diff
+    This is used to recursively calculate the difference between two objects,
+    including Python built-ins. Nested built-in values are diffed
+    iteratively, so this works for structures of any depth.
+    """
+    # Avoid a circular import
+    from .__diff_engine import run_diff
+    from .__py_diffs import start_diff
+
+    return run_diff(
+        start_diff,
+        matcher,
+        other,
+        other_is_lhs,
+        "   " if indent else "",
+    )
@@ -0,0 +1,119 @@
+"""
+Validators
+
+Validators are functions that check whether an object matches an expected
+value. Expectation trees are turned into validators once, so that matching
+them against many objects doesn't repeat any of the work of walking the
+tree and checking which kind of value each part of it is.
+"""
+
+from collections.abc import Callable
+from functools import partial
+from operator import eq
+
+from .__jestspectation_base import JestspectationBase
+
+Validator = Callable[[object], bool]
+"""
+Function that returns whether an object matches an expected value
+"""
+
+_REFLEXIVE_TYPES = {str, int, bool, bytes, type(None)}
+"""
+Exact types of values that are always equal to themselves, which don't need
+the identity check that containers use when comparing their items
+"""
+
+_MISSING = object()
+"""
+Placeholder for missing dict keys
+"""
+
+
+def compile_value(expected: object) -> Validator:
+    """
+    Returns a validator that checks whether an object is equal to the
+    expected value, which may be a matcher, or contain matchers.
+
+    Dicts, lists and tuples are checked item by item using the validators of
+    their items. Objects of other types are compared using `==`.
+
+    Raises:
+        RecursionError: the expected value contains itself
+    """
+    if isinstance(expected, JestspectationBase):
+        return expected._compile()
+    expected_type = type(expected)
+    if expected_type is dict:
+        return _compile_dict(expected)  # type: ignore
+    if expected_type is list or expected_type is tuple:
+        return _compile_sequence(expected)  # type: ignore
+    return partial(eq, expected)
+
+
+def _compile_item(expected: object) -> Validator:
+    """
+    Returns a validator for an item of a container, which, like the
+    container's own comparison, considers identical objects to be equal
+    """
+    if (
+        isinstance(expected, (JestspectationBase, dict, list, tuple))
+        or type(expected) in _REFLEXIVE_TYPES
+    ):
+        return compile_value(expected)
+
+    def check(other: object) -> bool:
+        return other is expected or bool(expected == other)
+
+    return check
+
+
+def _compile_dict(expected: dict) -> Validator:
+    """
+    Validator for a dict, which checks the value of each key
+    """
+    checks = [(key, _compile_item(value)) for key, value in expected.items()]
+    length = len(checks)
+    # Objects of other types, such as dict subclasses, are compared in the
+    # usual way, since they could override `==`
+    fallback = partial(eq, expected)
+
+    def check(other: object) -> bool:
+        if other is expected:
+            return True
+        if type(other) is not dict:
+            return fallback(other)
+        if len(other) != length:
+            return False
+        get = other.get
+        for key, check_value in checks:
+            value = get(key, _MISSING)
+            if value is _MISSING or not check_value(value):
+                return False
+        return True
+
+    return check
+
+
+def _compile_sequence(expected: list | tuple) -> Validator:
+    """
+    Validator for a list or tuple, which checks each item in order
+    """
+    expected_type = type(expected)
+    checks = [_compile_item(item) for item in expected]
+    length = len(checks)
+    fallback = partial(eq, expected)
+
+    def check(other: object) -> bool:
+        if other is expected:
+            return True
+        if type(other) is not expected_type:
+            return fallback(other)
+        if len(other) != length:  # type: ignore
+            return False
+        for check_item, item in zip(checks, other, strict=True):  # type: ignore
+            if not check_item(item):
+                return False
+        return True
+
+    return check
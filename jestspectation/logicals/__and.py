@@ -4,8 +4,16 @@ Logicals / And
 Matchers that can be used to perform logical operations on other matchers
 """
 
+from collections.abc import Callable, Iterator
+
 from ..__jestspectation_base import JestspectationBase
-from ..__util import safe_diff_wrapper, sub_diff_delegate
+from ..__util import (
+    bounded_repr,
+    iter_sub_diff,
+    prefix_first_line,
+    safe_lazy_diff_wrapper,
+)
+from ..__validators import compile_value
 
 
 class And(JestspectationBase):
@@ -34,28 +42,35 @@ class And(JestspectationBase):
             )
         self.__matchers = matchers
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (*self.__matchers,)
+
     def __repr__(self) -> str:
-        return f"And{repr(self.__matchers)}"
+        matchers = ", ".join(bounded_repr(m) for m in self.__matchers)
+        return f"And({matchers})"
 
     def __eq__(self, other: object) -> bool:
         return len(self.__get_misses(other)) == 0
 
+    def _compile(self) -> Callable[[object], bool]:
+        checks = [compile_value(m) for m in self.__matchers]
+        return lambda other: all(check(other) for check in checks)
+
     def __get_misses(self, other: object) -> list[object]:
         """
         Return matchers that didn't match
         """
         return list(filter(lambda m: m != other, self.__matchers))
 
-    @safe_diff_wrapper
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
-        ret = [
-            "Not all matches fulfilled",
-            f"{repr(other)} failed to match with",
-        ]
-        for m in self.__get_misses(other):
-            diff = sub_diff_delegate(m, other, other_is_lhs)
-            assert diff is not None
-            diff[0] = "-- " + diff[0][3:]
-            ret += diff
+        return list(self.iter_diff(other, other_is_lhs))
 
-        return ret
+    @safe_lazy_diff_wrapper
+    def iter_diff(self, other: object, other_is_lhs: bool) -> Iterator[str]:
+        yield "Not all matches fulfilled"
+        yield f"{bounded_repr(other)} failed to match with"
+        for m in self.__get_misses(other):
+            yield from prefix_first_line(
+                iter_sub_diff(m, other, other_is_lhs),
+                "-- ",
+            )
@@ -4,7 +4,11 @@ Logicals / Not
 Matchers that can be used to perform logical operations on other matchers
 """
 
+from collections.abc import Callable
+
 from ..__jestspectation_base import JestspectationBase
+from ..__util import bounded_repr
+from ..__validators import compile_value
 
 
 class Not(JestspectationBase):
@@ -30,20 +34,32 @@ class Not(JestspectationBase):
         """
         self.__matcher = matcher
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (self.__matcher,)
+
     def __repr__(self) -> str:
-        return f"Not({repr(self.__matcher)})"
+        return f"Not({bounded_repr(self.__matcher)})"
 
     def __eq__(self, object: object) -> bool:
         return not self.__matcher == object
 
+    def _compile(self) -> Callable[[object], bool]:
+        check = compile_value(self.__matcher)
+        return lambda other: not check(other)
+
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
         if other_is_lhs:
-            eq_expr = f"{repr(other)} != {repr(self.__matcher)}"
+            eq_expr = (
+                f"{bounded_repr(other)} != {bounded_repr(self.__matcher)}"
+            )
         else:
-            eq_expr = f"{repr(self.__matcher)} != {repr(other)}"
+            eq_expr = (
+                f"{bounded_repr(self.__matcher)} != {bounded_repr(other)}"
+            )
         return [
             eq_expr,
             "Unwanted match",
-            f"Expected object that doesn't match with {repr(self.__matcher)}",
-            f"Received {repr(other)}",
+            "Expected object that doesn't match with "
+            f"{bounded_repr(self.__matcher)}",
+            f"Received {bounded_repr(other)}",
         ]
@@ -4,8 +4,15 @@ Logicals / Xor
 Matchers that can be used to perform logical operations on other matchers
 """
 
+from collections.abc import Iterator
+
 from ..__jestspectation_base import JestspectationBase
-from ..__util import safe_diff_wrapper, sub_diff_delegate
+from ..__util import (
+    bounded_repr,
+    iter_sub_diff,
+    prefix_first_line,
+    safe_lazy_diff_wrapper,
+)
 
 
 class Xor(JestspectationBase):
@@ -35,8 +42,12 @@ class Xor(JestspectationBase):
             )
         self.__matchers = matchers
 
+    def __reduce__(self) -> tuple[type, tuple]:
+        return type(self), (*self.__matchers,)
+
     def __repr__(self) -> str:
-        return f"Xor{repr(self.__matchers)}"
+        matchers = ", ".join(bounded_repr(m) for m in self.__matchers)
+        return f"Xor({matchers})"
 
     def __eq__(self, other: object) -> bool:
         return len(self.__get_hits(other)) == 1
@@ -47,27 +58,23 @@ class Xor(JestspectationBase):
         """
         return list(filter(lambda m: m == other, self.__matchers))
 
-    @safe_diff_wrapper
     def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
+        return list(self.iter_diff(other, other_is_lhs))
+
+    @safe_lazy_diff_wrapper
+    def iter_diff(self, other: object, other_is_lhs: bool) -> Iterator[str]:
         hits = self.__get_hits(other)
         if len(hits) == 0:
-            ret = [
-                "No matches fulfilled",
-                f"{repr(other)} must match with exactly one of",
-            ]
+            yield "No matches fulfilled"
+            yield f"{bounded_repr(other)} must match with exactly one of"
             for m in self.__matchers:
-                diff = sub_diff_delegate(m, other, other_is_lhs)
-                assert diff is not None
-                diff[0] = "-- " + diff[0][3:]
-                ret += diff
+                yield from prefix_first_line(
+                    iter_sub_diff(m, other, other_is_lhs),
+                    "-- ",
+                )
         else:
-            ret = [
-                "Too many matches fulfilled",
-                f"{repr(other)} matched with",
-            ]
+            yield "Too many matches fulfilled"
+            yield f"{bounded_repr(other)} matched with"
             for m in hits:
-                ret += [f"++ {repr(m)} == {repr(other)}"]
-            ret += [
-                "But should only have matched with one of them",
-            ]
-        return ret
+                yield f"++ {bounded_repr(m)} == {bounded_repr(other)}"
+            yield "But should only have matched with one of them"
@@ -10,6 +10,7 @@ import pytest
 from .__config import configure
 from .__equals import Equals
 from .__jestspectation_base import JestspectationBase
+from .__util import truncate_diff
 
 
 def pytest_assertrepr_compare(
@@ -23,10 +24,10 @@ def pytest_assertrepr_compare(
     """
     if op == "==":
         if isinstance(right, JestspectationBase):
-            return right.get_diff(left, True)
+            return truncate_diff(right.iter_diff(left, True))
         elif isinstance(left, JestspectationBase):
-            return left.get_diff(right, False)
+            return truncate_diff(left.iter_diff(right, False))
         elif configure().pytest_all_diffs:
-            return Equals(right).get_diff(left, False)
+            return truncate_diff(Equals(right).iter_diff(left, False))
 
     return None
@@ -0,0 +1,167 @@
+"""
+Tests / Array Approx Test
+"""
+
+from array import array
+
+import pytest
+
+from jestspectation import ArrayApprox, Equals
+
+
+@pytest.fixture(params=["fallback", "numpy"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch):
+    """
+    Run the test both with and without NumPy
+    """
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(
+            "jestspectation.__array_approx._numpy", lambda: None
+        )
+
+
+@pytest.mark.usefixtures("backend")
+def test_magnitude():
+    assert ArrayApprox([1.0, 2.0], magnitude=0.1) == [1.05, 1.95]
+
+
+@pytest.mark.usefixtures("backend")
+def test_magnitude_fail():
+    assert ArrayApprox([1.0, 2.0], magnitude=0.1) != [1.05, 2.2]
+
+
+@pytest.mark.usefixtures("backend")
+def test_percent():
+    assert ArrayApprox([100, -200], percent=10) == [110, -181]
+
+
+@pytest.mark.usefixtures("backend")
+def test_percent_fail():
+    assert ArrayApprox([100, -200], percent=10) != [100, -179]
+
+
+@pytest.mark.usefixtures("backend")
+def test_nan_never_matches():
+    assert ArrayApprox([1.0], magnitude=1) != [float("nan")]
+
+
+@pytest.mark.usefixtures("backend")
+def test_buffers():
+    expected = array("d", [1.0, 2.0, 3.0])
+    received = array("f", [1.0, 2.0, 3.0])
+    assert ArrayApprox(expected, magnitude=0.1) == received
+    assert ArrayApprox(expected, magnitude=0.1) == memoryview(received)
+
+
+@pytest.mark.usefixtures("backend")
+def test_iterable_consumed_once():
+    assert ArrayApprox(iter([1.0, 2.0]), magnitude=0.1) == (1.0, 2.0)
+
+
+@pytest.mark.usefixtures("backend")
+def test_shape_mismatch():
+    assert ArrayApprox([1.0, 2.0], magnitude=0.1) != [1.0]
+    assert ArrayApprox([1.0, 2.0], magnitude=0.1).get_diff([1.0], False) == [
+        "Shape mismatch",
+        "Expected shape (2,)",
+        "Received shape (1,)",
+    ]
+
+
+@pytest.mark.usefixtures("backend")
+def test_bad_type():
+    assert ArrayApprox([1.0], magnitude=0.1) != "a"
+    assert ArrayApprox([1.0], magnitude=0.1).get_diff(1, False) == [
+        "Type mismatch",
+        "Expected ArrayApprox([1.0], magnitude=0.1)",
+        "Received object of type int",
+    ]
+
+
+@pytest.mark.usefixtures("backend")
+def test_numeric_strings():
+    assert ArrayApprox([1.0, 2.0], magnitude=0.1) != ["1.0", "2.0"]
+    assert (
+        ArrayApprox([1.0, 2.0], magnitude=0.1).get_diff(["1.0", "2.0"], False)[
+            0
+        ]
+        == "Type mismatch"
+    )
+
+
+def test_memoryview_repr():
+    view = memoryview(array("d", [1.0, 2.0]))
+    assert repr(ArrayApprox(view, magnitude=0.1)) == (
+        "ArrayApprox([1.0, 2.0], magnitude=0.1)"
+    )
+
+
+def test_memoryview_repr_bounded(config):
+    config.repr_limits.maxlist = 3
+    view = memoryview(array("d", range(1000)))
+    assert repr(ArrayApprox(view, magnitude=0.1)) == (
+        "ArrayApprox([0.0, 1.0, 2.0, ...], magnitude=0.1)"
+    )
+
+
+@pytest.mark.usefixtures("backend")
+def test_diff():
+    expected = [0.0] * 20
+    received = [float(i % 3) for i in range(20)]
+    assert ArrayApprox(expected, magnitude=0.5).get_diff(received, False) == [
+        "Values out of range",
+        f"Expected ArrayApprox({expected}, magnitude=0.5)",
+        "13 of 20 values are outside the tolerance",
+        "Largest differences:",
+        "   [2] expected 0.0, received 2.0 (difference 2.0)",
+        "   [5] expected 0.0, received 2.0 (difference 2.0)",
+        "   [8] expected 0.0, received 2.0 (difference 2.0)",
+        "   [11] expected 0.0, received 2.0 (difference 2.0)",
+        "   [14] expected 0.0, received 2.0 (difference 2.0)",
+        "Mismatched indexes: [1], [2], [4], [5], [7], [8], [10], [11], [13], "
+        "[14], ...",
+    ]
+
+
+@pytest.mark.usefixtures("backend")
+def test_diff_nan_is_worst():
+    lines = ArrayApprox([1.0, 1.0], magnitude=0.1).get_diff(
+        [5.0, float("nan")], False
+    )
+    assert lines[4] == "   [1] expected 1.0, received nan (difference nan)"
+
+
+def test_nested_in_diff():
+    assert Equals({"a": [1.0, 2.0]}).get_diff(
+        {"a": ArrayApprox([1.0, 3.0], magnitude=0.1)}, True
+    )[2:4] == [
+        "   Values out of range",
+        "   Expected ArrayApprox([1.0, 3.0], magnitude=0.1)",
+    ]
+
+
+def test_numpy_arrays():
+    np = pytest.importorskip("numpy")
+    expected = np.array([[1.0, 2.0], [3.0, 4.0]])
+    assert ArrayApprox(expected, magnitude=0.1) == expected + 0.05
+    lines = ArrayApprox(expected, magnitude=0.1).get_diff(
+        np.array([[1.0, 2.0], [3.5, 4.0]]), False
+    )
+    assert lines[2:] == [
+        "1 of 4 values are outside the tolerance",
+        "Largest differences:",
+        "   [1, 0] expected 3.0, received 3.5 (difference 0.5)",
+        "Mismatched indexes: [1, 0]",
+    ]
+
+
+def test_both():
+    with pytest.raises(ValueError):
+        ArrayApprox([1.0], magnitude=5, percent=10)
+
+
+def test_both_unspecified():
+    with pytest.raises(ValueError):
+        ArrayApprox([1.0])
@@ -0,0 +1,157 @@
+"""
+Tests for limiting the size of values shown in diffs
+"""
+
+import pytest
+
+from jestspectation import (
+    And,
+    Equals,
+    Is,
+    ListContainingOnly,
+    Not,
+    ObjectContainingItems,
+    Or,
+    Xor,
+    assert_eq,
+    configure,
+)
+from jestspectation.__config.__config import Config
+
+
+def test_small_values_unchanged():
+    assert Equals([1, 2]).get_diff([1, 3], False) == [
+        "[1, 2] == [1, 3]",
+        "!! [1] 2 == 3",
+        "   Value mismatch",
+        "   Expected 2",
+        "   Received 3",
+    ]
+
+
+def test_header_shortened(config: Config):
+    config.repr_limits.maxlist = 3
+    assert Equals([1, 2, 3, 4]).get_diff([1, 2, 3, 5], False)[0] == (
+        "[1, 2, 3, ...] == [1, 2, 3, ...]"
+    )
+
+
+def test_received_line_shortened(config: Config):
+    config.repr_limits.maxstring = 10
+    assert Equals("a" * 50).get_diff("b" * 50, False) == [
+        "'aa...aaa' == 'bb...bbb'",
+        "Value mismatch",
+        "Expected 'aa...aaa'",
+        "Received 'bb...bbb'",
+    ]
+
+
+def test_dict_insertion_order():
+    assert configure().repr_limits.repr({"b": 1, "a": 2}) == "{'b': 1, 'a': 2}"
+
+
+def test_dict_shortened(config: Config):
+    config.repr_limits.maxdict = 1
+    assert configure().repr_limits.repr({"b": 1, "a": 2}) == "{'b': 1, ...}"
+
+
+def test_equals_repr(config: Config):
+    config.repr_limits.maxlist = 2
+    assert repr(Equals([1, 2, 3])) == "Equals([1, 2, ...])"
+
+
+def test_is_repr(config: Config):
+    config.repr_limits.maxstring = 10
+    assert repr(Is("a" * 100)) == "Is('aa...aaa')"
+
+
+@pytest.mark.parametrize("logical", [And, Or, Xor])
+def test_logical_repr(config: Config, logical: type):
+    config.repr_limits.maxstring = 10
+    assert repr(logical("a" * 100, 1)) == (
+        f"{logical.__name__}('aa...aaa', 1)"
+    )
+
+
+def test_not_repr(config: Config):
+    config.repr_limits.maxstring = 10
+    assert repr(Not("a" * 100)) == "Not('aa...aaa')"
+
+
+def test_not_diff_lhs_shortened(config: Config):
+    config.repr_limits.maxstring = 10
+    assert Not("a" * 100).get_diff("a" * 100, True)[0] == (
+        "'aa...aaa' != 'aa...aaa'"
+    )
+
+
+def test_object_containing_items_repr(config: Config):
+    config.repr_limits.maxstring = 10
+    assert repr(ObjectContainingItems({"real": "a" * 100})) == (
+        "ObjectContainingItems(real = 'aa...aaa')"
+    )
+
+
+def test_container_items_shortened(config: Config):
+    config.repr_limits.maxstring = 10
+    assert ListContainingOnly(["a" * 100]).get_diff(["b" * 100], False)[
+        -3:
+    ] == [
+        "-- 'aa...aaa'",
+        "Unexpected items:",
+        "!! 'bb...bbb'",
+    ]
+
+
+class CountedRepr:
+    """
+    Object that counts the number of times it is rendered
+    """
+
+    renders = 0
+
+    def __repr__(self) -> str:
+        CountedRepr.renders += 1
+        return "CountedRepr()"
+
+
+def test_nested_rendered_once():
+    leaf = CountedRepr()
+    CountedRepr.renders = 0
+    with pytest.raises(AssertionError) as e:
+        assert_eq([[[[leaf, 1]]]], [[[[leaf, 2]]]])
+    assert str(e.value).splitlines()[0] == (
+        "[[[[CountedRepr(), 1]]]] == [[[[CountedRepr(), 2]]]]"
+    )
+    assert CountedRepr.renders == 1
+
+
+def test_cache_respects_level(config: Config):
+    config.repr_limits.maxlevel = 2
+    with pytest.raises(AssertionError) as e:
+        assert_eq([[[[1, 2]]]], [[[[1, 3]]]])
+    assert str(e.value).splitlines()[:4] == [
+        "[[[...]]] == [[[...]]]",
+        "!! [0] [[[...]]] == [[[...]]]",
+        "   !! [0] [[1, 2]] == [[1, 3]]",
+        "      !! [0] [1, 2] == [1, 3]",
+    ]
+
+
+def test_cache_not_used_outside_session():
+    leaf = CountedRepr()
+    CountedRepr.renders = 0
+    Equals([[leaf, 1]]).get_diff([[leaf, 2]], False)
+    assert CountedRepr.renders > 1
+
+
+def test_bytes_shortened(config: Config):
+    config.repr_limits.maxstring = 12
+    assert configure().repr_limits.repr(b"a" * 100) == "b'aa...aaaa'"
+
+
+def test_bytearray_shortened(config: Config):
+    config.repr_limits.maxstring = 12
+    assert configure().repr_limits.repr(bytearray(b"a" * 50 + b"b" * 50)) == (
+        "bytearray(b'aa...bbbb')"
+    )
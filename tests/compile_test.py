@@ -0,0 +1,129 @@
+"""
+Tests / Compile Test
+"""
+
+import pytest
+
+from jestspectation import (
+    And,
+    Any,
+    Anything,
+    DictContainingItems,
+    DictContainingKeys,
+    Equals,
+    FloatApprox,
+    Is,
+    ListContainingOnly,
+    Not,
+    Or,
+    StringMatchingRegex,
+    assert_eq,
+    compile,
+)
+
+RECORD = {
+    "id": Any(int),
+    "name": StringMatchingRegex("[A-Z][a-z]+"),
+    "meta": DictContainingItems({"active": True, "tags": [Anything()]}),
+}
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        {"id": 1, "name": "Ada", "meta": {"active": True, "tags": ["x"]}},
+        {
+            "id": 2,
+            "name": "Grace",
+            "meta": {"active": True, "tags": [1], "extra": None},
+        },
+    ],
+)
+def test_match(record):
+    assert compile(RECORD) == record
+    assert record == compile(RECORD)
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        {"id": "1", "name": "Ada", "meta": {"active": True, "tags": ["x"]}},
+        {"id": 1, "name": "ada", "meta": {"active": True, "tags": ["x"]}},
+        {"id": 1, "name": 5, "meta": {"active": True, "tags": ["x"]}},
+        {"id": 1, "name": "Ada", "meta": {"active": False, "tags": ["x"]}},
+        {"id": 1, "name": "Ada", "meta": {"active": True, "tags": []}},
+        {"id": 1, "name": "Ada", "meta": {"tags": ["x"]}},
+        {"id": 1, "name": "Ada", "meta": []},
+        {"id": 1, "name": "Ada"},
+        {"id": 1, "name": "Ada", "meta": {}, "extra": 1},
+        [1, "Ada", {}],
+    ],
+)
+def test_no_match(record):
+    assert compile(RECORD) != record
+
+
+@pytest.mark.parametrize(
+    ("expected", "received"),
+    [
+        ([1, (2, "a")], [1, (2, "a")]),
+        ([1, (2, "a")], [1, [2, "a"]]),
+        ((1, 2), [1, 2]),
+        ([1.0], [1]),
+        ({"a": 1}, {"a": 1, "b": 2}),
+        (Is(None), None),
+        (Is([]), []),
+        (Not(Any(str)), 1),
+        (Not(Any(str)), "a"),
+        (And(Any(int), Not(0)), 1),
+        (And(Any(int), Not(0)), 0),
+        (Or(Any(str), 1), 1),
+        (Or(Any(str), 1), 2),
+        (DictContainingKeys({"a"}), {"a": 1}),
+        (DictContainingKeys({"a"}), {"b": 1}),
+        (DictContainingKeys({"a"}), ["a"]),
+        (ListContainingOnly([1, Any(str)]), ["a", 1]),
+        ([FloatApprox(1, magnitude=0.5)], [1.2]),
+        ([float("nan")], [float("nan")]),
+    ],
+)
+def test_same_as_uncompiled(expected, received):
+    assert (compile(expected) == received) == (expected == received)
+
+
+def test_identical_items():
+    nan = float("nan")
+    assert compile([nan]) == [nan]
+    assert compile(nan) != nan
+
+
+def test_self_referential():
+    value: list = [1]
+    value.append(value)
+    other: list = [1]
+    other.append(other)
+    assert compile(value) == other
+    assert compile(Equals(value)) == other
+
+
+def test_repr():
+    assert repr(compile({"a": Any(int)})) == "compile({'a': Any(int)})"
+
+
+def test_diff():
+    with pytest.raises(AssertionError) as e:
+        assert_eq(compile({"id": Any(int)}), {"id": "1"})
+    assert str(e.value).splitlines() == [
+        "{'id': Any(int)} == {'id': '1'}",
+        "!! 'id': Any(int) == 'id': '1'",
+        "   Any(int) == '1'",
+        "   Type mismatch",
+        "   Expected any object of type int",
+        "   Received '1' (str)",
+    ]
+
+
+def test_nested_in_other_matchers():
+    record = compile({"id": Any(int)})
+    assert ListContainingOnly([record, record]) == [{"id": 1}, {"id": 2}]
+    assert ListContainingOnly([record]) != [{"id": "1"}]
@@ -1,3 +1,24 @@
 """
 conftest
 """
+
+import copy
+from collections.abc import Iterator
+from dataclasses import fields
+
+import pytest
+
+from jestspectation import configure
+from jestspectation.__config.__config import Config
+
+
+@pytest.fixture
+def config() -> Iterator[Config]:
+    """
+    Access Jestspectation's configuration, restoring the original options
+    after the test
+    """
+    original = copy.deepcopy(configure())
+    yield configure()
+    for field in fields(original):
+        setattr(configure(), field.name, getattr(original, field.name))
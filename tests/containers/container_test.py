@@ -4,12 +4,17 @@ Tests / List containing test
 Tests for whether the ListContaining type
 """
 
+from collections import UserList
+from unittest import mock
+
 import pytest
 
 from jestspectation import (
+    Any,
     DictContainingItems,
     DictContainingKeys,
     DictContainingValues,
+    FloatApprox,
     ListContaining,
     ListContainingOnly,
     SetContaining,
@@ -209,3 +214,118 @@ def test_diff_match_dict_containing_items_incorrect_and_missing():
         "   Expected '1'",
         "   Received '2'",
     ]
+
+
+def test_list_containing_only_mixed_matchers_and_values():
+    assert ListContainingOnly([Any(str), 3, [2], 1]) == [1, "a", [2], 3]
+
+
+def test_list_containing_only_unhashable_items():
+    list = ListContainingOnly([{"a": 1}, [2]])
+    assert list == [[2], {"a": 1}]
+    assert list.get_diff([[2], {"a": 2}], False) == [
+        "ListContainingOnly([{'a': 1}, [2]]) == [[2], {'a': 2}]",
+        "1 missing items, 1 unexpected items",
+        f"Expected a {list}",
+        "Missing items:",
+        "-- {'a': 1}",
+        "Unexpected items:",
+        "!! {'a': 2}",
+    ]
+
+
+def test_list_containing_only_large():
+    items = list(range(50_000))
+    assert items[::-1] == ListContainingOnly(items)
+    assert items[1:] + [-1] != ListContainingOnly(items)
+
+
+def test_list_containing_matchers_and_unhashable_items():
+    assert ListContaining([Any(int), {"a": 1}, "b"]) == [{"a": 1}, "b", 2]
+    assert ListContaining([Any(int), {"a": 1}]) != [{"a": 2}, "b", 2]
+
+
+def test_list_containing_value_matches_received_matcher():
+    """
+    Hashable expected items can still match unhashable received items
+    """
+    assert ListContaining([1, "b"]) == [Any(int), "b"]
+
+
+def test_list_containing_large():
+    items = list(range(1_000_000))
+    assert ListContaining(list(range(0, 1_000_000, 1000))) == items
+    assert ListContaining([5, -1]) != items
+
+
+def test_dict_containing_values_matchers_and_unhashable_values():
+    assert DictContainingValues([Any(str), [1]]) == {1: [1], 2: "a"}
+    assert DictContainingValues([Any(str), [1]]) != {1: [2], 2: "a"}
+
+
+def test_dict_containing_values_large():
+    items = {i: str(i) for i in range(100_000)}
+    expected = [str(i) for i in range(0, 100_000, 7)]
+    assert DictContainingValues(expected) == items
+    assert DictContainingValues(["1", "-1"]) != items
+
+
+def test_list_containing_only_overlapping_matchers():
+    """
+    Items are matched optimally, rather than greedily matching the first
+    matcher
+    """
+    assert ListContainingOnly([FloatApprox(1.0, magnitude=1), Any(int)]) == [
+        1,
+        1.5,
+    ]
+    assert ListContainingOnly([Any(int), 1]) == [1, 2]
+
+
+def test_list_containing_only_overlapping_matchers_diff():
+    list = ListContainingOnly([Any(int), 1, Any(str)])
+    assert list.get_diff([1, 2, 3], False) == [
+        "ListContainingOnly([Any(int), 1, Any(str)]) == [1, 2, 3]",
+        "1 missing items, 1 duplicate items",
+        f"Expected a {list}",
+        "Missing items:",
+        "-- Any(str)",
+        "Duplicate items:",
+        "++ Any(int)",
+    ]
+
+
+def test_list_containing_only_many_matchers():
+    expected = [Any(int)] * 1000 + list(range(1000))
+    assert ListContainingOnly(expected) == list(range(2000))
+    assert ListContainingOnly(expected) != list(range(1999)) + ["a"]
+
+
+@pytest.mark.parametrize(
+    ("expected", "received"),
+    [
+        (1, mock.ANY),
+        (1, pytest.approx(1)),
+        ([1], UserList([1])),
+    ],
+)
+@pytest.mark.parametrize("size", [1, 100])
+def test_list_containing_only_received_custom_eq(
+    expected: object,
+    received: object,
+    size: int,
+):
+    """
+    Received items of other types can be equal to expected items using their
+    own `__eq__`, in both small and large lists
+    """
+    items = list(range(10, 10 + size - 1))
+    assert ListContainingOnly([expected, *items]) == [*items, received]
+    # Only the item that really is missing is reported
+    matcher = ListContainingOnly([expected, 5, *items])
+    assert matcher.get_diff([*items, received], False)[1:] == [
+        "1 missing items",
+        f"Expected a {matcher}",
+        "Missing items:",
+        "-- 5",
+    ]
@@ -0,0 +1,276 @@
+"""
+Tests for matchers that consume iterables as a stream
+"""
+
+import gc
+import weakref
+from collections.abc import Iterator
+
+import pytest
+
+from jestspectation import (
+    Any,
+    DictContainingItems,
+    IterableContaining,
+    IterableEquals,
+    IterableOfLength,
+    assert_eq,
+)
+
+
+class Counted:
+    """
+    Iterator that counts how many items were consumed
+    """
+
+    def __init__(self, n: int | None = None) -> None:
+        self.n = n
+        self.consumed = 0
+
+    def __iter__(self) -> Iterator[int]:
+        return self
+
+    def __next__(self) -> int:
+        if self.n is not None and self.consumed >= self.n:
+            raise StopIteration
+        self.consumed += 1
+        return self.consumed - 1
+
+
+def rows(n: int) -> Iterator[dict]:
+    return ({"id": i} for i in range(n))
+
+
+def test_containing():
+    assert IterableContaining([3, 1]) == iter([1, 2, 3])
+    assert IterableContaining([3, 1]) == (1, 2, 3)
+    assert IterableContaining([DictContainingItems({"id": 5})]) == rows(10)
+
+
+def test_containing_missing():
+    assert IterableContaining([1, 4]) != iter([1, 2, 3])
+    assert IterableContaining([{"id": 10}]) != rows(10)
+
+
+def test_containing_stops_early():
+    items = Counted()
+    assert IterableContaining([Any(int), 2, 5]) == items
+    assert items.consumed == 6
+
+
+def test_containing_unhashable_received():
+    assert IterableContaining([1]) == iter([[0], 1.0])
+    assert IterableContaining([(1, 2)]) == iter([[1, 2], (1, 2)])
+
+
+def test_containing_empty():
+    items = Counted()
+    assert IterableContaining([]) == items
+    assert items.consumed == 0
+
+
+def test_containing_type_mismatch():
+    assert IterableContaining(["a"]) != "abc"
+    assert IterableContaining([1]).get_diff(1, False) == [
+        "Type mismatch",
+        "Expected iterable (IterableContaining([1]))",
+        "Received object of type int (1)",
+    ]
+
+
+def test_containing_diff_after_consumed():
+    matcher = IterableContaining([2, 10, Any(str)])
+    items = iter(range(8))
+    assert matcher != items
+    assert matcher.get_diff(items, False) == [
+        "Missing items",
+        "Expected a IterableContaining([2, 10, Any(str)])",
+        "Received 8 items [0, 1, 2, 3, 4, ...]",
+        "-- 10",
+        "-- Any(str)",
+    ]
+
+
+def test_containing_diff_reiterable():
+    assert IterableContaining([5]).get_diff([1, 2], False) == [
+        "Missing items",
+        "Expected a IterableContaining([5])",
+        "Received 2 items [1, 2]",
+        "-- 5",
+    ]
+
+
+class Payload:
+    """
+    Object referenced by a generator
+    """
+
+
+def with_payload(payload: Payload) -> Iterator[int]:
+    yield from range(3)
+
+
+def test_consumed_generator_not_kept_alive():
+    matcher = IterableContaining([0])
+    payload = Payload()
+    # Matching stops at the first item, so the generator still references
+    # the payload
+    items = with_payload(payload)
+    assert matcher == items
+
+    ref = weakref.ref(payload)
+    del payload, items
+    gc.collect()
+    assert ref() is None
+
+
+@pytest.mark.parametrize(
+    "matcher",
+    [IterableContaining([0]), IterableOfLength(3)],
+)
+def test_collected_generator_not_confused_with_none(matcher: object):
+    items = with_payload(Payload())
+    assert matcher == items
+    del items
+    gc.collect()
+    assert matcher != None  # noqa: E711
+
+
+def test_containing_assert_eq():
+    with pytest.raises(AssertionError) as e:
+        assert_eq(IterableContaining([{"id": 3}]), rows(3))
+    assert str(e.value).splitlines()[:2] == [
+        "Missing items",
+        "Expected a IterableContaining([{'id': 3}])",
+    ]
+
+
+def test_length():
+    assert IterableOfLength(3) == iter("abc")
+    assert IterableOfLength(0) == iter([])
+    assert IterableOfLength(3) == rows(3)
+
+
+def test_length_incorrect():
+    assert IterableOfLength(3) != iter("ab")
+    assert IterableOfLength(3) != iter("abcd")
+    assert IterableOfLength(3) != 3
+
+
+def test_length_stops_early():
+    items = Counted()
+    assert IterableOfLength(3) != items
+    assert items.consumed == 4
+
+
+def test_length_invalid_arg():
+    with pytest.raises(ValueError):
+        IterableOfLength(-1)
+
+
+def test_length_diff_too_long():
+    matcher = IterableOfLength(2)
+    items = Counted()
+    assert matcher != items
+    assert matcher.get_diff(items, False) == [
+        "Length failed to match",
+        "Expected iterable of length 2",
+        "Received at least 3 items [0, 1, 2]",
+    ]
+
+
+def test_length_diff_too_short():
+    matcher = IterableOfLength(3)
+    items = Counted(2)
+    assert matcher != items
+    assert matcher.get_diff(items, False) == [
+        "Length failed to match",
+        "Expected iterable of length 3",
+        "Received 2 items [0, 1]",
+    ]
+
+
+def test_equals():
+    assert IterableEquals(range(5)) == iter(range(5))
+    assert IterableEquals(iter([1, [2]])) == (x for x in [1, [2]])
+    assert IterableEquals([Any(int), "a"]) == (1, "a")
+    assert IterableEquals([]) == iter([])
+
+
+def test_equals_mismatch():
+    assert IterableEquals(range(5)) != iter([0, 1, 9, 3, 4])
+    assert IterableEquals(range(5)) != iter(range(4))
+    assert IterableEquals(range(5)) != iter(range(6))
+    assert IterableEquals(range(5)) != 5
+
+
+def test_equals_stops_at_first_difference():
+    received = Counted()
+    # The expected range is far too large to iterate in full
+    assert IterableEquals(range(10**12)) != map(lambda i: i % 7, received)
+    assert received.consumed == 8
+
+
+def test_equals_expected_iterator_compared_again():
+    matcher = IterableEquals(x for x in [1, 2, 3])
+    assert matcher == [1, 2, 3]
+    assert matcher != [1, 2, 4]
+    assert matcher.get_diff([1, 2, 4], False) == [
+        "Iterables differ at index 2",
+        "Preceding items [1, 2]",
+        "!! [2] 3 == 4",
+        "   Value mismatch",
+        "   Expected 3",
+        "   Received 4",
+    ]
+
+
+def test_equals_diff():
+    matcher = IterableEquals(range(100))
+    received = (i if i != 10 else -1 for i in range(100))
+    assert matcher != received
+    assert matcher.get_diff(received, False) == [
+        "Iterables differ at index 10",
+        "Preceding items [..., 7, 8, 9]",
+        "!! [10] 10 == -1",
+        "   Value mismatch",
+        "   Expected 10",
+        "   Received -1",
+    ]
+
+
+def test_equals_diff_nested():
+    received = iter([{"id": 0}, {"id": "1"}])
+    assert IterableEquals(rows(2)).get_diff(received, False) == [
+        "Iterables differ at index 1",
+        "Preceding items [{'id': 0}]",
+        "!! [1] {'id': 1} == {'id': '1'}",
+        "   !! 'id': 1 == 'id': '1'",
+        "      1 == '1'",
+        "      Type mismatch",
+        "      Expected 1 (int)",
+        "      Received '1' (str)",
+    ]
+
+
+def test_equals_diff_too_short():
+    assert IterableEquals([1, 2, 3]).get_diff(iter([1, 2]), False) == [
+        "Iterables differ at index 2",
+        "Preceding items [1, 2]",
+        "-- [2] 3",
+    ]
+
+
+def test_equals_diff_too_long():
+    assert IterableEquals([]).get_diff(iter(["a"]), False) == [
+        "Iterables differ at index 0",
+        "++ [0] 'a'",
+    ]
+
+
+def test_equals_diff_type_mismatch():
+    assert IterableEquals([1]).get_diff(None, False) == [
+        "Type mismatch",
+        "Expected iterable (IterableEquals([1]))",
+        "Received object of type NoneType (None)",
+    ]
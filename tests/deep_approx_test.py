@@ -0,0 +1,124 @@
+"""
+Tests / Deep Approx Test
+"""
+
+import pytest
+
+from jestspectation import DeepApprox, Equals, FloatApprox
+
+
+def test_number():
+    assert DeepApprox(1.0, magnitude=0.1) == 1.05
+    assert DeepApprox(1.0, magnitude=0.1) != 1.2
+
+
+def test_percent():
+    assert DeepApprox([100, -200], percent=10) == [110, -181]
+    assert DeepApprox([100, -200], percent=10) != [100, -179]
+
+
+def test_nested():
+    expected = {"a": [1.0, {"b": 2.0}], "c": (3, "x")}
+    assert DeepApprox(expected, magnitude=0.1) == {
+        "a": [1.05, {"b": 1.95}],
+        "c": (3.01, "x"),
+    }
+
+
+def test_nested_fail():
+    expected = {"a": [1.0, {"b": 2.0}]}
+    assert DeepApprox(expected, magnitude=0.1) != {"a": [1.0, {"b": 2.5}]}
+
+
+def test_other_values_must_be_equal():
+    assert DeepApprox({"a": "x"}, magnitude=0.1) != {"a": "y"}
+
+
+def test_bools_not_approximate():
+    assert DeepApprox([True], magnitude=5) != [2]
+    assert DeepApprox([1], magnitude=5) != [True]
+
+
+@pytest.mark.parametrize(
+    ("expected", "received"),
+    [
+        ([1, "a"], [True, "a"]),
+        ([True, "a"], [1, "a"]),
+        ({"x": 1}, {"x": True}),
+        ({"x": True}, {"x": 1}),
+    ],
+)
+def test_bools_never_equal_numbers(expected: object, received: object):
+    """
+    Bools and numbers don't match in either direction, and the diff explains
+    why
+    """
+    matcher = DeepApprox(expected, magnitude=5)
+    assert matcher != received
+    assert "   Type mismatch" in matcher.get_diff(received, False)
+
+
+def test_bools_equal_bools():
+    assert DeepApprox([True, {"x": False}], magnitude=5) == [
+        True,
+        {"x": False},
+    ]
+    assert DeepApprox([True], magnitude=5) != [False]
+
+
+def test_nan_never_matches():
+    assert DeepApprox([1.0, 2.0], magnitude=1) != [1.0, float("nan")]
+
+
+def test_structure_mismatch():
+    assert DeepApprox({"a": 1.0}, magnitude=0.1) != {"b": 1.0}
+    assert DeepApprox([1.0], magnitude=0.1) != [1.0, 2.0]
+    assert DeepApprox([1.0], magnitude=0.1) != (1.0,)
+
+
+def test_matchers_in_expected():
+    assert DeepApprox(
+        {"a": FloatApprox(1, magnitude=1), "b": 1.0}, magnitude=0.1
+    ) == {"a": 1.9, "b": 1.05}
+
+
+def test_self_referential():
+    a: list = [1.0]
+    a.append(a)
+    b: list = [1.05]
+    b.append(b)
+    assert DeepApprox(a, magnitude=0.1) == b
+
+
+def test_diff():
+    assert DeepApprox({"a": [1.0, 2.0]}, magnitude=0.1).get_diff(
+        {"a": [1.05, 2.5]}, False
+    ) == [
+        "{'a': [1.0, 2.0]} == {'a': [1.05, 2.5]}",
+        "!! 'a': [1.0, 2.0] == 'a': [1.05, 2.5]",
+        "   [1.0, 2.0] == [1.05, 2.5]",
+        "   !! [1] 2.0 == 2.5",
+        "      Value out of range",
+        "      Expected 2.0 (magnitude=0.1)",
+        "      Received 2.5",
+    ]
+
+
+def test_diff_nested_in_equals():
+    assert Equals([DeepApprox(1.0, percent=1)]).get_diff([1.5], False) == [
+        "[DeepApprox(1.0, percent=1)] == [1.5]",
+        "!! [0] 1.0 == 1.5",
+        "   Value out of range",
+        "   Expected 1.0 (percent=1)",
+        "   Received 1.5",
+    ]
+
+
+def test_both():
+    with pytest.raises(ValueError):
+        DeepApprox(1.0, magnitude=5, percent=10)
+
+
+def test_both_unspecified():
+    with pytest.raises(ValueError):
+        DeepApprox(1.0)
@@ -0,0 +1,151 @@
+"""
+Tests / Diff budget test
+
+Tests for lazily generating diffs with a limited budget
+"""
+
+from collections.abc import Iterator
+
+import pytest
+
+from jestspectation import Equals, JestspectationBase, assert_eq
+from jestspectation.__config.__config import Config
+from jestspectation.pytest import pytest_assertrepr_compare
+
+
+class Counted:
+    """
+    Value that is never equal to another, and counts how many times it is
+    compared and rendered
+    """
+
+    compared = 0
+    rendered = 0
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+
+    def __eq__(self, other: object) -> bool:
+        Counted.compared += 1
+        return False
+
+    def __repr__(self) -> str:
+        Counted.rendered += 1
+        return f"Counted({self.n})"
+
+
+class EndlessDiff(JestspectationBase):
+    """
+    Matcher whose diff never ends, to check that diffs are generated lazily
+    """
+
+    def __init__(self) -> None:
+        self.lines_generated = 0
+
+    def __repr__(self) -> str:
+        return "EndlessDiff()"
+
+    def __eq__(self, other: object) -> bool:
+        return False
+
+    def get_diff(self, other: object, other_is_lhs: bool) -> list[str]:
+        raise NotImplementedError()
+
+    def iter_diff(self, other: object, other_is_lhs: bool) -> Iterator[str]:
+        while True:
+            self.lines_generated += 1
+            yield f"line {self.lines_generated}"
+
+
+def test_iter_diff_matches_get_diff():
+    expected = [1, {"a": 2}, {3}]
+    received = [1, {"a": 3}, {4}, 5]
+    assert list(Equals(expected).iter_diff(received, False)) == Equals(
+        expected
+    ).get_diff(received, False)
+
+
+def test_iter_diff_default_uses_get_diff():
+    assert list(Equals(1).iter_diff(2, False)) == Equals(1).get_diff(2, False)
+
+
+def test_line_budget(config: Config):
+    config.diff_max_lines = 3
+    matcher = EndlessDiff()
+    assert pytest_assertrepr_compare(
+        None,  # type: ignore
+        "==",
+        1,
+        matcher,
+    ) == [
+        "line 1",
+        "line 2",
+        "line 3",
+        "... more differences (truncated after 3 lines)",
+    ]
+    # Only one line past the budget was generated
+    assert matcher.lines_generated == 4
+
+
+def test_byte_budget(config: Config):
+    # Each line is 7 bytes, including the newline
+    config.diff_max_bytes = 20
+    assert pytest_assertrepr_compare(
+        None,  # type: ignore
+        "==",
+        EndlessDiff(),
+        1,
+    ) == [
+        "line 1",
+        "line 2",
+        "... more differences (truncated after 2 lines)",
+    ]
+
+
+def test_no_truncation_within_budget(config: Config):
+    config.diff_max_lines = 4
+    assert pytest_assertrepr_compare(
+        None,  # type: ignore
+        "==",
+        Equals(2),
+        1,
+    ) == [
+        "2 == 1",
+        "Value mismatch",
+        "Expected 2",
+        "Received 1",
+    ]
+
+
+def test_assert_eq_truncated(config: Config):
+    config.diff_max_lines = 2
+    with pytest.raises(AssertionError) as e:
+        assert_eq(list(range(200_000)), list(range(1, 200_001)))
+    assert str(e.value).splitlines() == [
+        "[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, "
+        "19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, "
+        "36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 51, 52, "
+        "53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, "
+        "70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 85, 86, "
+        "87, 88, 89, 90, 91, 92, 93, 94, 95, 96, 97, 98, 99, ...] == "
+        f"{list(range(1, 101))}"[:-1]
+        + ", ...]",
+        "-- [0] 0",
+        "... more differences (truncated after 2 lines)",
+    ]
+
+
+def test_dict_values_past_budget_not_diffed(config: Config):
+    config.diff_max_lines = 10
+    config.repr_limits.maxdict = 2
+    expected = {i: Counted(i) for i in range(10_000)}
+    received = {i: Counted(i) for i in range(10_000)}
+    Counted.compared = 0
+    Counted.rendered = 0
+    with pytest.raises(AssertionError) as e:
+        assert_eq(expected, received)
+    assert len(str(e.value).splitlines()) == 11
+    # Only the values shown in the header and the first few keys are
+    # compared or rendered, rather than every value
+    assert Counted.compared < 10
+    assert Counted.rendered < 10
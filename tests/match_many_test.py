@@ -0,0 +1,106 @@
+"""
+Tests / Match Many Test
+"""
+
+import pytest
+
+from jestspectation import Any, compile, match_many
+
+ROWS = [{"id": 0}, {"id": "1"}, {"id": 2}, None, {"id": 4}]
+
+
+def test_all_passed():
+    result = match_many({"id": Any(int)}, [{"id": 1}, {"id": 2}])
+    assert result
+    assert result.total == 2
+    assert result.passed == 2
+    assert result.failed == 0
+    assert result.failures == []
+    assert list(result.iter_diffs()) == []
+    result.assert_passed()
+
+
+def test_failures():
+    result = match_many({"id": Any(int)}, ROWS)
+    assert not result
+    assert result.total == 5
+    assert result.passed == 3
+    assert result.failed == 2
+    assert result.failures == [1, 3]
+    assert result.failed_map == bytes([0, 1, 0, 1, 0])
+
+
+def test_repr():
+    assert (
+        repr(match_many({"id": Any(int)}, ROWS))
+        == "MatchManyResult(total=5, passed=3, failed=2)"
+    )
+
+
+def test_consumes_iterator_once():
+    result = match_many(Any(int), (i if i % 3 else str(i) for i in range(9)))
+    assert result.failures == [0, 3, 6]
+
+
+def test_compiled_matcher():
+    result = match_many(compile({"id": Any(int)}), ROWS)
+    assert result.failures == [1, 3]
+
+
+def test_diffs():
+    result = match_many({"id": Any(int)}, ROWS)
+    assert list(result.iter_diffs()) == [
+        (
+            1,
+            [
+                "{'id': Any(int)} == {'id': '1'}",
+                "!! 'id': Any(int) == 'id': '1'",
+                "   Any(int) == '1'",
+                "   Type mismatch",
+                "   Expected any object of type int",
+                "   Received '1' (str)",
+            ],
+        ),
+        (
+            3,
+            [
+                "{'id': Any(int)} == None",
+                "Type mismatch",
+                "Expected dict",
+                "Received NoneType",
+            ],
+        ),
+    ]
+
+
+def test_max_diffs():
+    result = match_many(Any(int), ["a", "b", "c"], max_diffs=1)
+    assert result.failed == 3
+    assert [index for index, _ in result.iter_diffs()] == [0]
+
+
+def test_diffs_truncated(config):
+    config.diff_max_lines = 2
+    result = match_many([1, 2], [[3, 4]])
+    (_, diff), *_ = result.iter_diffs()
+    assert diff[-1] == "... more differences (truncated after 2 lines)"
+
+
+def test_assert_passed():
+    result = match_many(Any(int), [1, "a", 2, "b", "c"], max_diffs=2)
+    with pytest.raises(AssertionError) as e:
+        result.assert_passed()
+    assert str(e.value).splitlines() == [
+        "3 of 5 objects failed to match",
+        "[1]",
+        "   Any(int) == 'a'",
+        "   Type mismatch",
+        "   Expected any object of type int",
+        "   Received 'a' (str)",
+        "[3]",
+        "   Any(int) == 'b'",
+        "   Type mismatch",
+        "   Expected any object of type int",
+        "   Received 'b' (str)",
+        "... 1 more failures",
+    ]
@@ -0,0 +1,192 @@
+"""
+Tests / Parallel Test
+
+Tests for matching containers in parallel, which should give exactly the
+same results as matching them serially.
+"""
+
+from collections.abc import Iterator
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
+import pytest
+
+import jestspectation.__parallel as parallel_module
+from jestspectation import (
+    Any,
+    DictContainingItems,
+    DictContainingValues,
+    Equals,
+    FloatApprox,
+    ListContaining,
+    ListContainingOnly,
+    StringMatchingRegex,
+    assert_eq,
+    compile,
+)
+from jestspectation.__parallel import shutdown_pool
+
+RECEIVED = [{"id": i, "name": f"user{i}"} for i in range(40)] + [
+    [1],
+    "text",
+    7,
+    7,
+    Any(float),
+]
+
+EXPECTED = [
+    [
+        DictContainingItems({"id": 3}),
+        DictContainingItems({"name": StringMatchingRegex("user3.")}),
+        "text",
+        [1],
+    ],
+    [DictContainingItems({"id": 100}), "missing", 1.5],
+    [7, 7, 7],
+]
+
+
+@pytest.fixture
+def pools(monkeypatch) -> Iterator[list[Executor]]:
+    """
+    Pools of workers that were started, which are shut down afterwards so that
+    each test starts its own
+    """
+    shutdown_pool()
+    started: list[Executor] = []
+
+    class RecordedProcessPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs) -> None:
+            super().__init__(*args, **kwargs)
+            started.append(self)
+
+    class RecordedThreadPool(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs) -> None:
+            super().__init__(*args, **kwargs)
+            started.append(self)
+
+    monkeypatch.setattr(
+        "jestspectation.__parallel.ProcessPoolExecutor", RecordedProcessPool
+    )
+    monkeypatch.setattr(
+        "jestspectation.__parallel.ThreadPoolExecutor", RecordedThreadPool
+    )
+    yield started
+    shutdown_pool()
+
+
+@pytest.fixture(params=["processes", "threads"])
+def parallel(request, config, pools):
+    config.parallel_threshold = 2
+    config.parallel_workers = 2
+    config.parallel_mode = request.param
+    return config
+
+
+def diff(matcher: object, other: object) -> list[str] | None:
+    return None if matcher == other else matcher.get_diff(other, False)  # type: ignore
+
+
+@pytest.mark.parametrize("expected", EXPECTED)
+@pytest.mark.parametrize("matcher_type", [ListContaining, ListContainingOnly])
+def test_list_same_as_serial(parallel, expected, matcher_type):
+    parallel.parallel_threshold = None
+    serial = diff(matcher_type(expected), RECEIVED)
+    parallel.parallel_threshold = 2
+    assert diff(matcher_type(expected), RECEIVED) == serial
+
+
+def test_list_containing(parallel, pools):
+    assert ListContaining([DictContainingItems({"id": 39}), 7]) == RECEIVED
+    assert ListContaining([DictContainingItems({"id": 40})]) != RECEIVED
+    assert len(pools) == 1
+
+
+def test_compiled_matchers(parallel, pools):
+    record = compile({"id": Any(int), "name": StringMatchingRegex("user")})
+    assert ListContaining([record]) == RECEIVED
+    assert ListContainingOnly([record] * 40 + RECEIVED[40:]) == RECEIVED
+    assert len(pools) == 1
+
+
+def test_list_containing_only(parallel, pools):
+    assert ListContainingOnly(list(reversed(RECEIVED))) == RECEIVED
+    assert ListContainingOnly(RECEIVED[1:] + [8]) != RECEIVED
+    assert len(pools) == 1
+
+
+def test_dict_containing_values(parallel):
+    received = {i: f"value{i}" for i in range(20)}
+    assert DictContainingValues([StringMatchingRegex("value1.")]) == received
+    assert DictContainingValues(["value20"]) != received
+
+
+def test_below_threshold_is_serial(parallel, pools):
+    parallel.parallel_threshold = 1000
+    assert ListContaining([7]) == RECEIVED
+    assert ListContainingOnly(RECEIVED) == RECEIVED
+    assert pools == []
+
+
+def test_threads_mode_uses_threads(parallel, pools):
+    parallel.parallel_mode = "threads"
+    assert ListContaining([7]) == RECEIVED
+    assert isinstance(pools[0], ThreadPoolExecutor)
+
+
+DIFF_CASES = [
+    (
+        {i: {"id": i, "tags": [i]} for i in range(30)},
+        {i: {"id": i, "tags": [i + (i % 7 == 0)]} for i in range(1, 31)},
+    ),
+    (
+        [FloatApprox(i, magnitude=0.5) for i in range(30)],
+        [i + (i % 4 == 0) for i in range(30)],
+    ),
+    (
+        [{"id": Any(int), "n": i} for i in range(30)],
+        [{"id": i, "n": i if i % 5 else -i} for i in range(25)],
+    ),
+]
+
+
+@pytest.mark.parametrize(("expected", "received"), DIFF_CASES)
+def test_diff_same_as_serial(parallel, pools, expected, received):
+    parallel.parallel_threshold = None
+    serial = Equals(expected).get_diff(received, False)
+    parallel.parallel_threshold = 2
+    assert Equals(expected).get_diff(received, False) == serial
+    assert pools
+
+
+def test_pool_reused(parallel, pools):
+    for _ in range(3):
+        assert ListContaining([7]) == RECEIVED
+        assert ListContainingOnly(RECEIVED) == RECEIVED
+    Equals(DIFF_CASES[0][0]).get_diff(DIFF_CASES[0][1], False)
+    assert len(pools) == 1
+
+
+def test_pool_restarted_on_config_change(parallel, pools):
+    assert ListContaining([7]) == RECEIVED
+    parallel.parallel_workers = 3
+    assert ListContaining([7]) == RECEIVED
+    assert len(pools) == 2
+
+
+def test_diff_only_parallel_at_top_level(parallel, monkeypatch):
+    dispatched: list[Executor] = []
+    get_pool = parallel_module._get_pool
+
+    def recorded() -> Executor:
+        dispatched.append(get_pool())
+        return dispatched[-1]
+
+    monkeypatch.setattr(parallel_module, "_get_pool", recorded)
+    expected, received = DIFF_CASES[0]
+    with pytest.raises(AssertionError):
+        assert_eq(expected, received)
+    assert len(dispatched) == 1
@@ -0,0 +1,111 @@
+"""
+Tests / Pickle Test
+
+Tests that matchers can be pickled, so that they can be sent to worker
+processes or cached on disk.
+"""
+
+import array
+import pickle
+
+import pytest
+
+from jestspectation import (
+    And,
+    Any,
+    Anything,
+    ArrayApprox,
+    DeepApprox,
+    DictContainingItems,
+    DictContainingKeys,
+    DictContainingValues,
+    Equals,
+    FloatApprox,
+    Is,
+    IterableContaining,
+    IterableEquals,
+    IterableOfLength,
+    LinesLike,
+    ListContaining,
+    ListContainingOnly,
+    ListOfLength,
+    Not,
+    ObjectContainingItems,
+    ObjectContainingProperties,
+    Or,
+    SetContaining,
+    StringContaining,
+    StringMatchingRegex,
+    TextLike,
+    Xor,
+    compile,
+)
+
+CASES = [
+    (Any(int), 1, "1"),
+    (Anything(), None, None),
+    (Is(None), None, 0),
+    (Equals([1, Any(str)]), [1, "a"], [1, 2]),
+    (FloatApprox(1, magnitude=0.5), 1.4, 1.6),
+    (FloatApprox(100, percent=10), 109, 111),
+    (ArrayApprox([1.0, 2.0], magnitude=0.1), [1.05, 2.0], [1.0, 2.2]),
+    (DeepApprox({"a": [1.0]}, percent=10), {"a": [1.05]}, {"a": [1.2]}),
+    (ListContaining([1, Any(str)]), [1, "a", 2], [1]),
+    (SetContaining({1}), {1, 2}, {2}),
+    (DictContainingKeys({"a"}), {"a": 1}, {"b": 1}),
+    (DictContainingValues([1]), {"a": 1}, {"a": 2}),
+    (DictContainingItems({"a": Any(int)}), {"a": 1}, {"a": "1"}),
+    (ObjectContainingProperties({"real"}), 1, object()),
+    (ObjectContainingItems({"real": 1}), 1, 2),
+    (ListOfLength(2), [1, 2], [1]),
+    (IterableContaining([1, Any(str)]), (1, "a"), [1]),
+    (IterableOfLength(2), (1, 2), [1]),
+    (IterableEquals([1, Any(str)]), (1, "a"), [1, 2]),
+    (ListContainingOnly([1, Any(int)]), [2, 1], [1, 1, 1]),
+    (StringContaining("ell"), "hello", "help"),
+    (StringMatchingRegex("h.*o"), "hello", "help"),
+    (TextLike("Hello", ignored_sequences=["-"]), "he-llo", "help"),
+    (LinesLike("a\nB", strip_lines=True), "A\n b ", "a\nc"),
+    (And(Any(int), Not(0)), 1, 0),
+    (Or(Any(str), 1), 1, 2),
+    (Xor(Any(int), 1), 2, 1),
+    (Not(Any(int)), "1", 1),
+    (compile({"a": StringMatchingRegex("[0-9]")}), {"a": "1"}, {"a": "a"}),
+]
+
+
+@pytest.mark.parametrize(("matcher", "matching", "other"), CASES)
+def test_round_trip(matcher, matching, other):
+    # Cache the repr first, which shouldn't be pickled
+    expected_repr = repr(matcher)
+    copy = pickle.loads(pickle.dumps(matcher))
+    assert type(copy) is type(matcher)
+    assert repr(copy) == expected_repr
+    assert copy == matching
+    if other is not None:
+        assert copy != other
+        assert copy.get_diff(other, False) == matcher.get_diff(other, False)
+
+
+@pytest.mark.parametrize(("matcher", "matching", "other"), CASES)
+def test_no_private_state(matcher, matching, other):
+    repr(matcher)
+    # Matchers are pickled using their constructor arguments, so that the
+    # pickles don't depend on how the matchers store their state
+    data = pickle.dumps(matcher)
+    assert b"__cached_repr" not in data
+    assert f"_{type(matcher).__name__}__".encode() not in data
+
+
+def test_iterable_equals_expected_iterator():
+    matcher = IterableEquals(x for x in [1, 2])
+    copy = pickle.loads(pickle.dumps(matcher))
+    assert copy == (1, 2)
+    assert copy != (1, 3)
+
+
+def test_memoryview_values_copied():
+    matcher = ArrayApprox(memoryview(array.array("d", [1, 2])), magnitude=0.1)
+    copy = pickle.loads(pickle.dumps(matcher))
+    assert repr(copy) == "ArrayApprox([1.0, 2.0], magnitude=0.1)"
+    assert copy == array.array("d", [1.05, 2])
@@ -37,3 +37,40 @@ def test_no_elements_fit():
         repr(ListContaining(["1234567890123456789012345"]))
         == "ListContaining([...])"
     )
+
+
+class CountingRepr:
+    """
+    Object that counts the number of times it is represented
+    """
+
+    count = 0
+
+    def __repr__(self) -> str:
+        CountingRepr.count += 1
+        return "x"
+
+
+def test_only_shown_elements_represented():
+    """Elements after the available space are never represented"""
+    CountingRepr.count = 0
+    matcher = ListContaining([CountingRepr() for _ in range(100_000)])
+    assert repr(matcher) == "ListContaining([x, x, x, x, x, x, x, ...])"
+    # The 7 shown elements, plus the 2 that didn't fit
+    assert CountingRepr.count == 9
+
+
+def test_repr_cached():
+    CountingRepr.count = 0
+    matcher = ListContaining([CountingRepr()])
+    assert repr(matcher) == "ListContaining([x])"
+    assert repr(matcher) == "ListContaining([x])"
+    assert CountingRepr.count == 1
+
+
+def test_single_element_barely_fits():
+    """A single element that only fits without an ellipsis"""
+    assert (
+        repr(ListContaining(["12345678901234567890"]))
+        == "ListContaining(['12345678901234567890'])"
+    )
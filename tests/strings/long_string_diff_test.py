@@ -0,0 +1,115 @@
+"""
+Tests for diffs of long strings, which only show a window of each string
+"""
+
+import pytest
+
+from jestspectation import Equals, StringContaining, TextLike
+from jestspectation.__string_diff import common_prefix, myers_diff
+
+
+def test_short_strings_shown_in_full():
+    assert Equals("abc").get_diff("abd", False) == [
+        "'abc' == 'abd'",
+        "Value mismatch",
+        "Expected 'abc'",
+        "Received 'abd'",
+    ]
+
+
+def test_window_around_difference():
+    expected = "a" * 100 + "hello world" + "b" * 100
+    received = "a" * 100 + "hello there world" + "b" * 100
+    assert Equals(expected).get_diff(received, False)[1:] == [
+        "Strings differ from index 106",
+        "Expected 211 characters",
+        "Received 217 characters",
+        "Expected ...'aaaaaaaaaaaaaahello world"
+        "bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb'...",
+        "                                 ^",
+        "Received ...'aaaaaaaaaaaaaahello there world"
+        "bbbbbbbbbbbbbbbbbbbbbbbbbbbbb'...",
+        "                                 ^^^^^^",
+    ]
+
+
+def test_escaped_characters_aligned():
+    expected = "\n" * 70 + "a"
+    received = "\n" * 70 + "b"
+    assert Equals(expected).get_diff(received, False)[1:] == [
+        "Strings differ from index 70",
+        "Expected ...'" + "\\n" * 20 + "a'",
+        " " * 53 + "^",
+        "Received ...'" + "\\n" * 20 + "b'",
+        " " * 53 + "^",
+    ]
+
+
+def test_difference_at_end():
+    assert Equals("a" * 70).get_diff("a" * 71, False)[1:] == [
+        "Strings differ from index 70",
+        "Expected 70 characters",
+        "Received 71 characters",
+        "Expected ...'" + "a" * 20 + "'",
+        " " * 33 + "^",
+        "Received ...'" + "a" * 21 + "'",
+        " " * 33 + "^",
+    ]
+
+
+def test_huge_strings_bounded():
+    expected = "a" * 5_000_000
+    received = expected[:2_500_000] + "b" + expected[2_500_001:]
+    lines = Equals(expected).get_diff(received, False)
+    assert lines[1] == "Strings differ from index 2500000"
+    # Only the header contains the (bounded) reprs of the strings
+    assert max(len(line) for line in lines[1:]) < 100
+
+
+def test_text_like_long():
+    assert TextLike("Hello " * 20).get_diff("hello " * 19 + "hullo ", False)[
+        1:
+    ] == [
+        "String failed to match",
+        "Strings differ from index 115",
+        "Expected ...' hello hello hello hello '",
+        "                                 ^",
+        "Received ...' hello hello hello hullo '",
+        "                                 ^",
+    ]
+
+
+def test_string_containing_long():
+    assert StringContaining("hello world, how are you").get_diff(
+        "x" * 80 + "hello world, who are you", False
+    )[1:] == [
+        "String failed to match",
+        "First 13 characters of substring found at index 80",
+        "Expected 'hello world, how are you'",
+        "                       ^",
+        "Received ...'xxxxxxxhello world, who are you'",
+        "                                 ^",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("a", "b", "deleted", "inserted"),
+    [
+        ("abc", "abc", set(), set()),
+        ("abc", "axc", {1}, {1}),
+        ("abc", "ac", {1}, set()),
+        ("", "ab", set(), {0, 1}),
+        ("kitten", "sitting", {0, 4}, {0, 4, 6}),
+    ],
+)
+def test_myers_diff(a: str, b: str, deleted: set, inserted: set):
+    assert myers_diff(a, b, 100) == (deleted, inserted)
+
+
+def test_myers_diff_limit():
+    assert myers_diff("aaaa", "bbbb", 3) is None
+
+
+def test_common_prefix_across_chunks(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("jestspectation.__string_diff.CHUNK_SIZE", 3)
+    assert common_prefix("abcdefgh", "abcdeXgh") == 5
@@ -0,0 +1,143 @@
+"""
+Tests for diffs of buffers
+"""
+
+from array import array
+
+import pytest
+
+from jestspectation.__util import sub_diff_delegate
+
+
+def diff(matcher: object, other: object) -> list[str] | None:
+    return sub_diff_delegate(matcher, other, False, indent=False)
+
+
+def test_bytes_equal():
+    assert diff(b"abc", b"abc") is None
+
+
+def test_bytes_differ():
+    assert diff(b"abcd", b"abXd") == [
+        "b'abcd' == b'abXd'",
+        "Bytes differ from offset 0x2",
+        "Expected",
+        "   00000000  61 62 63 64                                      |abcd|",
+        "Received",
+        "   00000000  61 62 58 64                                      |abXd|",
+    ]
+
+
+def test_bytes_length_differs():
+    assert diff(b"ab", b"abc") == [
+        "b'ab' == b'abc'",
+        "Bytes differ from offset 0x2",
+        "Expected 2 bytes",
+        "Received 3 bytes",
+        "Expected",
+        "   00000000  61 62                                            |ab|",
+        "Received",
+        "   00000000  61 62 63                                         |abc|",
+    ]
+
+
+def test_empty_buffer_has_no_hexdump():
+    assert diff(b"", b"a") == [
+        "b'' == b'a'",
+        "Bytes differ from offset 0x0",
+        "Expected 0 bytes",
+        "Received 1 bytes",
+        "Received",
+        "   00000000  61                                               |a|",
+    ]
+
+
+def test_only_rows_near_differences_shown():
+    expected = bytes(1024)
+    received = bytearray(expected)
+    received[0x200] = 1
+    received[0x300] = 2
+    lines = diff(bytearray(expected), received)
+    assert lines is not None
+    assert lines[lines.index("Received") :] == [
+        "Received",
+        "   000001f0  00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00  "
+        "|................|",
+        "   00000200  01 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00  "
+        "|................|",
+        "   00000210  00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00  "
+        "|................|",
+        "   ...",
+        "   000002f0  00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00  "
+        "|................|",
+        "   00000300  02 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00  "
+        "|................|",
+        "   00000310  00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00  "
+        "|................|",
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_difference_found_across_chunks(
+    monkeypatch: pytest.MonkeyPatch,
+    chunk_size: int,
+):
+    monkeypatch.setattr("jestspectation.__buffer_diff.CHUNK_SIZE", chunk_size)
+    expected = bytes(range(100))
+    received = expected[:37] + b"!" + expected[38:]
+    lines = diff(expected, received)
+    assert lines is not None
+    assert lines[1] == "Bytes differ from offset 0x25"
+    # The difference is a single byte, so only one window is shown
+    assert "   ..." not in lines
+
+
+def test_array():
+    assert diff(array("i", [1, 2]), array("i", [1, 3])) == [
+        "array('i', [1, 2]) == array('i', [1, 3])",
+        "Bytes differ from offset 0x4",
+        "Expected",
+        "   00000000  01 00 00 00 02 00 00 00                          "
+        "|........|",
+        "Received",
+        "   00000000  01 00 00 00 03 00 00 00                          "
+        "|........|",
+    ]
+
+
+def test_format_mismatch():
+    # The same byte, as a signed and unsigned value
+    lines = diff(memoryview(array("b", [-1])), memoryview(b"\xff"))
+    assert lines is not None
+    assert lines[1] == "Format mismatch"
+
+
+def test_array_elements_unequal_with_equal_bytes():
+    nan = array("d", [float("nan")])
+    assert diff(nan, array("d", nan)) == [
+        "array('d', [nan]) == array('d', [nan])",
+        "Elements compare unequal, despite equal bytes (eg NaN)",
+        "Expected array('d', [nan])",
+        "Received array('d', [nan])",
+    ]
+
+
+def test_memoryview():
+    lines = diff(memoryview(b"ab"), memoryview(b"ac"))
+    assert lines is not None
+    assert lines[1:] == [
+        "Bytes differ from offset 0x1",
+        "Expected",
+        "   00000000  61 62                                            |ab|",
+        "Received",
+        "   00000000  61 63                                            |ac|",
+    ]
+
+
+def test_bytes_type_mismatch():
+    assert diff(b"ab", "ab") == [
+        "b'ab' == 'ab'",
+        "Type mismatch",
+        "Expected bytes",
+        "Received str",
+    ]
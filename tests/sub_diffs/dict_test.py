@@ -61,3 +61,52 @@ def test_diff_dict_combination():
         "   Expected 2",
         "   Received 3",
     ]
+
+
+def test_diff_dict_sorted():
+    assert diff_dict(
+        {"c": 1, "a": 1, "d": 1, "b": 1},
+        {"d": 2, "f": 1, "b": 2, "e": 1},
+        False,
+    ) == [
+        "{'c': 1, 'a': 1, 'd': 1, 'b': 1} == {'d': 2, 'f': 1, 'b': 2, 'e': 1}",
+        "-- 'a': 1",
+        "-- 'c': 1",
+        "++ 'e': 1",
+        "++ 'f': 1",
+        "!! 'b': 1 == 'b': 2",
+        "   1 == 2",
+        "   Value mismatch",
+        "   Expected 1",
+        "   Received 2",
+        "!! 'd': 1 == 'd': 2",
+        "   1 == 2",
+        "   Value mismatch",
+        "   Expected 1",
+        "   Received 2",
+    ]
+
+
+def test_diff_dict_unorderable_keys():
+    assert diff_dict({"a": 1, 1: 1}, {}, False) == [
+        "{'a': 1, 1: 1} == {}",
+        "-- 1: 1",
+        "-- 'a': 1",
+    ]
+
+
+def test_diff_dict_large():
+    matcher = {i: i for i in range(1_000_000)}
+    other = dict(matcher)
+    other[500] = -1
+    del other[3]
+    diff = diff_dict(matcher, other, False)
+    assert diff is not None
+    assert diff[1:] == [
+        "-- 3: 3",
+        "!! 500: 500 == 500: -1",
+        "   500 == -1",
+        "   Value mismatch",
+        "   Expected 500",
+        "   Received -1",
+    ]
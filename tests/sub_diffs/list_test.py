@@ -2,6 +2,7 @@
 Tests for list sub-diffs
 """
 
+from jestspectation import Any
 from jestspectation.__py_diffs import diff_list
 
 
@@ -51,3 +52,54 @@ def test_diff_list_combination():
         "   Received 3",
         "++ [3] 4",
     ]
+
+
+def test_diff_list_insertion_at_start():
+    assert diff_list([1, 2, 3], [0, 1, 2, 3], False) == [
+        "[1, 2, 3] == [0, 1, 2, 3]",
+        "++ [0] 0",
+    ]
+
+
+def test_diff_list_deletion_in_middle():
+    assert diff_list([1, 2, 3, 4], [1, 2, 4], False) == [
+        "[1, 2, 3, 4] == [1, 2, 4]",
+        "-- [2] 3",
+    ]
+
+
+def test_diff_list_replacement_after_insertion():
+    """
+    Aligned elements are compared even if their indexes differ
+    """
+    assert diff_list(["a", "b", "c"], ["x", "a", "B", "c"], False) == [
+        "['a', 'b', 'c'] == ['x', 'a', 'B', 'c']",
+        "++ [0] 'x'",
+        "!! [1->2] 'b' == 'B'",
+        "   Value mismatch",
+        "   Expected 'b'",
+        "   Received 'B'",
+    ]
+
+
+def test_diff_list_aligns_dicts():
+    assert diff_list([{"a": 1}, {"b": 2}], [{"b": 2}], False) == [
+        "[{'a': 1}, {'b': 2}] == [{'b': 2}]",
+        "-- [0] {'a': 1}",
+    ]
+
+
+def test_diff_list_matchers_compared_pairwise():
+    assert diff_list([Any(int), 2], ["a", 2], False) == [
+        "[Any(int), 2] == ['a', 2]",
+        "!! [0] Any(int) == 'a'",
+        "   Type mismatch",
+        "   Expected any object of type int",
+        "   Received 'a' (str)",
+    ]
+
+
+def test_diff_list_large_insertion():
+    diff = diff_list(list(range(100_000)), [-1] + list(range(100_000)), False)
+    assert diff is not None
+    assert diff[1:] == ["++ [0] -1"]
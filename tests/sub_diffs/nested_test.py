@@ -0,0 +1,116 @@
+"""
+Tests for sub-diffs of deeply nested structures
+"""
+
+from jestspectation.__util import sub_diff_delegate
+
+
+class Leaf:
+    """
+    Unhashable object that counts the number of times it is compared
+    """
+
+    comparisons = 0
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        Leaf.comparisons += 1
+        return isinstance(other, Leaf) and self.value == other.value
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"Leaf({self.value})"
+
+
+def nest(value: object, depth: int) -> object:
+    for i in range(depth):
+        value = [value] if i % 2 else {"a": value}
+    return value
+
+
+def test_nested_equal():
+    Leaf.comparisons = 0
+    assert (
+        sub_diff_delegate(nest(Leaf(1), 10), nest(Leaf(1), 10), False) is None
+    )
+    assert Leaf.comparisons == 1
+
+
+def test_nested_compared_once():
+    Leaf.comparisons = 0
+    diff = sub_diff_delegate(nest(Leaf(1), 10), nest(Leaf(2), 10), False)
+    assert diff is not None
+    assert diff[-3:] == [
+        "                                 Value mismatch",
+        "                                 Expected Leaf(1)",
+        "                                 Received Leaf(2)",
+    ]
+    assert Leaf.comparisons == 1
+
+
+def test_nested_identical_not_compared():
+    Leaf.comparisons = 0
+    leaf = Leaf(1)
+    assert sub_diff_delegate([leaf, 1], [leaf, 1], False) is None
+    assert Leaf.comparisons == 0
+
+
+def test_dict_differences_sorted():
+    assert sub_diff_delegate(
+        {"b": [1], "a": [2], "c": [3]},
+        {"c": [3], "b": [2], "a": [1]},
+        False,
+        indent=False,
+    ) == [
+        "{'b': [1], 'a': [2], 'c': [3]} == {'c': [3], 'b': [2], 'a': [1]}",
+        "!! 'a': [2] == 'a': [1]",
+        "   [2] == [1]",
+        "   !! [0] 2 == 1",
+        "      Value mismatch",
+        "      Expected 2",
+        "      Received 1",
+        "!! 'b': [1] == 'b': [2]",
+        "   [1] == [2]",
+        "   !! [0] 1 == 2",
+        "      Value mismatch",
+        "      Expected 1",
+        "      Received 2",
+    ]
+
+
+def test_very_deep():
+    depth = 3000
+    diff = sub_diff_delegate(nest(1, depth), nest(2, depth), False)
+    assert diff is not None
+    assert diff[-1] == " " * 3 * (depth + 1) + "Received 2"
+
+
+def test_nested_dict_differences_sorted():
+    assert sub_diff_delegate(
+        {"b": {"y": 1, "x": 1}, "a": 1},
+        {"b": {"y": 2, "x": 2}, "a": 2},
+        False,
+        indent=False,
+    ) == [
+        "{'b': {'y': 1, 'x': 1}, 'a': 1} == {'b': {'y': 2, 'x': 2}, 'a': 2}",
+        "!! 'a': 1 == 'a': 2",
+        "   1 == 2",
+        "   Value mismatch",
+        "   Expected 1",
+        "   Received 2",
+        "!! 'b': {'y': 1, 'x': 1} == 'b': {'y': 2, 'x': 2}",
+        "   {'y': 1, 'x': 1} == {'y': 2, 'x': 2}",
+        "   !! 'x': 1 == 'x': 2",
+        "      1 == 2",
+        "      Value mismatch",
+        "      Expected 1",
+        "      Received 2",
+        "   !! 'y': 1 == 'y': 2",
+        "      1 == 2",
+        "      Value mismatch",
+        "      Expected 1",
+        "      Received 2",
+    ]
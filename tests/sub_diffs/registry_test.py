@@ -0,0 +1,215 @@
+"""
+Tests for diff handlers registered by type
+"""
+
+from collections import OrderedDict, deque, namedtuple
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+import pytest
+
+from jestspectation import assert_eq, register_diff
+from jestspectation.__util import sub_diff_delegate
+
+
+def diff(matcher: object, other: object) -> list[str] | None:
+    return sub_diff_delegate(matcher, other, False, indent=False)
+
+
+Point = namedtuple("Point", ["x", "y"])
+
+
+@dataclass
+class Item:
+    name: str
+    tags: list
+    hits: int = field(default=0, compare=False)
+
+
+class Money:
+    def __init__(self, cents: int) -> None:
+        self.cents = cents
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Money) and self.cents == other.cents
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.cents})"
+
+
+class Coins(Money):
+    pass
+
+
+@register_diff(Money)
+def diff_money(
+    matcher: Money,
+    other: Money,
+    other_is_lhs: bool,
+) -> Iterator[str]:
+    yield f"Off by {other.cents - matcher.cents} cents"
+
+
+def test_tuple():
+    assert diff((1, 2, 3), (1, 5, 3)) == [
+        "(1, 2, 3) == (1, 5, 3)",
+        "!! [1] 2 == 5",
+        "   Value mismatch",
+        "   Expected 2",
+        "   Received 5",
+    ]
+
+
+def test_tuple_type_mismatch():
+    assert diff((1, 2), [1, 2]) == [
+        "(1, 2) == [1, 2]",
+        "Type mismatch",
+        "Expected tuple",
+        "Received list",
+    ]
+
+
+def test_named_tuple():
+    assert diff(Point(1, [2]), Point(1, [3])) == [
+        "Point(x=1, y=[2]) == Point(x=1, y=[3])",
+        "!! .y [2] == [3]",
+        "   !! [0] 2 == 3",
+        "      Value mismatch",
+        "      Expected 2",
+        "      Received 3",
+    ]
+
+
+def test_sequence():
+    assert diff(deque([1, 2]), deque([1, 2, 3])) == [
+        "deque([1, 2]) == deque([1, 2, 3])",
+        "++ [2] 3",
+    ]
+
+
+def test_string_not_diffed_by_element():
+    assert diff("ab", "ac") == [
+        "'ab' == 'ac'",
+        "Value mismatch",
+        "Expected 'ab'",
+        "Received 'ac'",
+    ]
+
+
+def test_frozenset():
+    assert diff(frozenset({1}), frozenset({2})) == [
+        "frozenset({1}) == frozenset({2})",
+        "-- 1",
+        "++ 2",
+    ]
+
+
+def test_mapping():
+    assert diff(MappingProxyType({"a": 1}), MappingProxyType({"b": 1})) == [
+        "mappingproxy({'a': 1}) == mappingproxy({'b': 1})",
+        "-- 'a': 1",
+        "++ 'b': 1",
+    ]
+
+
+def test_ordered_dict_order():
+    expected = OrderedDict(a=1, b=2)
+    received = OrderedDict(b=2, a=1)
+    # The repr of OrderedDict differs between Python versions
+    assert diff(expected, received) == [
+        f"{expected!r} == {received!r}",
+        "Order mismatch",
+        "Expected keys ['a', 'b']",
+        "Received keys ['b', 'a']",
+    ]
+
+
+class Tagged(list):
+    """
+    List that is never equal to anything, despite having equal elements
+    """
+
+    def __eq__(self, other: object) -> bool:
+        return False
+
+
+def test_custom_eq_without_differences():
+    """
+    Objects that are unequal due to their custom `__eq__`, but have no
+    differences that the handler can find, are still explained
+    """
+    assert diff(Tagged([1]), Tagged([1])) == [
+        "[1] == [1]",
+        "Value mismatch",
+        "Expected [1]",
+        "Received [1]",
+    ]
+
+
+def test_custom_eq_with_differences():
+    assert diff(Tagged([1]), Tagged([2])) == [
+        "[1] == [2]",
+        "!! [0] 1 == 2",
+        "   Value mismatch",
+        "   Expected 1",
+        "   Received 2",
+    ]
+
+
+def test_dataclass():
+    assert diff(Item("a", [1]), Item("a", [2], hits=3)) == [
+        "Item(name='a', tags=[1], hits=0) == Item(name='a', tags=[2], hits=3)",
+        "!! .tags [1] == [2]",
+        "   !! [0] 1 == 2",
+        "      Value mismatch",
+        "      Expected 1",
+        "      Received 2",
+    ]
+
+
+def test_dataclass_ignores_uncompared_fields():
+    assert diff(Item("a", [1]), Item("a", [1], hits=3)) is None
+
+
+def test_dataclass_type_mismatch():
+    assert diff(Item("a", []), 1) == [
+        "Item(name='a', tags=[], hits=0) == 1",
+        "Type mismatch",
+        "Expected Item",
+        "Received int",
+    ]
+
+
+def test_registered_handler():
+    assert diff(Money(100), Money(150)) == [
+        "Money(100) == Money(150)",
+        "Off by 50 cents",
+    ]
+
+
+def test_registered_handler_subclass():
+    assert diff(Coins(5), Coins(4)) == [
+        "Coins(5) == Coins(4)",
+        "Off by -1 cents",
+    ]
+
+
+def test_registered_handler_type_mismatch():
+    assert diff(Money(5), 5) == [
+        "Money(5) == 5",
+        "Type mismatch",
+        "Expected Money",
+        "Received int",
+    ]
+
+
+def test_registered_handler_nested():
+    with pytest.raises(AssertionError) as e:
+        assert_eq({"price": Money(5)}, {"price": Money(6)})
+    assert str(e.value).splitlines() == [
+        "{'price': Money(5)} == {'price': Money(6)}",
+        "!! 'price': Money(5) == 'price': Money(6)",
+        "   Money(5) == Money(6)",
+        "   Off by 1 cents",
+    ]
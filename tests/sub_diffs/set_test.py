@@ -38,3 +38,15 @@ def test_diff_set_combination():
         "-- 2",
         "++ 4",
     ]
+
+
+def test_diff_set_sorted():
+    assert diff_set({5, 3, 1}, {6, 4, 2}, False) == [
+        "{1, 3, 5} == {2, 4, 6}",
+        "-- 1",
+        "-- 3",
+        "-- 5",
+        "++ 2",
+        "++ 4",
+        "++ 6",
+    ]
@@ -0,0 +1,119 @@
+"""
+Tests for sub-diffs of structures with shared and self-referential objects
+"""
+
+from collections.abc import Iterator, Mapping
+
+import pytest
+
+from jestspectation import Equals, assert_eq
+from jestspectation.__util import sub_diff_delegate
+
+
+class FreshValues(Mapping):
+    """
+    Mapping that creates a new list each time a value is accessed, so that
+    values are garbage collected as soon as they are compared
+    """
+
+    def __init__(self, size: int, changed: int | None = None) -> None:
+        self.size = size
+        self.changed = changed
+
+    def __getitem__(self, key: int) -> list:
+        if not 0 <= key < self.size:
+            raise KeyError(key)
+        return [key + 1] if key == self.changed else [key]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.size))
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def cycle(value: object) -> list:
+    ret: list = [value]
+    ret.append(ret)
+    return ret
+
+
+def test_cycle_equal():
+    assert sub_diff_delegate(cycle(1), cycle(1), False) is None
+
+
+def test_cycle_different():
+    assert sub_diff_delegate(cycle(1), cycle(2), False, indent=False) == [
+        "[1, [...]] == [2, [...]]",
+        "!! [0] 1 == 2",
+        "   Value mismatch",
+        "   Expected 1",
+        "   Received 2",
+        "!! [1] [1, [...]] == [2, [...]] (recursive reference)",
+    ]
+
+
+def test_cycle_reference_before_difference():
+    a: dict = {"b": 1}
+    a["a"] = a
+    b: dict = {"b": 2}
+    b["a"] = b
+    assert sub_diff_delegate(a, b, False, indent=False) == [
+        "{'b': 1, 'a': {...}} == {'b': 2, 'a': {...}}",
+        "!! 'a': {'b': 1, 'a': {...}} == 'a': {'b': 2, 'a': {...}}",
+        "   {'b': 1, 'a': {...}} == {'b': 2, 'a': {...}} "
+        "(recursive reference)",
+        "!! 'b': 1 == 'b': 2",
+        "   1 == 2",
+        "   Value mismatch",
+        "   Expected 1",
+        "   Received 2",
+    ]
+
+
+def test_mutual_cycle():
+    a: list = [None, 1]
+    a[0] = [a]
+    b: list = [None, 2]
+    b[0] = [b]
+    assert sub_diff_delegate(a, b, False, indent=False) == [
+        "[[[...]], 1] == [[[...]], 2]",
+        "!! [1] 1 == 2",
+        "   Value mismatch",
+        "   Expected 1",
+        "   Received 2",
+    ]
+
+
+def test_shared_diffed_once():
+    x = [1, 2]
+    y = [1, 3]
+    assert sub_diff_delegate([x, [x]], [y, [y]], False, indent=False) == [
+        "[[1, 2], [[1, 2]]] == [[1, 3], [[1, 3]]]",
+        "!! [0] [1, 2] == [1, 3]",
+        "   !! [1] 2 == 3",
+        "      Value mismatch",
+        "      Expected 2",
+        "      Received 3",
+        "!! [1] [[1, 2]] == [[1, 3]]",
+        "   !! [0] [1, 2] == [1, 3] (same objects as above)",
+    ]
+
+
+def test_equals_cycle():
+    assert Equals(cycle(1)) == cycle(1)
+    assert Equals(cycle(1)) != cycle(2)
+
+
+def test_assert_eq_cycle():
+    assert_eq(cycle(1), cycle(1))
+    with pytest.raises(AssertionError):
+        assert_eq(cycle(1), cycle(2))
+
+
+def test_transient_values_not_confused():
+    # The ids of values that were already compared are reused by new values,
+    # which mustn't be treated as the same objects
+    diff = sub_diff_delegate(FreshValues(50), FreshValues(50, 30), False)
+    assert diff is not None
+    assert "   !! 30: [30] == 30: [31]" in diff